@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Iterable, MutableMapping
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+
+from viewer.core.entity import Action, Step, Task, Workflow
+
+START_DATE = datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def write_file(tmp_path) -> Callable[[str, str], str]:
+    """Writes a file in the temporary directory of the test and returns its path."""
+
+    def _write_file(name: str, content: str) -> str:
+        path = os.path.join(tmp_path, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    return _write_file
+
+
+@pytest.fixture
+def make_workflow() -> Callable[[Iterable[MutableMapping[str, Any]]], Workflow]:
+    """
+    Builds a workflow from the tasks, described by their `step`, `start` and `end` in
+    seconds, and optionally by their `location`, `queue` intervals and `energy`.
+    """
+
+    def _make_workflow(tasks: Iterable[MutableMapping[str, Any]]) -> Workflow:
+        steps = {}
+        for i, spec in enumerate(tasks):
+            deployment, _, service = spec.get("location", "local").partition("/")
+            task = Task(
+                timedelta(seconds=spec["start"]),
+                timedelta(seconds=spec["end"]),
+                deployment,
+                service or None,
+                f"{spec['step']}/{i}",
+            )
+            task.queue_times.extend(
+                Action(timedelta(seconds=s), timedelta(seconds=e))
+                for s, e in spec.get("queue", [])
+            )
+            task.energy = spec.get("energy")
+            steps.setdefault(spec["step"], []).append(task)
+        end = max(t.end_time for instances in steps.values() for t in instances)
+        workflow = Workflow(START_DATE, START_DATE + end)
+        workflow.steps.extend(
+            Step(name, instances) for name, instances in steps.items()
+        )
+        return workflow
+
+    return _make_workflow
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from viewer.core.accounting import JobAccountingStore
+
+START_DATE = datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+EPOCH = int(START_DATE.timestamp())
+
+
+def _get_sacct(jobs) -> str:
+    return json.dumps(
+        {
+            "jobs": [
+                {
+                    "job_id": job_id,
+                    "time": {"submission": EPOCH + submission, "start": EPOCH + start},
+                    "tres": {
+                        "allocated": (
+                            [{"type": "energy", "count": energy}]
+                            if energy is not None
+                            else []
+                        )
+                    },
+                }
+                for job_id, submission, start, energy in jobs
+            ]
+        }
+    )
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    return os.path.join(tmp_path, "index")
+
+
+def test_get_jobs(write_file, index_dir):
+    path = write_file("hpc.json", _get_sacct([(1, 5, 12, 300), (2, 6, 20, None)]))
+    store = JobAccountingStore({"hpc": [path]}, index_dir)
+    assert "hpc" in store and "cloud" not in store
+    records = store.get_jobs("hpc", [1, 2, 3], START_DATE)
+    assert sorted(records) == [1, 2]
+    assert (records[1].queue_start, records[1].queue_end) == (
+        timedelta(seconds=5),
+        timedelta(seconds=12),
+    )
+    assert (records[1].energy, records[2].energy) == (300.0, None)
+
+
+def test_index(write_file, index_dir):
+    path = write_file("hpc.json", _get_sacct([(1, 5, 12, 300)]))
+    JobAccountingStore({"hpc": [path]}, index_dir).load(["hpc"])
+    (index_name,) = os.listdir(index_dir)
+    index_path = os.path.join(index_dir, index_name)
+    with open(index_path) as f:
+        index = json.load(f)
+    # A fresh index is read instead of the sacct file
+    index["jobs"]["1"][2] = 100.0
+    with open(index_path, "w") as f:
+        json.dump(index, f)
+    store = JobAccountingStore({"hpc": [path]}, index_dir)
+    assert store.get_jobs("hpc", [1], START_DATE)[1].energy == 100.0
+    # A modified sacct file makes the index stale
+    write_file("hpc.json", _get_sacct([(1, 5, 12, 300), (2, 6, 20, 50)]))
+    store = JobAccountingStore({"hpc": [path]}, index_dir)
+    assert store.get_jobs("hpc", [1], START_DATE)[1].energy == 300.0
+
+
+def test_negative_energy(write_file, index_dir):
+    path = write_file("hpc.json", _get_sacct([(1, 5, 12, -1)]))
+    store = JobAccountingStore({"hpc": [path]}, index_dir)
+    with pytest.raises(Exception, match="negative energy"):
+        store.get_jobs("hpc", [1], START_DATE)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import argparse
+
+import pytest
+
+from viewer.batch import _get_argv, get_entries
+from viewer.cli.arguments import get_batch_parser, get_parser
+
+
+@pytest.mark.parametrize("value", ["0", "-3", "ten"])
+def test_invalid_preview(value, capsys):
+    with pytest.raises(SystemExit):
+        get_parser().parse_args(["-i", "w.log", "-t", "log", "--preview", value])
+    assert "--preview" in capsys.readouterr().err
+
+
+def test_preview():
+    args = get_parser().parse_args(["-i", "w.log", "-t", "log", "--preview", "10"])
+    assert args.preview == 10
+
+
+def test_batch_tables(tmp_path):
+    (tmp_path / "run").mkdir()
+    (tmp_path / "run" / "gantt.tasks.csv").write_text("")
+    args = get_batch_parser().parse_args(
+        ["-g", str(tmp_path / "*" / "*.csv"), "-t", "table", "-o", str(tmp_path)]
+    )
+    (entry,) = get_entries(args)
+    assert (entry["name"], entry["input-type"], entry["wms"]) == ("run", "table", None)
+    # The entry is a valid single run without a workflow manager
+    assert isinstance(get_parser().parse_args(_get_argv(entry)), argparse.Namespace)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from viewer.analysis.concurrency import sweep
+
+
+@pytest.fixture
+def intervals():
+    rng = np.random.default_rng(7)
+    # Integer bounds, so that many tasks start and end at the same times
+    starts = rng.integers(0, 100, 300).astype(np.float64)
+    return starts, starts + rng.integers(0, 20, 300)
+
+
+def _get_running(starts, ends, times):
+    return ((starts[:, None] <= times) & (times < ends[:, None])).sum(axis=0)
+
+
+def test_sweep(intervals):
+    starts, ends = intervals
+    concurrency = sweep(starts, ends)
+    times = np.linspace(-1, 125, 2000)
+    running = _get_running(starts, ends, times)
+    assert np.array_equal(concurrency.at(times), running)
+    # The peak is reached at a start, where the brute force is exact
+    assert concurrency.get_peak() == _get_running(starts, ends, starts).max()
+    span = ends.max() - starts.min()
+    assert concurrency.get_average() == pytest.approx((ends - starts).sum() / span)
+
+
+def test_buckets(intervals):
+    starts, ends = intervals
+    edges = np.linspace(0, 120, 7)
+    buckets = sweep(starts, ends).get_buckets(edges)
+    overlaps = np.clip(
+        np.minimum(ends[:, None], edges[1:]) - np.maximum(starts[:, None], edges[:-1]),
+        0,
+        None,
+    )
+    assert buckets == pytest.approx(overlaps.sum(axis=0) / np.diff(edges))
+
+
+def test_empty():
+    concurrency = sweep(np.array([]), np.array([]))
+    assert (concurrency.get_peak(), concurrency.get_average()) == (0, 0.0)
+    assert np.array_equal(concurrency.get_buckets(np.array([0.0, 1.0])), [0.0])
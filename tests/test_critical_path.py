@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from viewer.analysis.critical_path import get_critical_path
+
+DIAMOND = [
+    {"step": "/a", "start": 0, "end": 2},
+    {"step": "/b", "start": 2, "end": 7},
+    {"step": "/c", "start": 2, "end": 3},
+    {"step": "/c", "start": 3, "end": 4},
+    {"step": "/d", "start": 7, "end": 9},
+]
+
+
+def test_diamond(make_workflow):
+    workflow = make_workflow(DIAMOND)
+    for source, target in (("/a", "/b"), ("/a", "/c"), ("/b", "/d"), ("/c", "/d")):
+        workflow.add_dependency(source, target)
+    critical_path = get_critical_path(workflow)
+    assert critical_path.steps == ["/a", "/b", "/d"]
+    assert critical_path.length == timedelta(seconds=9)
+    assert critical_path.slack == {
+        "/a": timedelta(0),
+        "/b": timedelta(0),
+        "/c": timedelta(seconds=3),
+        "/d": timedelta(0),
+    }
+    assert not critical_path.is_critical("/c")
+
+
+def test_cycle(make_workflow, capsys):
+    workflow = make_workflow(DIAMOND)
+    workflow.add_dependency("/a", "/b")
+    workflow.add_dependency("/b", "/a")
+    assert get_critical_path(workflow) is None
+    assert "cycle" in capsys.readouterr().out
+
+
+def test_no_dependencies(make_workflow):
+    assert get_critical_path(make_workflow(DIAMOND)) is None
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from viewer.diff import _flatten, compare, get_baseline
+
+
+def _get_stats(start: str, steps: dict[str, tuple[int, float]]) -> dict:
+    return {
+        "workflow": {"start": start, "duration_seconds": 10.0},
+        "steps": [
+            {
+                "name": name,
+                "instances_count": count,
+                "total_exec_seconds": seconds,
+                "instance_metrics": None,
+            }
+            for name, (count, seconds) in steps.items()
+        ],
+    }
+
+
+def _get_statuses(baselines, current) -> dict[str, str]:
+    results = compare(get_baseline(baselines), _flatten(current), 0.1, 1.0)
+    return {f"{r['name']}:{r['metric']}": r["status"] for r in results}
+
+
+def test_missing_step():
+    baselines = [_get_stats("2024-01-01", {"/a": (2, 5.0), "/b": (1, 3.0)})]
+    statuses = _get_statuses(baselines, _get_stats("2024-01-02", {"/a": (2, 5.0)}))
+    assert statuses["/b:instances_count"] == "missing"
+    assert statuses["/a:instances_count"] == "ok"
+
+
+def test_fractional_instances_count():
+    """The median of two runs with 3 and 4 instances accepts both counts."""
+    baselines = [
+        _get_stats("2024-01-01", {"/a": (3, 5.0)}),
+        _get_stats("2024-01-02", {"/a": (4, 5.0)}),
+    ]
+    for count, status in ((3, "ok"), (4, "ok"), (5, "changed")):
+        current = _get_stats("2024-01-03", {"/a": (count, 5.0)})
+        assert _get_statuses(baselines, current)["/a:instances_count"] == status
+
+
+def test_removed_step():
+    """A step removed in the latest baselines is not expected in the current run."""
+    baselines = [
+        _get_stats("2024-01-01", {"/a": (2, 5.0), "/b": (1, 3.0), "/c": (1, 2.0)}),
+        _get_stats("2024-01-02", {"/a": (2, 5.0), "/c": (1, 2.0)}),
+        _get_stats("2024-01-03", {"/a": (2, 5.0), "/c": (1, 2.0)}),
+        _get_stats("2024-01-04", {"/a": (2, 5.0)}),
+    ]
+    assert "/b:instances_count" not in get_baseline(baselines)
+    statuses = _get_statuses(baselines, _get_stats("2024-01-05", {"/a": (2, 5.0)}))
+    assert "/b:instances_count" not in statuses
+    # Most of the baselines still have the step, which may have failed in the latest
+    assert statuses["/c:instances_count"] == "missing"
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import os
+from datetime import timedelta
+
+from viewer.core.filtering import TaskFilter
+from viewer.core.table import get_table_metadata, workflow_to_table, write_table
+from viewer.translator.table.manager import table_create_workflow
+
+TASKS = [
+    {"step": "/main/align", "start": 0, "end": 4, "location": "hpc/gpu"},
+    {"step": "/main/align", "start": 5, "end": 8, "location": "cloud"},
+    {"step": "/main/sort", "start": 8, "end": 9, "location": "hpc/cpu"},
+    {"step": "/report", "start": 9, "end": 10, "location": "hpc/cpu"},
+]
+
+
+def _get_names(steps):
+    return {step.name: [t.name for t in step.instances] for step in steps}
+
+
+def test_step_globs():
+    task_filter = TaskFilter(included_steps=["/main/*", "/report"])
+    assert task_filter.match_step("/main/align")
+    assert task_filter.match_step("/report")
+    assert not task_filter.match_step("/reports")
+    # The globs are case sensitive on every platform
+    assert not task_filter.match_step("/Main/align")
+    assert TaskFilter().match_step("/any")
+
+
+def test_filter_steps(make_workflow):
+    workflow = make_workflow(TASKS)
+    task_filter = TaskFilter(
+        included_steps=["/main/*"],
+        window=(timedelta(seconds=4.5), None),
+        deployments=["hpc"],
+    )
+    assert _get_names(task_filter.filter_steps(workflow.steps)) == {
+        "/main/sort": ["/main/sort/2"]
+    }
+
+
+def test_window_bounds(make_workflow):
+    task_filter = TaskFilter(window=(timedelta(seconds=4), timedelta(seconds=8)))
+    # The tasks touching the bounds of the window overlap it
+    assert _get_names(task_filter.filter_steps(make_workflow(TASKS).steps)) == {
+        "/main/align": ["/main/align/0", "/main/align/1"],
+        "/main/sort": ["/main/sort/2"],
+    }
+
+
+def test_translator_filter(make_workflow, tmp_path):
+    workflow = make_workflow(TASKS)
+    path = os.path.join(tmp_path, "gantt.tasks.csv")
+    write_table(workflow_to_table(workflow), get_table_metadata(workflow), path)
+    result = table_create_workflow(
+        [path], TaskFilter(included_steps=["/main/a*"], deployments=["cloud"])
+    )
+    assert _get_names(result.steps) == {"/main/align": ["/main/align/1"]}
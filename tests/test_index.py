@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from viewer.core.index import IntervalIndex
+
+
+@pytest.fixture
+def intervals():
+    rng = np.random.default_rng(3)
+    starts = rng.integers(0, 1000, 500).astype(np.float64)
+    # Also intervals of zero length and sharing their bounds
+    return starts, starts + rng.integers(0, 50, 500)
+
+
+def test_query(intervals):
+    starts, ends = intervals
+    index = IntervalIndex(starts, ends)
+    rng = np.random.default_rng(5)
+    windows = [(-10.0, -1.0), (2000.0, 3000.0), (0.0, 2000.0), (500.0, 500.0)]
+    windows.extend(sorted(rng.integers(-20, 1070, 2).astype(float)) for _ in range(200))
+    for start, end in windows:
+        expected = np.flatnonzero((starts <= end) & (ends >= start))
+        assert np.array_equal(index.query(start, end), expected), (start, end)
+
+
+def test_empty_index():
+    index = IntervalIndex(np.array([]), np.array([]))
+    assert len(index) == 0
+    assert len(index.query(0.0, 1.0)) == 0
+
+
+def test_window(make_workflow):
+    workflow = make_workflow(
+        [
+            {"step": "/a", "start": 0, "end": 2},
+            {"step": "/a", "start": 3, "end": 6},
+            {"step": "/b", "start": 5, "end": 9},
+            {"step": "/c", "start": 9.5, "end": 12},
+        ]
+    )
+    workflow.add_dependency("/a", "/b")
+    workflow.add_dependency("/b", "/c")
+    window = workflow.get_window(timedelta(seconds=4), timedelta(seconds=8))
+    assert {s.name: [t.name for t in s.instances] for s in window.steps} == {
+        "/a": ["/a/1"],
+        "/b": ["/b/2"],
+    }
+    assert (window.start_time, window.end_time) == (
+        timedelta(seconds=4),
+        timedelta(seconds=8),
+    )
+    assert window.dependencies == {"/b": {"/a"}}
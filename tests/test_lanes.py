@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from viewer.analysis.concurrency import sweep
+from viewer.analysis.lanes import pack_lanes
+from viewer.cli.schema import GroupingMode
+from viewer.render.report import _create_dataframe
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pack_lanes_optimal(seed):
+    """The intervals take as many lanes as their peak concurrency, without overlaps."""
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, 100, 500).astype(np.float64)
+    ends = starts + rng.integers(1, 20, 500)
+    lanes = pack_lanes(starts, ends)
+    assert lanes.max() + 1 == sweep(starts, ends).get_peak()
+    for lane in np.unique(lanes):
+        order = np.argsort(starts[lanes == lane])
+        assert np.all(
+            starts[lanes == lane][order][1:] >= ends[lanes == lane][order][:-1]
+        )
+
+
+def test_location_lanes(make_workflow):
+    """The lanes start at the end of the wait, the excluded steps take the last ones."""
+    workflow = make_workflow(
+        [
+            {"step": "/a", "start": 0, "end": 10, "location": "hpc/node0"},
+            {"step": "/b", "start": 2, "end": 20, "location": "hpc/node0"},
+            {
+                "step": "/a",
+                "start": 5,
+                "end": 15,
+                "location": "hpc/node0",
+                "queue": [(5, 10)],
+            },
+        ]
+    )
+    df = _create_dataframe(workflow, GroupingMode.LOCATION, excluded_steps=["/b"])
+    assert sorted(df.loc[df["Step"] == "/a", "LaneIndex"]) == [0, 0]
+    assert df.loc[df["Step"] == "/b", "LaneIndex"].tolist() == [1]
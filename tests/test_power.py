@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from viewer.analysis.power import get_location_power, get_power
+
+
+def test_power_integration():
+    """The cumulative energy of the profile is the energy of the tasks."""
+    rng = np.random.default_rng(0)
+    starts = rng.uniform(0, 100, 200)
+    ends = starts + rng.uniform(0.1, 50, 200)
+    energy = rng.uniform(0, 1000, 200)
+    profile = get_power(starts, ends, energy)
+    assert profile.get_total_energy() == pytest.approx(energy.sum())
+    assert np.all(profile.levels >= 0)
+
+
+def test_location_power_from_run_start(make_workflow):
+    """The energy is spread over the run time, after the wait in the batch queue."""
+    workflow = make_workflow(
+        [
+            {
+                "step": "/a",
+                "start": 0,
+                "end": 10,
+                "location": "hpc/node0",
+                "queue": [(0, 6)],
+                "energy": 400.0,
+            },
+            {"step": "/a", "start": 0, "end": 2, "location": "local", "energy": 10.0},
+            {"step": "/b", "start": 0, "end": 5, "location": "local"},
+        ]
+    )
+    profiles = get_location_power(workflow)
+    assert list(profiles) == ["hpc/node0", "local"]
+    np.testing.assert_array_equal(profiles["hpc/node0"].times, [6, 10])
+    np.testing.assert_array_equal(profiles["hpc/node0"].levels, [100, 0])
+    assert profiles["local"].get_total_energy() == pytest.approx(10.0)
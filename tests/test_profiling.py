@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from viewer.core.profiling import Profiler, phase, set_profiler
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    profiler = Profiler(str(tmp_path), "gantt", trace_memory=True)
+    profiler.start()
+    set_profiler(profiler)
+    yield profiler
+    set_profiler(None)
+    profiler.stop()
+
+
+def test_nested_phases(profiler):
+    with phase("report"):
+        with phase("report.html") as record:
+            data = bytearray(1 << 22)
+        del data
+    outer, inner = profiler.records
+    assert [outer.name, inner.name] == ["report", "report.html"]
+    assert record is inner
+    # The allocations of the inner phase are part of the peak of the outer one
+    assert inner.peak_traced_bytes >= 1 << 22
+    assert outer.peak_traced_bytes >= inner.peak_traced_bytes
+    assert outer.wall_seconds >= inner.wall_seconds
+
+
+def test_throughput(profiler, write_file):
+    path = write_file("workflow.log", "first\nsecond\nthird\n")
+    with phase("translate"):
+        pass
+    profiler.set_throughput("translate", [os.path.dirname(path)])
+    (data,) = profiler.to_dict()["phases"]
+    assert (data["input_bytes"], data["input_lines"]) == (19, 3)
+    with pytest.raises(KeyError):
+        profiler.set_throughput("stats", [path])
+
+
+def test_cprofile(tmp_path):
+    profiler = Profiler(str(tmp_path), "gantt", cprofile_phase="stats")
+    with profiler.phase("translate"), profiler.phase("stats"):
+        sum(range(1000))
+    assert os.listdir(tmp_path) == ["gantt.stats.prof"]
+    assert "peak_traced_bytes" not in profiler.records[0].to_dict()
+
+
+def test_inactive_phase():
+    with phase("translate") as record:
+        assert record is None
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import numpy as np
+
+from viewer.analysis.queue import QueueTable, get_queue_stats
+
+
+def test_queue_table(make_workflow):
+    """A requeued task waits in each of its intervals and runs after the last one."""
+    workflow = make_workflow(
+        [
+            {"step": "/a", "start": 0, "end": 10, "queue": [(0, 2), (4, 5)]},
+            {"step": "/a", "start": 1, "end": 4, "queue": [(1, 3)]},
+            {"step": "/b", "start": 2, "end": 6},
+        ]
+    )
+    table = QueueTable(workflow)
+    assert len(table) == 2
+    np.testing.assert_array_equal(table.queue_starts, [0, 1])
+    np.testing.assert_array_equal(table.queue_ends, [5, 3])
+    np.testing.assert_array_equal(table.waits, [3, 2])
+    np.testing.assert_array_equal(table.runs, [5, 1])
+
+
+def test_no_queue_times(make_workflow):
+    workflow = make_workflow([{"step": "/a", "start": 0, "end": 1}])
+    assert len(QueueTable(workflow)) == 0
+    assert get_queue_stats(workflow) is None
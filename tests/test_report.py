@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import os
+import shutil
+
+from viewer.cli.schema import OutputConfig, StyleConfig
+from viewer.render.report import create_report
+from viewer.render.tiles import get_tiles_directory
+
+TASKS = [
+    {"step": "/a", "start": 0, "end": 4},
+    {"step": "/a", "start": 1, "end": 3},
+    {"step": "/b", "start": 4, "end": 9},
+]
+
+
+def test_bucketed_excluded_steps(make_workflow, tmp_path, capsys):
+    """With every step excluded, the time buckets are skipped with a warning."""
+    style = StyleConfig(excluded_steps=["/a", "/b"], grouping_mode="bucketed")
+    out_config = OutputConfig(str(tmp_path), "report", ["html", "png"])
+    create_report(make_workflow(TASKS), out_config, style)
+    assert "no steps to plot in the time buckets" in capsys.readouterr().out
+    assert not os.path.exists(out_config.get_filepath("html"))
+    assert not os.path.exists(out_config.get_filepath("png"))
+
+
+def test_second_run_writes_nothing(make_workflow, tmp_path, capsys):
+    """The plots without data are not expected, so an identical run is up to date."""
+    workflow = make_workflow(TASKS)
+    style = StyleConfig()
+    out_config = OutputConfig(str(tmp_path), "report", ["html", "png"])
+    create_report(workflow, out_config, style)
+    out = capsys.readouterr().out
+    written = out.count("Successfully saved")
+    # Without energy, the power plot is skipped along with the energy plot
+    assert out.count("do not have energy information") == 1
+    mtimes = {path: os.stat(path).st_mtime_ns for path in tmp_path.iterdir()}
+    create_report(workflow, out_config, style)
+    out = capsys.readouterr().out
+    assert written and "Successfully saved" not in out
+    assert out.count("is up to date") == written
+    assert {path: os.stat(path).st_mtime_ns for path in tmp_path.iterdir()} == mtimes
+
+
+def test_tiles_directory_is_tracked(make_workflow, tmp_path, capsys):
+    """The tiled page is rendered again when its tiles directory is deleted."""
+    workflow = make_workflow(TASKS)
+    style = StyleConfig(concurrency_plot=False)
+    out_config = OutputConfig(str(tmp_path), "report", ["html"], tiled_html=True)
+    create_report(workflow, out_config, style)
+    directory = get_tiles_directory(out_config.get_filepath("html"))
+    assert os.path.isdir(directory)
+    shutil.rmtree(directory)
+    capsys.readouterr()
+    create_report(workflow, out_config, style)
+    assert "Successfully saved" in capsys.readouterr().out
+    assert os.path.isdir(directory)
+
+
+def test_tiles_excluded_steps(make_workflow, tmp_path, capsys):
+    style = StyleConfig(excluded_steps=["/a", "/b"])
+    out_config = OutputConfig(str(tmp_path), "report", ["html"], tiled_html=True)
+    create_report(make_workflow(TASKS), out_config, style)
+    assert "no steps to plot in the tiled HTML" in capsys.readouterr().out
+    assert not os.path.exists(out_config.get_filepath("html"))
+
+
+def test_compact_html(make_workflow, tmp_path):
+    """The compact reports share plotly.js and encode the task times in binary."""
+    workflow = make_workflow(TASKS)
+    compact = OutputConfig(str(tmp_path / "compact"), "report", ["html"], True)
+    full = OutputConfig(str(tmp_path / "full"), "report", ["html"])
+    for out_config in (compact, full):
+        os.makedirs(out_config.outdir)
+        create_report(workflow, out_config, StyleConfig(), plots=("time",))
+    plotly_path = os.path.join(compact.outdir, "plotly.min.js")
+    with open(compact.get_filepath("html")) as f:
+        content = f.read()
+    assert 'src="plotly.min.js"' in content
+    assert '"bdata"' in content
+    assert os.path.getsize(compact.get_filepath("html")) * 10 < os.path.getsize(
+        full.get_filepath("html")
+    )
+    # The reports of other runs in the same directory reuse plotly.js
+    mtime = os.stat(plotly_path).st_mtime_ns
+    other = OutputConfig(compact.outdir, "other", ["html"], True)
+    create_report(workflow, other, StyleConfig(), plots=("time",))
+    assert os.path.exists(other.get_filepath("html"))
+    assert os.stat(plotly_path).st_mtime_ns == mtime
+
+
+def test_cache_invalidation(make_workflow, tmp_path):
+    """Only the outputs whose data, style fields or options changed are rendered."""
+    plots = ("time", "concurrency")
+    out_config = OutputConfig(str(tmp_path), "report", ["html"])
+    time_path = out_config.get_filepath("html")
+    concurrency_path = out_config.get_filepath("html", postfix=".concurrency")
+
+    def _render(workflow, style, out_config=out_config):
+        mtimes = {p: os.stat(p).st_mtime_ns for p in (time_path, concurrency_path)}
+        create_report(workflow, out_config, style, plots=plots)
+        return {p for p in mtimes if os.stat(p).st_mtime_ns != mtimes[p]}
+
+    workflow = make_workflow(TASKS)
+    create_report(workflow, out_config, StyleConfig(), plots=plots)
+    assert _render(workflow, StyleConfig()) == set()
+    # The grouping mode changes only the Gantt chart
+    assert _render(workflow, StyleConfig(grouping_mode="task")) == {time_path}
+    assert _render(workflow, StyleConfig(legend=False)) == {
+        time_path,
+        concurrency_path,
+    }
+    changed = make_workflow([*TASKS[:-1], {"step": "/b", "start": 4, "end": 10}])
+    assert _render(changed, StyleConfig(legend=False)) == {
+        time_path,
+        concurrency_path,
+    }
+    forced = OutputConfig(str(tmp_path), "report", ["html"], use_cache=False)
+    assert _render(changed, StyleConfig(legend=False), forced) == {
+        time_path,
+        concurrency_path,
+    }
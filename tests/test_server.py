@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from viewer.service.server import ViewerServer, _get_key
+
+
+def test_table_key(write_file):
+    path = write_file("gantt.tasks.csv", "")
+    assert _get_key({"input": [path], "input-type": ["table"]})[:2] == (None, "table")
+    with pytest.raises(ValueError, match="wms"):
+        _get_key({"input": [path], "input-type": ["log"]})
+
+
+def test_busy_worker():
+    server = ViewerServer.__new__(ViewerServer)
+    server.executors = [None, None]
+    server.running = [0, 0]
+    server.lock = threading.Lock()
+    key = ("streamflow", "log", ("w.log",), "", (0,))
+    index = server._acquire(key)
+    # The second request of the same trace goes to the idle worker
+    assert server._acquire(key) == 1 - index
+    # Both workers are busy, so the trace goes back to its own worker
+    assert server._acquire(key) == index
+    assert server.running == ([2, 1] if index == 0 else [1, 2])
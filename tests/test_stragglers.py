@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from viewer.analysis.stragglers import get_straggler_mask, get_stragglers
+
+
+@pytest.mark.parametrize(
+    "durations",
+    [
+        [10, 10, 10, 10, 11],
+        [60] * 99 + [61],
+        [100, 101, 99, 100, 102, 98, 105],
+    ],
+)
+def test_no_stragglers(durations):
+    """A tiny spread of the durations, or a zero MAD, does not give stragglers."""
+    assert not get_straggler_mask(np.array(durations, dtype=float), 3.5).any()
+
+
+@pytest.mark.parametrize(
+    "durations, expected",
+    [
+        ([10] * 99 + [1000], [99]),
+        ([10, 12, 11, 9, 10, 50, 11, 10], [5]),
+        ([10, 60, 10], []),
+    ],
+)
+def test_stragglers(durations, expected):
+    mask = get_straggler_mask(np.array(durations, dtype=float), 3.5)
+    assert np.flatnonzero(mask).tolist() == expected
+
+
+def test_stragglers_run_time(make_workflow):
+    """The wait in the batch queue does not make a straggler."""
+    tasks = [{"step": "/a", "start": 0, "end": 10} for _ in range(5)]
+    tasks.append({"step": "/a", "start": 0, "end": 100, "queue": [(0, 90)]})
+    tasks.append({"step": "/a", "start": 0, "end": 60, "queue": [(0, 5)]})
+    [straggler] = get_stragglers(make_workflow(tasks), 3.5)
+    assert straggler["task"] == "/a/6"
+    assert straggler["start"] == 5
+    assert straggler["duration_seconds"] == 55
+    assert straggler["step_median_seconds"] == 10
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+
+from viewer.analysis.sampling import PreviewStats
+from viewer.analysis.streaming import StreamingStats
+from viewer.core.accounting import JobAccountingStore
+from viewer.core.filtering import TaskFilter
+from viewer.render.stats import get_step_metrics
+from viewer.translator.manager import create_workflow, stream_workflow
+from viewer.translator.streamflow.log import get_job_inputs, merge_logs
+
+# Each job logs RUNNING before its terminal status, and /b/1 never terminates before
+# its step completes
+LOG = """\
+2024-01-01 10:00:00.000 INFO     Processing workflow 1234-abcd
+2024-01-01 10:00:00.100 INFO     DEPLOYING local
+2024-01-01 10:00:01.000 INFO     EXECUTING step /a (job /a/0) locally into directory /wd/a_0:
+2024-01-01 10:00:01.500 DEBUG    Job /a/0 changed status to RUNNING
+2024-01-01 10:00:04.000 DEBUG    Job /a/0 changed status to COMPLETED
+2024-01-01 10:00:04.100 INFO     COMPLETED Step /a
+2024-01-01 10:00:05.000 INFO     EXECUTING step /b (job /b/0) locally into directory /wd/b_0:
+2024-01-01 10:00:05.100 INFO     EXECUTING step /b (job /b/1) locally into directory /wd/b_1:
+2024-01-01 10:00:05.200 DEBUG    Job /b/0 changed status to RUNNING
+2024-01-01 10:00:05.300 DEBUG    Job /b/1 changed status to RUNNING
+2024-01-01 10:00:07.000 DEBUG    Job /b/0 changed status to FAILED
+2024-01-01 10:00:09.000 INFO     COMPLETED Step /b
+2024-01-01 10:00:09.500 INFO     COMPLETED Workflow execution
+"""
+INPUTS = """\
+2024-01-01 10:00:04.900 DEBUG    Job /b/0 inputs: {
+    "reads": {
+        "class": "File",
+        "path": "/wd/a_0/out.txt",
+        "size": 42
+    }
+}
+"""
+INPUTS_LOG = LOG.replace(
+    "2024-01-01 10:00:05.000 INFO     EXECUTING step /b (job /b/0)",
+    INPUTS + "2024-01-01 10:00:05.000 INFO     EXECUTING step /b (job /b/0)",
+)
+
+
+def _get_durations(workflow) -> dict[str, float]:
+    return {
+        task.name: task.get_duration().total_seconds()
+        for step in workflow.steps
+        for task in step.instances
+    }
+
+
+@pytest.fixture
+def log_path(write_file) -> str:
+    return write_file("streamflow.log", LOG)
+
+
+def test_stream_durations(log_path):
+    """The streamed tasks end at their last status, as in the workflow."""
+    workflow = create_workflow("streamflow", "log", [log_path], JobAccountingStore({}))
+    preview = PreviewStats(size=10)
+    stream_workflow("streamflow", "log", [log_path], JobAccountingStore({}), preview)
+    assert _get_durations(workflow) == {"/a/0": 3.0, "/b/0": 2.0, "/b/1": 0.2}
+    assert _get_durations(preview.get_workflow()) == _get_durations(workflow)
+
+
+def test_stream_metrics(log_path):
+    workflow = create_workflow("streamflow", "log", [log_path], JobAccountingStore({}))
+    stats = StreamingStats()
+    stream_workflow("streamflow", "log", [log_path], JobAccountingStore({}), stats)
+    streamed = {s["name"]: s for s in stats.get_stats()["steps"]}
+    for step in workflow.steps:
+        metrics = get_step_metrics(step)
+        assert streamed[step.name]["instances_count"] == metrics["instances_count"]
+        assert streamed[step.name]["total_exec_seconds"] == pytest.approx(
+            metrics["total_exec_seconds"]
+        )
+        if metrics["instance_metrics"]:
+            for key in ("min_seconds", "max_seconds", "avg_seconds", "std_seconds"):
+                assert streamed[step.name]["instance_metrics"][key] == pytest.approx(
+                    metrics["instance_metrics"][key]
+                )
+            # The streamed percentiles are estimated with a bounded relative error
+            for key in ("p50_seconds", "p90_seconds", "p99_seconds"):
+                assert streamed[step.name]["instance_metrics"][key] == pytest.approx(
+                    metrics["instance_metrics"][key], rel=0.05
+                )
+
+
+def test_malformed_copy(write_file, capsys):
+    """A truncated copy log is skipped with a warning, the other copies are kept."""
+    copy = (
+        "from /wd/a_0/out.txt on location local to /wd/b_0/out.txt on local file-system"
+    )
+    log = LOG.replace(
+        "2024-01-01 10:00:04.100 INFO     COMPLETED Step /a\n",
+        "2024-01-01 10:00:04.100 INFO     COMPLETED Step /a\n"
+        "2024-01-01 10:00:04.200 INFO     COPYING from /wd/a_0/out.txt on\n"
+        "2024-01-01 10:00:04.300 INFO     COMPLETED copy from /wd/a_0/out.txt\n"
+        f"2024-01-01 10:00:04.400 INFO     COPYING {copy}\n"
+        f"2024-01-01 10:00:04.600 INFO     COMPLETED copy {copy}\n",
+    )
+    path = write_file("streamflow.log", log)
+    workflow = create_workflow("streamflow", "log", [path], JobAccountingStore({}))
+    assert capsys.readouterr().out.count("WARNING: Skipping the malformed copy") == 2
+    assert [t.dst_path for t in workflow.transfers] == ["/wd/b_0/out.txt"]
+
+
+def test_split_log(write_file):
+    """The parts of a split log repeat the header of the same workflow."""
+    lines = LOG.splitlines(keepends=True)
+    header = lines[0].replace("10:00:00.000", "10:00:04.150")
+    paths = [
+        write_file("streamflow.0.log", "".join(lines[:7])),
+        write_file("streamflow.1.log", header + "".join(lines[7:])),
+    ]
+    workflow = create_workflow("streamflow", "log", paths, JobAccountingStore({}))
+    expected = create_workflow(
+        "streamflow", "log", [write_file("streamflow.log", LOG)], JobAccountingStore({})
+    )
+    assert workflow.start_date == expected.start_date
+    assert _get_durations(workflow) == _get_durations(expected)
+
+
+def test_multiple_workflows(write_file):
+    other = LOG.splitlines(keepends=True)[0].replace("1234-abcd", "5678-efgh")
+    path = write_file("streamflow.log", LOG + other)
+    with pytest.raises(Exception, match="multiple workflows"):
+        create_workflow("streamflow", "log", [path], JobAccountingStore({}))
+
+
+def test_windowed_copies(write_file, capsys):
+    """The copies outside the window are dropped without an unmatched warning."""
+    copy = "from /wd/a_0/out.txt on location local to /wd/b_{}/out.txt on local file-system"
+    log = LOG.replace(
+        "2024-01-01 10:00:04.100 INFO     COMPLETED Step /a\n",
+        "2024-01-01 10:00:04.100 INFO     COMPLETED Step /a\n"
+        f"2024-01-01 10:00:04.400 INFO     COPYING {copy.format(0)}\n"
+        f"2024-01-01 10:00:04.600 INFO     COMPLETED copy {copy.format(0)}\n",
+    ).replace(
+        "2024-01-01 10:00:09.000 INFO     COMPLETED Step /b\n",
+        f"2024-01-01 10:00:08.000 INFO     COPYING {copy.format(1)}\n"
+        f"2024-01-01 10:00:08.500 INFO     COMPLETED copy {copy.format(1)}\n"
+        "2024-01-01 10:00:09.000 INFO     COMPLETED Step /b\n",
+    )
+    path = write_file("streamflow.log", log)
+    workflow = create_workflow(
+        "streamflow",
+        "log",
+        [path],
+        JobAccountingStore({}),
+        TaskFilter(window=(timedelta(0), timedelta(seconds=5))),
+    )
+    assert "do not have a start log" not in capsys.readouterr().out
+    assert [t.dst_path for t in workflow.transfers] == ["/wd/b_0/out.txt"]
+
+
+def test_job_inputs(write_file):
+    """The `inputs` block of a job is read back from its offsets in the log."""
+    path = write_file("streamflow.log", INPUTS_LOG)
+    with open(path, "rb") as fd:
+        offsets = {line: offset for _, offset, line in merge_logs([fd])}
+        header, *block = INPUTS.splitlines(keepends=True)
+        interval = (offsets[header.encode()], offsets[b"}\n"])
+        assert get_job_inputs(fd, interval) == "{" + "".join(block)
+    workflow = create_workflow("streamflow", "log", [path], JobAccountingStore({}))
+    assert workflow.dependencies == {"/b": {"/a"}}
+
+
+def test_split_job_inputs(write_file):
+    """The offsets of an `inputs` block refer to the part of the log that holds it."""
+    lines = INPUTS_LOG.splitlines(keepends=True)
+    header = lines[0].replace("10:00:00.000", "10:00:04.150")
+    paths = [
+        write_file("streamflow.0.log", "".join(lines[:6])),
+        write_file("streamflow.1.log", header + "".join(lines[6:])),
+    ]
+    workflow = create_workflow("streamflow", "log", paths, JobAccountingStore({}))
+    assert workflow.dependencies == {"/b": {"/a"}}
+
+
+def test_filtered_job_inputs(write_file):
+    path = write_file("streamflow.log", INPUTS_LOG)
+    workflow = create_workflow(
+        "streamflow",
+        "log",
+        [path],
+        JobAccountingStore({}),
+        TaskFilter(included_steps=["/a"]),
+    )
+    assert workflow.dependencies == {}
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from viewer.analysis.streaming import QuantileSketch, RunningStats
+
+QUANTILES = (0.0, 0.5, 0.9, 0.99, 1.0)
+
+
+@pytest.fixture
+def values():
+    # Durations spanning a few orders of magnitude, with some instantaneous tasks
+    values = np.random.default_rng(11).lognormal(2.0, 1.5, 5000)
+    values[:50] = 0.0
+    return values
+
+
+def _get_stats(values) -> RunningStats:
+    stats = RunningStats()
+    for value in values:
+        stats.add(float(value))
+    return stats
+
+
+def _get_sketch(values, **kwargs) -> QuantileSketch:
+    sketch = QuantileSketch(**kwargs)
+    for value in values:
+        sketch.add(float(value))
+    return sketch
+
+
+def test_running_stats(values):
+    stats = _get_stats(values)
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(np.mean(values))
+    assert stats.get_variance() == pytest.approx(np.var(values, ddof=1))
+    assert stats.get_std() == pytest.approx(np.std(values, ddof=1))
+    assert (stats.min, stats.max) == (values.min(), values.max())
+
+
+def test_merge_running_stats(values):
+    merged = _get_stats(values[:1234])
+    merged.merge(_get_stats(values[1234:]))
+    merged.merge(RunningStats())
+    whole = _get_stats(values)
+    assert merged.count == whole.count
+    assert merged.mean == pytest.approx(whole.mean)
+    assert merged.get_variance() == pytest.approx(whole.get_variance())
+    assert (merged.min, merged.max) == (whole.min, whole.max)
+
+
+def test_single_value():
+    stats = _get_stats([4.0])
+    assert (stats.mean, stats.get_variance()) == (4.0, 0.0)
+
+
+def test_quantiles(values):
+    sketch = _get_sketch(values)
+    ordered = np.sort(values)
+    for q in QUANTILES:
+        expected = ordered[int(q * (len(values) - 1))]
+        assert sketch.get_quantile(q) == pytest.approx(expected, rel=0.01, abs=1e-12)
+    assert QuantileSketch().get_quantile(0.5) is None
+
+
+def test_merge_sketches(values):
+    merged = _get_sketch(values[:3000])
+    merged.merge(_get_sketch(values[3000:]))
+    whole = _get_sketch(values)
+    assert (merged.count, merged.zero_count) == (whole.count, whole.zero_count)
+    assert merged.bins == whole.bins
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(relative_accuracy=0.05))
+
+
+def test_collapsed_sketch(values):
+    sketch = _get_sketch(values, max_bins=64)
+    assert len(sketch.bins) <= 64
+    assert sketch.count == len(values)
+    # Only the lowest bins are merged, so the high quantiles keep their accuracy
+    expected = np.sort(values)[int(0.99 * (len(values) - 1))]
+    assert sketch.get_quantile(0.99) == pytest.approx(expected, rel=0.01)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from viewer.core.entity import TaskStatus
+from viewer.core.table import (
+    TABLE_FORMATS,
+    get_table_metadata,
+    read_table,
+    workflow_to_table,
+    write_table,
+)
+from viewer.translator.table.manager import table_create_workflow
+
+TASKS = [
+    {"step": "/a", "start": 2, "end": 5, "location": "hpc/gpu", "queue": [(0, 1)]},
+    {"step": "/a", "start": 4, "end": 9, "queue": [(0, 1), (2, 4)], "energy": 120.5},
+    {"step": "/b", "start": 9, "end": 12.25, "location": "cloud", "energy": 30.0},
+]
+
+
+def _get_tasks(workflow):
+    return [
+        (
+            step.name,
+            task.name,
+            task.start_time,
+            task.end_time,
+            task.deployment,
+            task.service,
+            [(q.start_time, q.end_time) for q in task.queue_times],
+            task.energy,
+            task.status,
+        )
+        for step in workflow.steps
+        for task in step.instances
+    ]
+
+
+@pytest.fixture
+def workflow(make_workflow):
+    workflow = make_workflow(TASKS)
+    workflow.steps[0].instances[1].status = TaskStatus.FAILED
+    workflow.add_dependency("/a", "/b")
+    return workflow
+
+
+@pytest.mark.parametrize("table_format", TABLE_FORMATS)
+def test_round_trip(workflow, table_format, tmp_path):
+    if table_format != "csv":
+        pytest.importorskip("pyarrow")
+    path = os.path.join(tmp_path, f"gantt.tasks.{table_format}")
+    df = workflow_to_table(workflow)
+    # The columns added by other tools are not read back
+    write_table(df.assign(extra=1), get_table_metadata(workflow), path)
+    result = table_create_workflow([path])
+    assert _get_tasks(result) == _get_tasks(workflow)
+    assert result.dependencies == {"/b": {"/a"}}
+    assert (result.start_date, result.end_date) == (
+        workflow.start_date,
+        workflow.end_date,
+    )
+
+
+@pytest.mark.parametrize("table_format", TABLE_FORMATS)
+def test_read_columns(workflow, table_format, tmp_path):
+    if table_format != "csv":
+        pytest.importorskip("pyarrow")
+    path = os.path.join(tmp_path, f"gantt.tasks.{table_format}")
+    write_table(workflow_to_table(workflow), get_table_metadata(workflow), path)
+    df, metadata = read_table(path, columns=["step", "start", "missing"])
+    assert list(df.columns) == ["step", "start"]
+    assert list(df["start"]) == [2.0, 4.0, 9.0]
+    assert metadata["dependencies"] == {"/b": ["/a"]}
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from viewer.analysis.utilization import get_utilization
+
+
+def test_queue_wait_is_idle(make_workflow):
+    """A location is not busy while its tasks wait in the batch queue."""
+    workflow = make_workflow(
+        [
+            {"step": "/a", "start": 0, "end": 10, "location": "hpc/node0"},
+            {
+                "step": "/b",
+                "start": 10,
+                "end": 100,
+                "location": "hpc/node0",
+                "queue": [(10, 80)],
+            },
+        ]
+    )
+    [location] = get_utilization(workflow, idle_threshold=60)
+    assert location["busy_seconds"] == 30
+    assert location["idle_gaps"] == 1
+    assert location["top_idle_windows"] == [{"start": 10, "end": 80, "seconds": 70}]
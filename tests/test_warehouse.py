@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from viewer.cli.arguments import get_ingest_parser, get_query_parser, get_render_parser
+from viewer.core.table import get_table_metadata, workflow_to_table, write_table
+from viewer.core.warehouse import Warehouse
+from viewer.warehouse import ingest, query, render
+
+RUNS = {
+    "first": [
+        {"step": "/a", "start": 0, "end": 3},
+        {"step": "/a", "start": 1, "end": 6, "queue": [(0, 1)]},
+        {"step": "/b", "start": 6, "end": 8, "energy": 10.0},
+    ],
+    "second": [
+        {"step": "/a", "start": 0, "end": 4},
+        {"step": "/a", "start": 2, "end": 10},
+        {"step": "/b", "start": 10, "end": 11, "energy": 20.0},
+    ],
+}
+
+
+def _get_tasks(workflow):
+    return sorted(
+        (step.name, task.name, task.start_time, task.end_time, task.energy)
+        for step in workflow.steps
+        for task in step.instances
+    )
+
+
+@pytest.fixture
+def database(make_workflow, tmp_path):
+    path = os.path.join(tmp_path, "runs.db")
+    for name, tasks in RUNS.items():
+        workflow = make_workflow(tasks)
+        table_path = os.path.join(tmp_path, f"{name}.tasks.csv")
+        write_table(
+            workflow_to_table(workflow), get_table_metadata(workflow), table_path
+        )
+        ingest(
+            get_ingest_parser().parse_args(
+                [path, "-n", name, "-i", table_path, "-t", "table"]
+            )
+        )
+    return path
+
+
+def test_query(database, tmp_path):
+    output = os.path.join(tmp_path, "query.json")
+    query(get_query_parser().parse_args([database, "-o", output]))
+    with open(output) as f:
+        result = {r["step"]: r for r in json.load(f)}
+    durations = [3, 5, 4, 8]
+    assert (result["/a"]["tasks"], result["/a"]["runs"]) == (4, 2)
+    assert result["/a"]["p50_seconds"] == pytest.approx(np.percentile(durations, 50))
+    assert result["/a"]["p95_seconds"] == pytest.approx(np.percentile(durations, 95))
+    assert result["/b"]["energy"] == pytest.approx(30.0)
+
+
+def test_render(database, make_workflow, tmp_path):
+    with Warehouse(database) as warehouse:
+        workflow = warehouse.get_workflow("second")
+    assert _get_tasks(workflow) == _get_tasks(make_workflow(RUNS["second"]))
+    render(
+        get_render_parser().parse_args(
+            [database, "second", "-o", str(tmp_path), "-g", "step", "--save-stats"]
+        )
+    )
+    with open(os.path.join(tmp_path, "second.stats.json")) as f:
+        stats = json.load(f)
+    assert stats["workflow"]["total_instances"] == 3
+    assert os.path.exists(os.path.join(tmp_path, "second.html"))
+
+
+def test_render_window(database, tmp_path):
+    render(
+        get_render_parser().parse_args(
+            [database, "second", "-o", str(tmp_path), "--window", "3:", "--save-stats"]
+        )
+    )
+    with open(os.path.join(tmp_path, "second.stats.json")) as f:
+        stats = json.load(f)
+    # The duration is measured from the beginning of the window
+    assert stats["workflow"]["total_instances"] == 3
+    assert stats["workflow"]["duration_seconds"] == pytest.approx(8.0)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, MutableMapping
+
+import numpy as np
+
+from viewer.core.entity import Step, Task, Workflow
+
+
+class Concurrency:
+    """Step function of the number of running tasks: `levels[i]` holds in [times[i], times[i + 1])."""
+
+    def __init__(self, times: np.ndarray, levels: np.ndarray) -> None:
+        self.times: np.ndarray = times
+        self.levels: np.ndarray = levels
+
+    def get_peak(self) -> int:
+        return int(self.levels.max()) if len(self.levels) else 0
+
+    def get_average(self) -> float:
+        """Time-weighted average over the span between the first start and the last end."""
+        if len(self.times) < 2 or (span := self.times[-1] - self.times[0]) <= 0:
+            return 0.0
+        return float(np.dot(self.levels[:-1], np.diff(self.times)) / span)
+
+    def at(self, times: np.ndarray) -> np.ndarray:
+        """Samples the step function at the given times."""
+        indices = np.searchsorted(self.times, times, side="right") - 1
+        return np.where(indices >= 0, self.levels[np.maximum(indices, 0)], 0)
+
+    def get_buckets(self, edges: np.ndarray) -> np.ndarray:
+        """Time-weighted average level in each bucket [edges[i], edges[i + 1])."""
+        if len(self.times) == 0:
+            return np.zeros(len(edges) - 1)
+        # Integral of the step function at each time, then at each edge
+        areas = np.concatenate(
+            ([0.0], np.cumsum(self.levels[:-1] * np.diff(self.times)))
+        )
+        indices = np.searchsorted(self.times, edges, side="right") - 1
+        clamped = np.maximum(indices, 0)
+        integrals = np.where(
+            indices >= 0,
+            areas[clamped] + self.levels[clamped] * (edges - self.times[clamped]),
+            0.0,
+        )
+        return np.diff(integrals) / np.diff(edges)
+
+
+def sweep(starts: np.ndarray, ends: np.ndarray) -> Concurrency:
+    """Computes the concurrency of a set of intervals in O(n log n)."""
+    times = np.concatenate((starts, ends))
+    deltas = np.concatenate(
+        (np.ones(len(starts), dtype=np.int64), -np.ones(len(ends), dtype=np.int64))
+    )
+    # At the same time, the ends are processed before the starts
+    order = np.lexsort((deltas, times))
+    times, levels = times[order], np.cumsum(deltas[order])
+    # Keep only the last level of each distinct time
+    last = np.append(times[1:] != times[:-1], True)[: len(times)]
+    return Concurrency(times[last], levels[last])
+
+
+def get_intervals(tasks: Iterable[Task]) -> tuple[np.ndarray, np.ndarray]:
+    intervals = np.array(
+        [
+            (task.start_time.total_seconds(), task.end_time.total_seconds())
+            for task in tasks
+            if task.end_time is not None
+        ],
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    return intervals[:, 0], intervals[:, 1]
+
+
+def get_concurrency(workflow: Workflow) -> Concurrency:
+    return sweep(*get_intervals(t for s in workflow.steps for t in s.instances))
+
+
+def get_grouped_concurrency(
+    workflow: Workflow, key: Callable[[Step, Task], str | None]
+) -> MutableMapping[str, Concurrency]:
+    groups = {}
+    for step in workflow.steps:
+        for task in step.instances:
+            groups.setdefault(key(step, task), []).append(task)
+    return {name: sweep(*get_intervals(tasks)) for name, tasks in groups.items()}
+
+
+def get_step_concurrency(workflow: Workflow) -> MutableMapping[str, Concurrency]:
+    return get_grouped_concurrency(workflow, lambda step, _: step.name)
+
+
+def get_location_concurrency(workflow: Workflow) -> MutableMapping[str, Concurrency]:
+    return get_grouped_concurrency(
+        workflow, lambda _, task: task.get_location() or "unknown"
+    )
+
+
+def align(
+    profiles: MutableMapping[str, Concurrency],
+) -> tuple[np.ndarray, MutableMapping[str, np.ndarray]]:
+    """Samples all the profiles on the union of their event times, e.g., to stack them."""
+    if not profiles:
+        return np.array([]), {}
+    grid = np.unique(np.concatenate([p.times for p in profiles.values()]))
+    return grid, {name: p.at(grid) for name, p in profiles.items()}
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import MutableMapping, MutableSequence
+from datetime import timedelta
+
+from viewer.core.entity import Workflow
+
+
+class CriticalPath:
+    def __init__(
+        self,
+        steps: MutableSequence[str],
+        length: timedelta,
+        slack: MutableMapping[str, timedelta],
+    ) -> None:
+        self.steps: MutableSequence[str] = steps
+        self.length: timedelta = length
+        self.slack: MutableMapping[str, timedelta] = slack
+
+    def is_critical(self, step_name: str) -> bool:
+        return step_name in self.steps
+
+
+def get_critical_path(workflow: Workflow) -> CriticalPath | None:
+    """
+    Computes the longest path of the step dependency graph, weighting each step with its
+    duration, and the slack of each step, i.e., how much it can be delayed without
+    delaying the whole workflow. It runs in O(V + E) on a topological order of the steps.
+    """
+    if not workflow.dependencies:
+        return None
+    durations = {
+        step.name: step.get_duration() or timedelta(0) for step in workflow.steps
+    }
+    successors = {name: [] for name in durations}
+    indegree = dict.fromkeys(durations, 0)
+    for target, sources in workflow.dependencies.items():
+        if target not in durations:
+            continue
+        for source in sources:
+            if source in durations:
+                successors[source].append(target)
+                indegree[target] += 1
+
+    # Kahn's algorithm
+    order = []
+    queue = deque(name for name, degree in indegree.items() if degree == 0)
+    while queue:
+        name = queue.popleft()
+        order.append(name)
+        for succ in successors[name]:
+            indegree[succ] -= 1
+            if indegree[succ] == 0:
+                queue.append(succ)
+    if len(order) != len(durations):
+        print("WARNING: The step dependencies contain a cycle. No critical path found")
+        return None
+
+    # Forward pass: earliest start times and the predecessor that determines them
+    earliest_start = dict.fromkeys(durations, timedelta(0))
+    critical_pred = {}
+    for name in order:
+        earliest_finish = earliest_start[name] + durations[name]
+        for succ in successors[name]:
+            if earliest_finish > earliest_start[succ]:
+                earliest_start[succ] = earliest_finish
+                critical_pred[succ] = name
+    last = max(order, key=lambda n: earliest_start[n] + durations[n])
+    length = earliest_start[last] + durations[last]
+
+    # Backward pass: latest start times without delaying the workflow
+    latest_start = {}
+    for name in reversed(order):
+        latest_finish = min(
+            (latest_start[succ] for succ in successors[name]), default=length
+        )
+        latest_start[name] = latest_finish - durations[name]
+
+    path = [last]
+    while path[-1] in critical_pred:
+        path.append(critical_pred[path[-1]])
+    return CriticalPath(
+        steps=list(reversed(path)),
+        length=length,
+        slack={name: latest_start[name] - earliest_start[name] for name in order},
+    )
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import heapq
+
+import numpy as np
+
+
+def pack_lanes(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Assigns the intervals to the fewest lanes without overlaps, i.e., as many as their
+    peak concurrency, with a greedy interval partitioning in O(n log n): each interval
+    takes the lane that became free first, or a new lane if all are busy.
+    """
+    order = np.argsort(starts, kind="stable")
+    lanes = []
+    # End of the last interval of each lane, the lane with the earliest end on top
+    heap = []
+    for start, end in zip(starts[order].tolist(), ends[order].tolist()):
+        if heap and heap[0][0] <= start:
+            lane = heapq.heapreplace(heap, (end, heap[0][1]))[1]
+        else:
+            lane = len(heap)
+            heapq.heappush(heap, (end, lane))
+        lanes.append(lane)
+    result = np.empty(len(starts), dtype=np.int64)
+    result[order] = lanes
+    return result
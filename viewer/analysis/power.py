@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from viewer.analysis.concurrency import Concurrency
+from viewer.analysis.queue import get_run_start
+from viewer.core.entity import Workflow
+
+
+class PowerProfile(Concurrency):
+    """
+    Step function of the power in watts: `levels[i]` holds in [times[i], times[i + 1]).
+    `energy[i]` is the energy in joules consumed up to `times[i]`.
+    """
+
+    def __init__(self, times: np.ndarray, levels: np.ndarray) -> None:
+        super().__init__(times, levels)
+        self.energy: np.ndarray = np.concatenate(
+            ([0.0], np.cumsum(levels[:-1] * np.diff(times)))
+        )
+
+    def get_total_energy(self) -> float:
+        return float(self.energy[-1]) if len(self.energy) else 0.0
+
+
+def get_power(starts: np.ndarray, ends: np.ndarray, energy: np.ndarray) -> PowerProfile:
+    """
+    Spreads the energy of each task uniformly over its interval and sums the power of the
+    tasks in O(n log n). The tasks without duration are ignored.
+    """
+    valid = ends > starts
+    starts, ends = starts[valid], ends[valid]
+    power = energy[valid] / (ends - starts)
+    times = np.concatenate((starts, ends))
+    deltas = np.concatenate((power, -power))
+    order = np.argsort(times, kind="stable")
+    times, levels = times[order], np.cumsum(deltas[order])
+    # Keep only the last level of each distinct time
+    last = np.append(times[1:] != times[:-1], True)[: len(times)]
+    # The rounding errors of the sums must not give a negative power
+    return PowerProfile(times[last], np.maximum(levels[last], 0.0))
+
+
+def get_location_power(workflow: Workflow) -> MutableMapping[str, PowerProfile]:
+    """
+    Power of each location, from the tasks with energy information. The energy is spent
+    while the task runs, i.e., after its wait in the batch queue.
+    """
+    groups = {}
+    for step in workflow.steps:
+        for task in step.instances:
+            if task.energy is not None and task.end_time is not None:
+                groups.setdefault(task.get_location() or "unknown", []).append(
+                    (
+                        get_run_start(task).total_seconds(),
+                        task.end_time.total_seconds(),
+                        task.energy,
+                    )
+                )
+    profiles = {}
+    for name in sorted(groups):
+        data = np.array(groups[name], dtype=np.float64)
+        profiles[name] = get_power(data[:, 0], data[:, 1], data[:, 2])
+    return profiles
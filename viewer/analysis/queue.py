@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, MutableMapping, MutableSequence
+from datetime import timedelta
+from typing import Any
+
+import numpy as np
+
+from viewer.analysis.concurrency import Concurrency, align, sweep
+from viewer.core.entity import Task, Workflow
+
+
+def get_run_start(task: Task) -> timedelta:
+    # The task starts when the job is submitted, so it runs only at the end of the wait
+    if task.queue_times:
+        return max(task.start_time, max(q.end_time for q in task.queue_times))
+    return task.start_time
+
+
+def get_run_intervals(tasks: Iterable[Task]) -> tuple[np.ndarray, np.ndarray]:
+    """Run start and end of the completed tasks, i.e., without the queue wait."""
+    intervals = np.array(
+        [
+            (get_run_start(task).total_seconds(), task.end_time.total_seconds())
+            for task in tasks
+            if task.end_time is not None
+        ],
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    return intervals[:, 0], intervals[:, 1]
+
+
+class QueueTable:
+    """Columns of the tasks with queue times: the wait and the run time of each task."""
+
+    def __init__(self, workflow: Workflow) -> None:
+        tasks = [
+            (step.name, task)
+            for step in workflow.steps
+            for task in step.instances
+            if task.queue_times and task.end_time is not None
+        ]
+        self.steps: np.ndarray = np.array([name for name, _ in tasks], dtype=object)
+        self.deployments: np.ndarray = np.array(
+            [task.deployment or "unknown" for _, task in tasks], dtype=object
+        )
+        # The queue intervals of all the tasks, each task is a contiguous slice
+        intervals = np.array(
+            [
+                (q.start_time.total_seconds(), q.end_time.total_seconds())
+                for _, task in tasks
+                for q in task.queue_times
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+        offsets = np.cumsum([0] + [len(task.queue_times) for _, task in tasks])[:-1]
+        bounds = np.array(
+            [
+                (task.start_time.total_seconds(), task.end_time.total_seconds())
+                for _, task in tasks
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+        self.queue_starts: np.ndarray = np.minimum.reduceat(intervals[:, 0], offsets)
+        self.queue_ends: np.ndarray = np.maximum.reduceat(intervals[:, 1], offsets)
+        self.waits: np.ndarray = np.add.reduceat(
+            intervals[:, 1] - intervals[:, 0], offsets
+        )
+        # As in `get_run_start`, the task runs only at the end of the wait
+        run_starts = np.maximum(bounds[:, 0], self.queue_ends)
+        self.runs: np.ndarray = np.maximum(bounds[:, 1] - run_starts, 0)
+
+    def __len__(self) -> int:
+        return len(self.waits)
+
+
+def _get_group_stats(
+    table: QueueTable, keys: np.ndarray
+) -> MutableSequence[MutableMapping[str, Any]]:
+    names, inverse = np.unique(keys.astype(str), return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(names))
+    waits = np.bincount(inverse, weights=table.waits, minlength=len(names))
+    runs = np.bincount(inverse, weights=table.runs, minlength=len(names))
+    # Waits sorted by group, then each group is a contiguous slice
+    order = np.lexsort((table.waits, inverse))
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+    result = []
+    for i, name in enumerate(names):
+        result.append(
+            {
+                "name": str(name),
+                "tasks": int(counts[i]),
+                "total_wait_seconds": float(waits[i]),
+                "mean_wait_seconds": float(waits[i] / counts[i]),
+                "p95_wait_seconds": float(
+                    np.percentile(table.waits[order[bounds[i] : bounds[i + 1]]], 95)
+                ),
+                "total_run_seconds": float(runs[i]),
+                "wait_to_run_ratio": float(waits[i] / runs[i]) if runs[i] else None,
+            }
+        )
+    return result
+
+
+def get_queue_concurrency(table: QueueTable) -> MutableMapping[str, Concurrency]:
+    """Number of tasks waiting in the queue of each deployment over time."""
+    return {
+        str(name): sweep(
+            table.queue_starts[table.deployments == name],
+            table.queue_ends[table.deployments == name],
+        )
+        for name in np.unique(table.deployments.astype(str))
+    }
+
+
+def get_queue_stats(workflow: Workflow) -> MutableMapping[str, Any] | None:
+    """Queue wait analytics, or None if the tasks have no queue times."""
+    if not len(table := QueueTable(workflow)):
+        return None
+    queued = sweep(table.queue_starts, table.queue_ends)
+    running = sweep(*get_run_intervals(t for s in workflow.steps for t in s.instances))
+    grid, levels = align({"queued": queued, "running": running})
+    # Time in which some tasks wait and nothing runs, i.e., the makespan lost in queue
+    only_queued = (levels["queued"][:-1] > 0) & (levels["running"][:-1] == 0)
+    queue_only = float(np.dot(only_queued, np.diff(grid)))
+    makespan = workflow.end_time.total_seconds()
+    return {
+        "workflow": {
+            "total_wait_seconds": float(table.waits.sum()),
+            "total_run_seconds": float(table.runs.sum()),
+            "queue_only_seconds": queue_only,
+            "queue_only_fraction": queue_only / makespan if makespan else 0.0,
+            "peak_queued": queued.get_peak(),
+        },
+        "steps": _get_group_stats(table, table.steps),
+        "deployments": _get_group_stats(table, table.deployments),
+    }
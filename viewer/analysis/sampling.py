@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import random
+from collections.abc import MutableMapping, MutableSequence
+from typing import Any
+
+from viewer.analysis.streaming import StreamingStats
+from viewer.core.entity import Step, Task, Workflow
+
+
+class Reservoir:
+    """Uniform sample of at most `size` items of a stream of unknown length."""
+
+    def __init__(self, size: int, rng: random.Random) -> None:
+        self.size: int = size
+        self.rng: random.Random = rng
+        self.items: MutableSequence[Any] = []
+        self.count: int = 0
+
+    def add(self, item: Any) -> None:
+        self.count += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+        # The i-th item replaces a sampled one with probability size / i
+        elif (index := self.rng.randrange(self.count)) < self.size:
+            self.items[index] = item
+
+
+class PreviewStats(StreamingStats):
+    """
+    Streaming statistics of all the tasks, which also keep a reservoir sample of the
+    tasks of each step to render a preview of the workflow.
+    """
+
+    def __init__(self, size: int, seed: int = 0) -> None:
+        super().__init__()
+        self.size: int = size
+        # A fixed seed gives the same preview of the same trace
+        self.rng: random.Random = random.Random(seed)
+        self.samples: MutableMapping[str, Reservoir] = {}
+
+    def add_task(self, step_name: str, task: Task) -> None:
+        super().add_task(step_name, task)
+        if (sample := self.samples.get(step_name)) is None:
+            sample = self.samples[step_name] = Reservoir(self.size, self.rng)
+        sample.add(task)
+
+    def get_workflow(self) -> Workflow:
+        """The workflow with the sampled tasks of each step."""
+        workflow = Workflow(self.start_date, self.end_date)
+        workflow.steps.extend(
+            sorted(
+                (Step(name, list(s.items)) for name, s in self.samples.items()),
+                key=lambda x: x.get_start(),
+            )
+        )
+        return workflow
+
+    def get_stats(self) -> MutableMapping[str, Any]:
+        stats = super().get_stats()
+        stats["preview"] = {
+            "sample_size": self.size,
+            "sampled_instances": sum(len(s.items) for s in self.samples.values()),
+            "total_instances": sum(s.count for s in self.samples.values()),
+        }
+        return stats
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from collections.abc import MutableMapping, MutableSequence
+from typing import Any
+
+import numpy as np
+
+from viewer.analysis.queue import get_run_intervals
+from viewer.core.entity import Workflow
+
+# Steps with fewer completed tasks have no meaningful spread of the durations
+MIN_INSTANCES = 5
+# Scale of the MAD, and of the mean absolute deviation, to the standard deviation of
+# normally distributed durations
+MAD_SCALE = 1.4826
+MEAN_AD_SCALE = 1.2533
+# Minimum excess over the median duration of a straggler, so that a tiny spread of the
+# durations does not turn the slightly slower tasks into stragglers
+MIN_RELATIVE_EXCESS = 0.5
+
+
+def get_straggler_scores(durations: np.ndarray) -> np.ndarray:
+    """
+    Robust z-scores of the durations, i.e., their distance from the median in units of
+    the scaled median absolute deviation. When more than half of the durations are
+    equal, the MAD is zero, and the mean absolute deviation is used instead.
+    """
+    if len(durations) < MIN_INSTANCES:
+        return np.zeros(len(durations))
+    median = np.median(durations)
+    deviations = np.abs(durations - median)
+    if (spread := MAD_SCALE * np.median(deviations)) == 0:
+        spread = MEAN_AD_SCALE * np.mean(deviations)
+    if spread == 0:
+        return np.zeros(len(durations))
+    return (durations - median) / spread
+
+
+def get_straggler_mask(durations: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    The tasks slower than the median by more than `threshold` robust deviations and by
+    more than `MIN_RELATIVE_EXCESS` of the median.
+    """
+    if not len(durations):
+        return np.zeros(0, dtype=bool)
+    return (get_straggler_scores(durations) > threshold) & (
+        durations > (1 + MIN_RELATIVE_EXCESS) * np.median(durations)
+    )
+
+
+def get_stragglers(
+    workflow: Workflow, threshold: float
+) -> MutableSequence[MutableMapping[str, Any]]:
+    """
+    The stragglers of each step, the slowest first. The durations are the run times of
+    the tasks, without their wait in the batch queue.
+    """
+    stragglers = []
+    for step in sorted(workflow.steps, key=lambda s: s.name):
+        tasks = [t for t in step.instances if t.end_time is not None]
+        starts, ends = get_run_intervals(tasks)
+        durations = ends - starts
+        scores = get_straggler_scores(durations)
+        median = float(np.median(durations)) if len(durations) else 0.0
+        slow = np.flatnonzero(get_straggler_mask(durations, threshold))
+        for i in slow[np.argsort(-durations[slow], kind="stable")]:
+            stragglers.append(
+                {
+                    "step": step.name,
+                    "task": tasks[i].name,
+                    "location": tasks[i].get_location(),
+                    "start": float(starts[i]),
+                    "end": float(ends[i]),
+                    "duration_seconds": float(durations[i]),
+                    "step_median_seconds": median,
+                    "score": float(scores[i]),
+                }
+            )
+    return stragglers
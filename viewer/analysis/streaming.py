@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import math
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from typing import Any
+
+from viewer.core.entity import Task, Workflow
+
+PERCENTILES = (50, 90, 99)
+
+
+class RunningStats:
+    """Mean and variance of a stream of values (Welford), with minimum and maximum."""
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.mean: float = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+        self._m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: RunningStats) -> None:
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta**2 * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def get_variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def get_std(self) -> float:
+        return math.sqrt(self.get_variance())
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch of non-negative values (DDSketch). Values are counted in
+    logarithmic bins, so the quantiles have a bounded relative error and the size depends
+    on the range of the values, not on their number.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048) -> None:
+        self.gamma: float = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.max_bins: int = max_bins
+        self.count: int = 0
+        self.zero_count: int = 0
+        self.bins: MutableMapping[int, int] = {}
+        self._log_gamma: float = math.log(self.gamma)
+
+    def _collapse(self) -> None:
+        # The lowest bins are merged, so only the accuracy of the smallest values degrades
+        while len(self.bins) > self.max_bins:
+            count = self.bins.pop(min(self.bins))
+            self.bins[min(self.bins)] += count
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + 1
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+
+    def merge(self, other: QuantileSketch) -> None:
+        if self.gamma != other.gamma:
+            raise ValueError("Sketches with different accuracies cannot be merged")
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self._collapse()
+
+    def get_quantile(self, q: float) -> float | None:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < (cumulative := self.zero_count):
+            return 0.0
+        for key in sorted(self.bins):
+            cumulative += self.bins[key]
+            if cumulative > rank:
+                break
+        # Middle of the bin `(gamma^(key-1), gamma^key]`
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+
+class StepAccumulator:
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self.count: int = 0
+        self.first_start: timedelta | None = None
+        self.last_start: timedelta | None = None
+        self.last_end: timedelta | None = None
+        self.durations: RunningStats = RunningStats()
+        self.sketch: QuantileSketch = QuantileSketch()
+
+    def add(self, task: Task) -> None:
+        self.count += 1
+        if self.first_start is None or task.start_time < self.first_start:
+            self.first_start = task.start_time
+        if self.last_start is None or task.start_time > self.last_start:
+            self.last_start = task.start_time
+        if task.end_time is not None:
+            if self.last_end is None or task.end_time > self.last_end:
+                self.last_end = task.end_time
+            # As `get_step_metrics`, instantaneous tasks are not part of the durations
+            if duration := task.get_duration():
+                self.durations.add(duration.total_seconds())
+                self.sketch.add(duration.total_seconds())
+
+    def merge(self, other: StepAccumulator) -> None:
+        self.count += other.count
+        for attr, func in (
+            ("first_start", min),
+            ("last_start", max),
+            ("last_end", max),
+        ):
+            values = [
+                v for v in (getattr(self, attr), getattr(other, attr)) if v is not None
+            ]
+            setattr(self, attr, func(values) if values else None)
+        self.durations.merge(other.durations)
+        self.sketch.merge(other.sketch)
+
+    def get_metrics(self) -> MutableMapping[str, Any]:
+        metrics = {
+            "name": self.name,
+            "instances_count": self.count,
+            "total_exec_seconds": (
+                (self.last_end - self.first_start).total_seconds()
+                if self.last_end is not None
+                else 0.0
+            ),
+            "instance_metrics": None,
+        }
+        if self.count > 1:
+            durations = self.durations
+            metrics["instance_metrics"] = {
+                "deploy_time_seconds": (
+                    self.last_start - self.first_start
+                ).total_seconds(),
+                "min_seconds": durations.min if durations.count else 0,
+                "max_seconds": durations.max if durations.count else 0,
+                "avg_seconds": durations.mean,
+                "std_seconds": durations.get_std(),
+                **{
+                    f"p{p}_seconds": self.sketch.get_quantile(p / 100) or 0
+                    for p in PERCENTILES
+                },
+            }
+        return metrics
+
+
+class StreamingStats:
+    """
+    Statistics computed in a single pass over the task completion events of the
+    translators. Only an accumulator for each step is kept, so the memory does not
+    depend on the number of tasks.
+    """
+
+    def __init__(self) -> None:
+        self.steps: MutableMapping[str, StepAccumulator] = {}
+        self.start_date: datetime | None = None
+        self.end_date: datetime | None = None
+
+    def add_task(self, step_name: str, task: Task) -> None:
+        if (step := self.steps.get(step_name)) is None:
+            step = self.steps[step_name] = StepAccumulator(step_name)
+        step.add(task)
+
+    def add_workflow(self, workflow: Workflow) -> None:
+        for step in workflow.steps:
+            for task in step.instances:
+                self.add_task(step.name, task)
+        self.set_dates(workflow.start_date, workflow.end_date)
+
+    def set_dates(self, start_date: datetime, end_date: datetime | None) -> None:
+        self.start_date = start_date
+        self.end_date = end_date
+
+    def merge(self, other: StreamingStats) -> None:
+        for name, other_step in other.steps.items():
+            if (step := self.steps.get(name)) is None:
+                step = self.steps[name] = StepAccumulator(name)
+            step.merge(other_step)
+
+    def empty(self) -> bool:
+        return not self.steps
+
+    def get_stats(self) -> MutableMapping[str, Any]:
+        duration = (
+            self.end_date - self.start_date
+            if self.start_date and self.end_date
+            else timedelta(0)
+        )
+        return {
+            "workflow": {
+                "total_instances": sum(s.count for s in self.steps.values()),
+                "start": str(self.start_date),
+                "end": str(self.end_date),
+                "duration_seconds": duration.total_seconds(),
+            },
+            "steps": [
+                self.steps[name].get_metrics() for name in sorted(self.steps.keys())
+            ],
+        }
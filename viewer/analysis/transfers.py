@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, MutableMapping, MutableSequence
+from typing import Any
+
+from viewer.core.entity import TransferData
+
+
+def get_link(transfer: TransferData) -> str:
+    return f"{transfer.src_location} -> {transfer.dst_location}"
+
+
+def get_link_stats(
+    transfers: Iterable[TransferData],
+) -> MutableSequence[MutableMapping[str, Any]]:
+    """Aggregates the completed transfers of each (source, destination) pair."""
+    links = {}
+    for transfer in transfers:
+        if transfer.end_time is None:
+            continue
+        link = links.setdefault(
+            (transfer.src_location, transfer.dst_location),
+            {
+                "source": transfer.src_location,
+                "destination": transfer.dst_location,
+                "count": 0,
+                "total_seconds": 0.0,
+                "max_seconds": 0.0,
+                "bytes": 0,
+                "sized_count": 0,
+                "sized_seconds": 0.0,
+            },
+        )
+        seconds = transfer.get_duration().total_seconds()
+        link["count"] += 1
+        link["total_seconds"] += seconds
+        link["max_seconds"] = max(link["max_seconds"], seconds)
+        if transfer.size is not None:
+            link["bytes"] += transfer.size
+            link["sized_count"] += 1
+            link["sized_seconds"] += seconds
+    result = []
+    for key in sorted(links.keys()):
+        link = links[key]
+        sized_count = link.pop("sized_count")
+        sized_seconds = link.pop("sized_seconds")
+        link["avg_seconds"] = link["total_seconds"] / link["count"]
+        # The sizes are known only for the transfers of the job inputs with a `size`
+        if not sized_count:
+            link["bytes"] = None
+        link["throughput_bytes_per_second"] = (
+            link["bytes"] / sized_seconds if sized_count and sized_seconds else None
+        )
+        result.append(link)
+    return result
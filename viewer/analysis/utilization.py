@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from collections.abc import MutableMapping, MutableSequence
+from typing import Any
+
+import numpy as np
+
+from viewer.analysis.queue import get_run_intervals
+from viewer.core.entity import Workflow
+
+# Number of longest idle windows reported for each location
+TOP_IDLE_WINDOWS = 5
+
+
+def merge_intervals(
+    starts: np.ndarray, ends: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Merges the overlapping intervals into busy periods, sorting them once by start."""
+    if not len(starts):
+        return starts, ends
+    order = np.argsort(starts, kind="stable")
+    starts, reach = starts[order], np.maximum.accumulate(ends[order])
+    # A busy period begins at each start after the end of all the previous intervals
+    first = np.flatnonzero(np.concatenate(([True], starts[1:] > reach[:-1])))
+    last = np.append(first[1:] - 1, len(starts) - 1)
+    return starts[first], reach[last]
+
+
+def get_location_utilization(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    makespan: float,
+    idle_threshold: float,
+) -> MutableMapping[str, Any]:
+    busy_starts, busy_ends = merge_intervals(starts, ends)
+    busy = float(np.sum(busy_ends - busy_starts))
+    # Idle gaps between the busy periods, i.e., within the active span of the location
+    gap_starts, gap_ends = busy_ends[:-1], busy_starts[1:]
+    gaps = gap_ends - gap_starts
+    idle = np.flatnonzero(gaps > idle_threshold)
+    top = idle[np.argsort(-gaps[idle], kind="stable")[:TOP_IDLE_WINDOWS]]
+    return {
+        "tasks": len(starts),
+        "first_start": float(busy_starts[0]),
+        "last_end": float(busy_ends[-1]),
+        "busy_seconds": busy,
+        "active_fraction": busy / makespan if makespan else 0.0,
+        "idle_gaps": len(idle),
+        "idle_seconds": float(gaps[idle].sum()),
+        "top_idle_windows": [
+            {
+                "start": float(gap_starts[i]),
+                "end": float(gap_ends[i]),
+                "seconds": float(gaps[i]),
+            }
+            for i in top
+        ],
+    }
+
+
+def get_utilization(
+    workflow: Workflow, idle_threshold: float
+) -> MutableSequence[MutableMapping[str, Any]]:
+    """Busy time and idle gaps longer than the threshold of each location."""
+    groups = {}
+    for step in workflow.steps:
+        for task in step.instances:
+            if task.end_time is not None:
+                groups.setdefault(task.get_location() or "unknown", []).append(task)
+    # The busy time of a window of the workflow is measured only within the window
+    lower = workflow.start_time.total_seconds()
+    upper = workflow.end_time.total_seconds() if workflow.end_time else lower
+    return [
+        {
+            "name": name,
+            **get_location_utilization(
+                *(
+                    np.clip(times, lower, upper)
+                    for times in get_run_intervals(groups[name])
+                ),
+                upper - lower,
+                idle_threshold,
+            ),
+        }
+        for name in sorted(groups)
+    ]
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import argparse
+import glob
+import html
+import json
+import os
+import time
+import traceback
+from collections.abc import Callable, MutableMapping, MutableSequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any
+
+from ruamel.yaml import YAML
+
+from viewer.cli.arguments import get_parser
+from viewer.core.utils import get_path
+from viewer.render.utils import save_file_log
+
+# Manifest keys holding paths, which are resolved relative to the manifest directory
+PATH_KEYS = {"inputs", "clusters-info", "style-config"}
+
+
+def _get_argv(entry: MutableMapping[str, Any]) -> MutableSequence[str]:
+    argv = [entry["style-config"]] if entry.get("style-config") else []
+    for key, value in entry.items():
+        if key in ("name", "style-config") or value is None or value is False:
+            continue
+        elif value is True:
+            argv.append(f"--{key}")
+        elif key == "format":
+            argv.extend([f"--{key}", *(value if isinstance(value, list) else [value])])
+        elif isinstance(value, list):
+            for v in value:
+                argv.extend([f"--{key}", str(v)])
+        else:
+            argv.extend([f"--{key}", str(value)])
+    return argv
+
+
+def _process_trace(
+    process: Callable[[argparse.Namespace], int], entry: MutableMapping[str, Any]
+) -> MutableMapping[str, Any]:
+    result = {"name": entry["name"], "outdir": entry["outdir"]}
+    start = time.perf_counter()
+    try:
+        os.makedirs(entry["outdir"], exist_ok=True)
+        process(get_parser().parse_args(_get_argv(entry)))
+        result["status"] = "completed"
+    except (Exception, SystemExit):
+        # A failing trace must not stop the batch, e.g., `SystemExit` of invalid options
+        result["status"] = "failed"
+        result["error"] = traceback.format_exc()
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def _resolve_path(path: str, basedir: Path) -> str:
+    path = os.path.expanduser(os.path.expandvars(path))
+    return path if os.path.isabs(path) else str(basedir / path)
+
+
+def _resolve(entry: MutableMapping[str, Any], basedir: Path) -> None:
+    for key in PATH_KEYS & entry.keys():
+        if isinstance(entry[key], list):
+            entry[key] = [_resolve_path(p, basedir) for p in entry[key]]
+        elif entry[key]:
+            entry[key] = _resolve_path(entry[key], basedir)
+
+
+def get_entries(args: argparse.Namespace) -> MutableSequence[MutableMapping[str, Any]]:
+    defaults = {
+        "input-type": args.input_type,
+        "wms": args.workflow_manager,
+        "clusters-info": args.clusters_info,
+        "style-config": args.style_config,
+        "format": args.format,
+        "filename": args.filename,
+        "save-stats": args.save_stats,
+    }
+    entries = []
+    if args.manifest:
+        manifest_path = Path(get_path(args.manifest))
+        with open(manifest_path) as f:
+            for i, item in enumerate(YAML(typ="safe").load(f) or []):
+                item = dict(item)
+                item.setdefault("name", f"trace-{i}")
+                if isinstance(item.get("inputs"), str):
+                    item["inputs"] = [item["inputs"]]
+                _resolve(item, manifest_path.parent)
+                entries.append({**defaults, **item})
+    for pattern in args.glob or []:
+        for path in sorted(glob.glob(get_path(pattern))):
+            # The trace is named after its parent directory, e.g., `runs/<name>/trace.log`
+            entries.append(
+                {
+                    **defaults,
+                    "name": os.path.basename(os.path.dirname(path)) or path,
+                    "inputs": [path],
+                }
+            )
+    names = {}
+    for entry in entries:
+        if (count := names.setdefault(entry["name"], 0)) > 0:
+            entry["name"] = f"{entry['name']}-{count}"
+        names[entry["name"]] = count + 1
+        entry["outdir"] = os.path.join(get_path(args.outdir), entry["name"])
+    return entries
+
+
+def _write_index(outdir: str, results: MutableSequence[MutableMapping[str, Any]]):
+    index_path = os.path.join(outdir, "index.json")
+    with open(index_path, "w") as f:
+        json.dump({"traces": results}, f, indent=4)
+    save_file_log(index_path, "index")
+    rows = []
+    for result in results:
+        name = html.escape(result["name"])
+        link = html.escape(os.path.relpath(result["outdir"], outdir))
+        rows.append(
+            f'<tr><td><a href="{link}/">{name}</a></td>'
+            f"<td>{result['status']}</td><td>{result['seconds']:.2f}s</td></tr>"
+        )
+    index_path = os.path.join(outdir, "index.html")
+    with open(index_path, "w") as f:
+        f.write(
+            "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            "<title>wf-viewer batch</title></head><body><table>"
+            "<tr><th>Trace</th><th>Status</th><th>Time</th></tr>"
+            f"{''.join(rows)}</table></body></html>"
+        )
+    save_file_log(index_path, "index")
+
+
+def batch(
+    args: argparse.Namespace, process: Callable[[argparse.Namespace], int]
+) -> int:
+    if not (entries := get_entries(args)):
+        raise Exception("No traces found")
+    outdir = get_path(args.outdir)
+    os.makedirs(outdir, exist_ok=True)
+    results = []
+    # The plotting libraries are imported by the first trace of each worker, and then
+    # reused by the following ones
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(_process_trace, process, e) for e in entries]
+        for future in as_completed(futures):
+            result = future.result()
+            if result["status"] == "failed":
+                print(f"ERROR: Trace {result['name']} failed:\n{result['error']}")
+            results.append(result)
+    results.sort(key=lambda r: r["name"])
+    _write_index(outdir, results)
+    failed = sum(r["status"] == "failed" for r in results)
+    print(
+        f"Processed {len(results)} traces: {len(results) - failed} completed, {failed} failed"
+    )
+    return 1 if failed else 0
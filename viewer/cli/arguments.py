@@ -1,9 +1,142 @@
 import argparse
 import os
+from datetime import datetime, timedelta
 
 from viewer.cli.schema import GroupingMode
 
 
+def parse_window(value: str) -> tuple[timedelta | None, timedelta | None]:
+    if ":" not in value:
+        raise argparse.ArgumentTypeError(f"Window {value} must be START:END")
+    start, end = value.split(":", 1)
+    try:
+        window = (
+            timedelta(seconds=float(start)) if start else None,
+            timedelta(seconds=float(end)) if end else None,
+        )
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Window {value} is not valid: {e}") from e
+    if None not in window and window[0] > window[1]:
+        raise argparse.ArgumentTypeError(f"Window {value} ends before it starts")
+    return window
+
+
+def parse_sample_size(value: str) -> int:
+    try:
+        size = int(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(
+            f"Sample size {value} is not valid: {e}"
+        ) from e
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"Sample size {value} must be at least 1")
+    return size
+
+
+def _add_style_arguments(group: argparse._ArgumentGroup) -> None:
+    """Style options shared by the commands rendering a report."""
+    group.add_argument(
+        "-m",
+        "--color-map",
+        action="append",
+        help="Format: StepName:Color (can be used multiple times)",
+    )
+    group.add_argument(
+        "-e",
+        "--excluded-steps",
+        action="append",
+        help="List of step names to exclude from the plots",
+    )
+    group.add_argument(
+        "-r",
+        "--renaming-steps",
+        action="append",
+        help="Map to rename steps CurrentName:NewName",
+    )
+    group.add_argument("-p", "--color-palette", type=str)
+    group.add_argument(
+        "-g",
+        "--group-by",
+        dest="grouping_mode",
+        choices=[
+            GroupingMode.TASK,
+            GroupingMode.STEP,
+            GroupingMode.AGGREGATE,
+            GroupingMode.BUCKETED,
+            GroupingMode.LOCATION,
+        ],
+        default=None,
+    )
+    group.add_argument(
+        "--buckets",
+        type=int,
+        default=None,
+        help="Number of time buckets of the bucketed grouping mode (default: 200)",
+    )
+    group.add_argument(
+        "-l",
+        "--legend",
+        type=lambda x: (str(x).lower() == "true"),
+        default=None,
+        help="Enable/disable legend (true/false)",
+    )
+    group.add_argument("-x", "--xlim", type=float, default=None)
+
+
+def _add_output_arguments(group: argparse._ArgumentGroup) -> None:
+    """Output options shared by the commands rendering a report."""
+    group.add_argument(
+        "-f",
+        "--format",
+        choices=["html", "eps", "pdf", "png"],
+        default=["html"],
+        nargs="*",
+        type=str,
+        help="Report format: (default: html)",
+    )
+    group.add_argument("-o", "--outdir", default=os.getcwd())
+    group.add_argument(
+        "--compact-html",
+        action="store_true",
+        help="Write plotly.js once in the output directory and encode the data in binary",
+    )
+    group.add_argument(
+        "--tiled-html",
+        action="store_true",
+        help="Write the HTML Gantt chart as a pyramid of tiles loaded while zooming",
+    )
+    group.add_argument(
+        "--force",
+        action="store_true",
+        help="Render all the outputs, also the ones unchanged since the last run",
+    )
+
+
+def _add_stats_arguments(group: argparse._ArgumentGroup) -> None:
+    """Statistics options shared by the commands rendering a report."""
+    group.add_argument(
+        "--show-stats", action="store_true", help="Show statistics on stdout"
+    )
+    group.add_argument(
+        "--save-stats", action="store_true", help="Save statistics in a JSON file"
+    )
+    group.add_argument(
+        "--idle-threshold",
+        type=float,
+        default=60.0,
+        help="Minimum idle time of a location, in seconds, reported as a gap "
+        "(default: 60)",
+    )
+    group.add_argument(
+        "--straggler-threshold",
+        type=float,
+        default=None,
+        help="Robust z-score (distance from the median duration of the step in scaled "
+        "MADs) above which a task is reported and highlighted as a straggler "
+        "(default: 3.5)",
+    )
+
+
 def get_parser():
     parser = argparse.ArgumentParser(description="Gantt Chart Generator")
 
@@ -17,57 +150,162 @@ def get_parser():
         "-i", "--inputs", action="append", required=True, help="Path to input files"
     )
     input_group.add_argument(
-        "-t", "--input-type", choices=["report", "log"], required=True
+        "-t", "--input-type", choices=["report", "log", "table"], required=True
     )
     input_group.add_argument(
         "-w",
         "--wms",
         dest="workflow_manager",
         choices=["streamflow", "cwltool", "cwltoil"],
-        required=True,
+        default=None,
+        help="Workflow manager that produced the inputs (not needed for tables)",
     )
     input_group.add_argument(
         "-c", "--clusters-info", type=str, default=None, help="Path to cluster info"
     )
+    input_group.add_argument(
+        "--window",
+        type=parse_window,
+        default=None,
+        help="Time window START:END in seconds from the workflow start "
+        "(either bound can be omitted)",
+    )
+    input_group.add_argument(
+        "-s",
+        "--steps",
+        dest="included_steps",
+        action="append",
+        help="Step name or glob to include (can be used multiple times)",
+    )
+    input_group.add_argument(
+        "-d",
+        "--deployments",
+        action="append",
+        help="Deployment to include (can be used multiple times)",
+    )
+    input_group.add_argument(
+        "--preview",
+        type=parse_sample_size,
+        default=None,
+        metavar="N",
+        help="Render a uniform sample of at most N tasks of each step, while the "
+        "statistics include all the tasks",
+    )
 
     # --- Group: Styling ---
     style_group = parser.add_argument_group("Style")
-    style_group.add_argument(
+    _add_style_arguments(style_group)
+
+    # --- Group: Output Settings ---
+    output_group = parser.add_argument_group("Outputs")
+    output_group.add_argument("-n", "--filename", default="gantt")
+    _add_output_arguments(output_group)
+
+    # --- Group: Statistics ---
+    stats_group = parser.add_argument_group("Statistics & Logging")
+    _add_stats_arguments(stats_group)
+    stats_group.add_argument(
+        "--stream-stats",
+        action="store_true",
+        help="Compute only the statistics, in a single pass with constant memory",
+    )
+    stats_group.add_argument(
+        "--save-table",
+        choices=["parquet", "arrow", "csv"],
+        default=[],
+        nargs="+",
+        help="Save the task table in columnar formats",
+    )
+
+    # --- Group: Profiling ---
+    profile_group = parser.add_argument_group("Profiling")
+    profile_group.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record time and memory usage of each phase and print a summary",
+    )
+    profile_group.add_argument(
+        "--save-profile",
+        action="store_true",
+        help="Save the profiling data in a JSON file (implies --profile)",
+    )
+    profile_group.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Also trace the peak memory allocated by each phase, which slows down "
+        "the phases (implies --profile)",
+    )
+    profile_group.add_argument(
+        "--cprofile",
+        dest="cprofile_phase",
+        type=str,
+        default=None,
+        help="Dump cProfile statistics of the given phase (implies --profile)",
+    )
+
+    return parser
+
+
+def get_serve_parser():
+    parser = argparse.ArgumentParser(
+        prog="wf-viewer serve",
+        description="Local HTTP service rendering reports of cached workflow traces",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=1024,
+        help="Maximum memory of the cached workflows in MiB (default: 1024)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of processes translating and rendering the traces",
+    )
+    return parser
+
+
+def get_batch_parser():
+    parser = argparse.ArgumentParser(
+        prog="wf-viewer batch",
+        description="Generate the reports of many traces in a pool of processes",
+    )
+    input_group = parser.add_argument_group("Inputs")
+    input_group.add_argument(
         "-m",
-        "--color-map",
-        action="append",
-        help="Format: StepName:Color (can be used multiple times)",
+        "--manifest",
+        type=str,
+        default=None,
+        help="Path to a YAML list of traces, each with the options of a single run",
     )
-    style_group.add_argument(
-        "-e",
-        "--excluded-steps",
+    input_group.add_argument(
+        "-g",
+        "--glob",
         action="append",
-        help="List of step names to exclude",
+        help="Glob of trace paths, named after their parent directory "
+        "(can be used multiple times)",
     )
-    style_group.add_argument(
-        "-r",
-        "--renaming-steps",
-        action="append",
-        help="Map to rename steps CurrentName:NewName",
+    input_group.add_argument(
+        "-t", "--input-type", choices=["report", "log", "table"], default=None
     )
-    style_group.add_argument("-p", "--color-palette", type=str)
-    style_group.add_argument(
-        "-g",
-        "--group-by",
-        dest="grouping_mode",
-        choices=[GroupingMode.TASK, GroupingMode.STEP, GroupingMode.AGGREGATE],
+    input_group.add_argument(
+        "-w",
+        "--wms",
+        dest="workflow_manager",
+        choices=["streamflow", "cwltool", "cwltoil"],
         default=None,
+        help="Workflow manager that produced the inputs (not needed for tables)",
     )
-    style_group.add_argument(
-        "-l",
-        "--legend",
-        type=lambda x: (str(x).lower() == "true"),
-        default=None,
-        help="Enable/disable legend (true/false)",
+    input_group.add_argument(
+        "-c", "--clusters-info", type=str, default=None, help="Path to cluster info"
+    )
+    input_group.add_argument(
+        "--style-config", default=None, help="Path to optional YAML configuration file"
     )
-    style_group.add_argument("-x", "--xlim", type=float, default=None)
 
-    # --- Group: Output Settings ---
     output_group = parser.add_argument_group("Outputs")
     output_group.add_argument("-n", "--filename", default="gantt")
     output_group.add_argument(
@@ -79,15 +317,207 @@ def get_parser():
         type=str,
         help="Report format: (default: html)",
     )
-    output_group.add_argument("-o", "--outdir", default=os.getcwd())
-
-    # --- Group: Statistics ---
-    stats_group = parser.add_argument_group("Statistics & Logging")
-    stats_group.add_argument(
-        "--show-stats", action="store_true", help="Show statistics on stdout"
+    output_group.add_argument(
+        "-o",
+        "--outdir",
+        default=os.getcwd(),
+        help="Output directory, with a sub-directory for each trace and the index",
     )
-    stats_group.add_argument(
+    output_group.add_argument(
         "--save-stats", action="store_true", help="Save statistics in a JSON file"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of processes",
+    )
+    return parser
+
+
+def get_diff_parser():
+    parser = argparse.ArgumentParser(
+        prog="wf-viewer diff",
+        description="Compare the statistics of a run with one or more baseline runs, "
+        "exiting with a non-zero code on regressions",
+    )
+    parser.add_argument(
+        "baselines",
+        nargs="+",
+        help="Statistics JSON files of the baseline runs (saved with --save-stats)",
+    )
+    parser.add_argument("current", help="Statistics JSON file of the current run")
+    parser.add_argument(
+        "-N",
+        "--last",
+        type=int,
+        default=None,
+        help="Compare with the median of the last N baselines, ordered by the "
+        "workflow start (default: all)",
+    )
+    parser.add_argument(
+        "-r",
+        "--rel-threshold",
+        type=float,
+        default=0.1,
+        help="Minimum relative increase of a duration to be a regression "
+        "(default: 0.1)",
+    )
+    parser.add_argument(
+        "-a",
+        "--abs-threshold",
+        type=float,
+        default=1.0,
+        help="Minimum absolute increase of a duration, in seconds, to be a "
+        "regression (default: 1.0)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="Path of a JSON file where to save the comparison",
+    )
+    return parser
+
+
+def get_ingest_parser():
+    parser = argparse.ArgumentParser(
+        prog="wf-viewer ingest",
+        description="Store a workflow trace as a run in a SQLite warehouse",
+    )
+    parser.add_argument("database", help="Path to the SQLite database")
+    parser.add_argument(
+        "-n",
+        "--name",
+        required=True,
+        help="Name of the run, which replaces a stored run with the same name",
+    )
+    parser.add_argument(
+        "-i", "--inputs", action="append", required=True, help="Path to input files"
+    )
+    parser.add_argument(
+        "-t", "--input-type", choices=["report", "log", "table"], required=True
+    )
+    parser.add_argument(
+        "-w",
+        "--wms",
+        dest="workflow_manager",
+        choices=["streamflow", "cwltool", "cwltoil"],
+        default=None,
+        help="Workflow manager that produced the inputs (not needed for tables)",
+    )
+    parser.add_argument(
+        "-c", "--clusters-info", type=str, default=None, help="Path to cluster info"
+    )
+    return parser
+
+
+def get_query_parser():
+    parser = argparse.ArgumentParser(
+        prog="wf-viewer query",
+        description="Aggregate the task durations of the runs stored in a SQLite "
+        "warehouse",
+    )
+    parser.add_argument("database", help="Path to the SQLite database")
+    parser.add_argument(
+        "--list-runs", action="store_true", help="List the stored runs and exit"
+    )
+    parser.add_argument(
+        "-r",
+        "--runs",
+        action="append",
+        help="Name of a run to include (can be used multiple times)",
+    )
+    parser.add_argument(
+        "-s",
+        "--steps",
+        dest="included_steps",
+        action="append",
+        help="Step name or glob to include (can be used multiple times)",
+    )
+    parser.add_argument(
+        "-d",
+        "--deployments",
+        action="append",
+        help="Deployment to include (can be used multiple times)",
+    )
+    parser.add_argument(
+        "--days",
+        type=float,
+        default=None,
+        help="Include only the tasks started in the last days",
+    )
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Include only the tasks started after the ISO date",
+    )
+    parser.add_argument(
+        "--until",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Include only the tasks started before the ISO date",
+    )
+    parser.add_argument(
+        "-g",
+        "--group-by",
+        choices=["run", "step", "location"],
+        default=["step"],
+        nargs="+",
+        help="Columns grouping the tasks (default: step)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="Path of a JSON or CSV file where to save the result",
+    )
+    return parser
+
+
+def get_render_parser():
+    parser = argparse.ArgumentParser(
+        prog="wf-viewer render",
+        description="Generate the report of a run stored in a SQLite warehouse",
+    )
+    parser.add_argument("database", help="Path to the SQLite database")
+    parser.add_argument("run", help="Name of the run")
+    parser.add_argument(
+        "--style-config", default=None, help="Path to optional YAML configuration file"
+    )
+
+    input_group = parser.add_argument_group("Inputs")
+    input_group.add_argument(
+        "--window",
+        type=parse_window,
+        default=None,
+        help="Time window START:END in seconds from the workflow start "
+        "(either bound can be omitted)",
+    )
+    input_group.add_argument(
+        "-s",
+        "--steps",
+        dest="included_steps",
+        action="append",
+        help="Step name or glob to include (can be used multiple times)",
+    )
+    input_group.add_argument(
+        "-d",
+        "--deployments",
+        action="append",
+        help="Deployment to include (can be used multiple times)",
+    )
+
+    style_group = parser.add_argument_group("Style")
+    _add_style_arguments(style_group)
+
+    output_group = parser.add_argument_group("Outputs")
+    output_group.add_argument(
+        "-n", "--filename", default=None, help="Name of the outputs (default: the run)"
+    )
+    _add_output_arguments(output_group)
 
+    stats_group = parser.add_argument_group("Statistics")
+    _add_stats_arguments(stats_group)
     return parser
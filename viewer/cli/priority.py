@@ -1,5 +1,4 @@
 import argparse
-import json
 import os
 from collections.abc import MutableMapping
 from pathlib import Path
@@ -8,39 +7,35 @@ from typing import Any
 from ruamel.yaml import YAML
 
 from viewer.cli.schema import OutputConfig, StyleConfig
+from viewer.core.accounting import JobAccountingStore
+from viewer.core.filtering import TaskFilter
 from viewer.core.utils import get_path
 
 
-def create_cluster_info(args: argparse.Namespace) -> MutableMapping[str, Any]:
-    clusters = {}
+def create_cluster_info(args: argparse.Namespace) -> JobAccountingStore:
+    files = {}
     if args.clusters_info:
         cluster_path = Path(args.clusters_info).resolve()
         with open(cluster_path) as f:
             yaml_data = YAML().load(f)
-        for loc_name, path in yaml_data.items():
-            if Path(path).is_absolute():
-                abs_path = Path(path).resolve()
-            else:
-                abs_path = cluster_path.parent / path
-            with open(abs_path) as f:
-                # Assumption: supported only SLURM and
-                # the files are all produced executing `sacct --json --jobs [JOB_ID]`
-                for job in json.load(f)["jobs"]:
-                    energy = None
-                    for resource in job["tres"]["allocated"]:
-                        if resource["type"] == "energy":
-                            energy = resource["count"]
-                    if energy is None:
-                        print("Job", job["job_id"], "has no energy report")
-                    elif float(energy) < 0:
-                        raise Exception(f"Job {job['job_id']} has negative energy")
-                    clusters.setdefault(loc_name, {})
-                    clusters[loc_name][job["job_id"]] = {
-                        "queue_starttime": job["time"]["submission"],
-                        "queue_endtime": job["time"]["start"],
-                        "avg_energy": float(energy) if energy else None,  # Joule
-                    }
-    return clusters
+        for loc_name, paths in yaml_data.items():
+            # Each location can have a single file or a list of files
+            for path in [paths] if isinstance(paths, str) else paths:
+                if Path(path).is_absolute():
+                    abs_path = Path(path).resolve()
+                else:
+                    abs_path = cluster_path.parent / path
+                files.setdefault(loc_name, []).append(str(abs_path))
+    return JobAccountingStore(files)
+
+
+def create_task_filter(args: argparse.Namespace) -> TaskFilter:
+    # The excluded steps are only hidden from the plots, hence they are not filtered
+    return TaskFilter(
+        included_steps=args.included_steps,
+        window=args.window,
+        deployments=args.deployments,
+    )
 
 
 def create_output_config(args: argparse.Namespace) -> OutputConfig:
@@ -48,6 +43,9 @@ def create_output_config(args: argparse.Namespace) -> OutputConfig:
         outdir=get_path(args.outdir),
         filename=args.filename,
         extension=args.format,
+        compact_html=args.compact_html,
+        use_cache=not args.force,
+        tiled_html=args.tiled_html,
     )
 
 
@@ -64,8 +62,10 @@ def create_style_config(args: argparse.Namespace) -> StyleConfig:
         "legend": args.legend,
         "color_palette": args.color_palette,
         "grouping_mode": args.grouping_mode,
+        "buckets": args.buckets,
         "xlim": args.xlim,
         "excluded_steps": args.excluded_steps,
+        "straggler_threshold": args.straggler_threshold,
     }
     config_data.update({k: v for k, v in cli_overrides.items() if v is not None})
 
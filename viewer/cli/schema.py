@@ -13,6 +13,8 @@ class GroupingMode(str, Enum):
     TASK = "task"
     STEP = "step"
     AGGREGATE = "aggregate"
+    BUCKETED = "bucketed"
+    LOCATION = "location"
 
 
 class StyleConfig(BaseModel):
@@ -27,6 +29,17 @@ class StyleConfig(BaseModel):
     color_map: MutableMapping[str, str] = Field(default_factory=dict, alias="color-map")
     xlim: int | None = None
     grouping_mode: GroupingMode = Field(default="step", alias="grouping-mode")
+    # Number of time buckets of the bucketed grouping mode
+    buckets: int = Field(default=200, gt=0)
+    critical_path: bool = Field(default=True, alias="critical-path")
+    concurrency_plot: bool = Field(default=True, alias="concurrency-plot")
+    transfer_lanes: bool = Field(default=True, alias="transfer-lanes")
+    queue_plot: bool = Field(default=True, alias="queue-plot")
+    power_plot: bool = Field(default=True, alias="power-plot")
+    # Robust z-score above which a task is a straggler of its step, None to disable
+    straggler_threshold: float | None = Field(
+        default=3.5, gt=0, alias="straggler-threshold"
+    )
 
 
 def load_style_config(file_path: str) -> StyleConfig:
@@ -48,11 +61,20 @@ def load_style_config(file_path: str) -> StyleConfig:
 
 class OutputConfig:
     def __init__(
-        self, outdir: str, filename: str, extension: MutableSequence[str]
+        self,
+        outdir: str,
+        filename: str,
+        extension: MutableSequence[str],
+        compact_html: bool = False,
+        use_cache: bool = True,
+        tiled_html: bool = False,
     ) -> None:
         self.outdir: str = outdir
         self.filename: str = filename
         self.extension: MutableSequence[str] = extension
+        self.compact_html: bool = compact_html
+        self.use_cache: bool = use_cache
+        self.tiled_html: bool = tiled_html
 
     def get_filepath(self, extension: str, prefix: str = "", postfix: str = "") -> str:
         filename = self.filename
@@ -62,3 +84,12 @@ class OutputConfig:
 
     def get_statspath(self) -> str:
         return os.path.join(self.outdir, f"{self.filename}.stats.json")
+
+    def get_tablepath(self, table_format: str) -> str:
+        return os.path.join(self.outdir, f"{self.filename}.tasks.{table_format}")
+
+    def get_cachepath(self) -> str:
+        return os.path.join(self.outdir, f"{self.filename}.cache.json")
+
+    def get_profilepath(self) -> str:
+        return os.path.join(self.outdir, f"{self.filename}.profile.json")
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections.abc import Iterable, MutableMapping, MutableSequence
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import repeat
+
+INDEX_VERSION = 1
+
+
+class JobRecord:
+    def __init__(
+        self,
+        job_id: int,
+        queue_start: timedelta,
+        queue_end: timedelta,
+        energy: float | None,
+    ) -> None:
+        self.job_id: int = job_id
+        # Offsets from the workflow start
+        self.queue_start: timedelta = queue_start
+        self.queue_end: timedelta = queue_end
+        self.energy: float | None = energy  # Joule
+
+
+def get_index_dir() -> str:
+    """The indexes are cached per user, since the sacct files can be read-only or shared."""
+    return os.path.join(
+        os.environ.get("XDG_CACHE_HOME")
+        or os.path.join(os.path.expanduser("~"), ".cache"),
+        "wf-viewer",
+        "accounting",
+    )
+
+
+def _get_index_path(path: str, index_dir: str) -> str:
+    digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]
+    return os.path.join(index_dir, f"{os.path.basename(path)}.{digest}.idx")
+
+
+def _get_date(timestamp: int) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def _parse_sacct(path: str) -> MutableMapping[str, list]:
+    # Assumption: supported only SLURM and
+    # the files are all produced executing `sacct --json --jobs [JOB_ID]`
+    with open(path) as f:
+        data = json.load(f)
+    jobs = {}
+    for job in data["jobs"]:
+        energy = None
+        for resource in job["tres"]["allocated"]:
+            if resource["type"] == "energy":
+                energy = resource["count"]
+        jobs[str(job["job_id"])] = [
+            job["time"]["submission"],
+            job["time"]["start"],
+            float(energy) if energy is not None else None,
+        ]
+    return jobs
+
+
+def _load_file(path: str, index_dir: str) -> MutableMapping[str, list]:
+    """Loads the compact index of a sacct file, (re)building it if it is stale."""
+    stat = os.stat(path)
+    index_path = _get_index_path(path, index_dir)
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+        if (
+            index["version"] == INDEX_VERSION
+            and index["size"] == stat.st_size
+            and index["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return index["jobs"]
+    except (OSError, ValueError, KeyError):
+        pass
+    jobs = _parse_sacct(path)
+    try:
+        os.makedirs(index_dir, exist_ok=True)
+        with open(index_path, "w") as f:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "jobs": jobs,
+                },
+                f,
+                separators=(",", ":"),
+            )
+    except OSError:
+        # The index is only an optimization, e.g., the cache can be read-only
+        pass
+    return jobs
+
+
+class JobAccountingStore:
+    """
+    SLURM accounting data indexed by (deployment, job id). The sacct files of a deployment
+    are loaded, concurrently, only when one of its jobs is requested for the first time.
+    Each file is reduced to a compact index, persisted in `index_dir` to speed up later
+    runs.
+    """
+
+    def __init__(
+        self,
+        files: MutableMapping[str, MutableSequence[str]],
+        index_dir: str | None = None,
+    ) -> None:
+        self.files: MutableMapping[str, MutableSequence[str]] = files
+        self.index_dir: str = index_dir or get_index_dir()
+        self._jobs: MutableMapping[str, MutableMapping[str, list]] = {}
+
+    def __contains__(self, deployment: str) -> bool:
+        return deployment in self.files
+
+    def load(self, deployments: Iterable[str]) -> None:
+        """Loads, concurrently, all the files of the given deployments not loaded yet."""
+        paths = [
+            (deployment, path)
+            for deployment in deployments
+            if deployment in self.files and deployment not in self._jobs
+            for path in self.files[deployment]
+        ]
+        for deployment, _ in paths:
+            self._jobs.setdefault(deployment, {})
+        if len(paths) > 1:
+            with ProcessPoolExecutor(
+                max_workers=min(len(paths), os.cpu_count() or 1)
+            ) as executor:
+                for (deployment, _), file_jobs in zip(
+                    paths,
+                    executor.map(
+                        _load_file, [path for _, path in paths], repeat(self.index_dir)
+                    ),
+                ):
+                    self._jobs[deployment].update(file_jobs)
+        else:
+            for deployment, path in paths:
+                self._jobs[deployment].update(_load_file(path, self.index_dir))
+
+    def get_jobs(
+        self, deployment: str, job_ids: Iterable[int], start_date: datetime
+    ) -> MutableMapping[int, JobRecord]:
+        """
+        Returns the records of the given jobs, with times relative to `start_date`. The
+        sacct times are UNIX timestamps, while a naive `start_date` is in local time.
+        """
+        self.load([deployment])
+        jobs = self._jobs[deployment]
+        if start_date.tzinfo is None:
+            start_date = start_date.astimezone()
+        records = {}
+        for job_id in job_ids:
+            if (job := jobs.get(str(job_id))) is None:
+                continue
+            submission, start, energy = job
+            if energy is None:
+                print("Job", job_id, "has no energy report")
+            elif energy < 0:
+                raise Exception(f"Job {job_id} has negative energy")
+            records[job_id] = JobRecord(
+                job_id=job_id,
+                queue_start=_get_date(submission) - start_date,
+                queue_end=_get_date(start) - start_date,
+                energy=energy,
+            )
+        return records
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import os
-from collections.abc import MutableMapping, MutableSequence
+from collections.abc import MutableMapping, MutableSequence, MutableSet
 from datetime import datetime, timedelta
 from enum import Enum
 
+from viewer.core.index import IntervalIndex
+
 
 class TaskStatus(Enum):
     COMPLETED = "completed"
@@ -77,7 +79,8 @@ class Task(Action):
         self.queue_times: MutableSequence[Action] = []
         self.energy: float | None = None
         self.status: TaskStatus = TaskStatus.COMPLETED
-        self.transfer_inputs: MutableMapping[str, TransferData]
+        # Input path -> transfer that moved it to the task location
+        self.transfer_inputs: MutableMapping[str, TransferData] = {}
 
     def get_energy(self) -> float:
         return self.energy
@@ -91,7 +94,7 @@ class Task(Action):
 
     def get_queue_time(self) -> timedelta | None:
         return (
-            sum(q.end_time - q.start_time for q in self.queue_times)
+            sum((q.end_time - q.start_time for q in self.queue_times), timedelta(0))
             if self.queue_times
             else None
         )
@@ -115,6 +118,7 @@ class TransferData(Action):
         self.src_location: str = src_location
         self.dst_path: str = dst_path
         self.dst_location: str = dst_location
+        self.size: int | None = None  # Bytes
 
 
 class Workflow:
@@ -124,6 +128,54 @@ class Workflow:
         self.start_time: timedelta = start_date - start_date
         self.end_time: timedelta = end_date - start_date
         self.steps: MutableSequence[Step] = []
+        self.transfers: MutableSequence[TransferData] = []
+        # Step name -> names of the steps it depends on
+        self.dependencies: MutableMapping[str, MutableSet[str]] = {}
+        self._index: IntervalIndex | None = None
+        self._indexed_tasks: MutableSequence[tuple[Step, Task]] = []
+
+    def add_dependency(self, source: str, target: str) -> None:
+        if source != target:
+            self.dependencies.setdefault(target, set()).add(source)
 
     def empty(self) -> bool:
         return len(self.steps) == 0
+
+    def get_index(self) -> IntervalIndex:
+        """Builds the interval index over the tasks on first use."""
+        if self._index is None:
+            self._indexed_tasks = [
+                (step, task)
+                for step in self.steps
+                for task in step.instances
+                if task.end_time is not None
+            ]
+            self._index = IntervalIndex(
+                [task.start_time.total_seconds() for _, task in self._indexed_tasks],
+                [task.end_time.total_seconds() for _, task in self._indexed_tasks],
+            )
+        return self._index
+
+    def get_window(self, start: timedelta | None, end: timedelta | None) -> Workflow:
+        """Returns a workflow with only the tasks overlapping the [start, end] window."""
+        start = start if start is not None else self.start_time
+        end = min(end, self.end_time) if end is not None else self.end_time
+        steps = {}
+        for i in self.get_index().query(start.total_seconds(), end.total_seconds()):
+            step, task = self._indexed_tasks[i]
+            steps.setdefault(step.name, Step(step.name, [])).instances.append(task)
+        # The task times stay relative to the start date, while the start time is the
+        # beginning of the window, from which the statistics measure the duration
+        window = Workflow(self.start_date, self.start_date + end)
+        window.start_time = max(start, self.start_time)
+        window.steps.extend(steps.values())
+        window.transfers.extend(
+            t
+            for t in self.transfers
+            if t.start_time <= end and (t.end_time is None or t.end_time >= start)
+        )
+        for target, sources in self.dependencies.items():
+            if target in steps:
+                for source in sources & steps.keys():
+                    window.add_dependency(source, target)
+        return window
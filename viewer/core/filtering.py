@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, MutableMapping, MutableSequence
+from datetime import timedelta
+from fnmatch import fnmatchcase
+
+from viewer.core.entity import Step, Task
+
+
+class TaskFilter:
+    """
+    Predicate applied by the translators while parsing, so that the steps and the tasks
+    that do not match are never stored. Step names support shell-style globs.
+    """
+
+    def __init__(
+        self,
+        included_steps: MutableSequence[str] | None = None,
+        window: tuple[timedelta | None, timedelta | None] | None = None,
+        deployments: MutableSequence[str] | None = None,
+    ) -> None:
+        self.included_steps: MutableSequence[str] = included_steps or []
+        self.window_start: timedelta | None = window[0] if window else None
+        self.window_end: timedelta | None = window[1] if window else None
+        self.deployments: MutableSequence[str] = deployments or []
+        self._steps_cache: MutableMapping[str, bool] = {}
+
+    def match_step(self, step_name: str) -> bool:
+        if (result := self._steps_cache.get(step_name)) is None:
+            result = not self.included_steps or any(
+                fnmatchcase(step_name, p) for p in self.included_steps
+            )
+            self._steps_cache[step_name] = result
+        return result
+
+    def match_deployment(self, deployment: str | None) -> bool:
+        return not self.deployments or deployment in self.deployments
+
+    def match_start(self, start: timedelta) -> bool:
+        return self.window_end is None or start <= self.window_end
+
+    def match_end(self, end: timedelta | None) -> bool:
+        return self.window_start is None or end is None or end >= self.window_start
+
+    def match_task(self, task: Task) -> bool:
+        return (
+            self.match_deployment(task.deployment)
+            and self.match_start(task.start_time)
+            and self.match_end(task.end_time)
+        )
+
+    def filter_steps(self, steps: Iterable[Step]) -> MutableSequence[Step]:
+        """Drops the tasks that do not match, and then the steps left without tasks."""
+        result = []
+        for step in steps:
+            if self.match_step(step.name):
+                step.instances = [t for t in step.instances if self.match_task(t)]
+                if step.instances:
+                    result.append(step)
+        return result
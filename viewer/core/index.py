@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from collections.abc import MutableSequence
+
+import numpy as np
+
+
+class _IntervalNode:
+    __slots__ = ("center", "by_start", "starts", "by_end", "ends", "left", "right")
+
+    def __init__(
+        self,
+        center: float,
+        by_start: np.ndarray,
+        starts: np.ndarray,
+        by_end: np.ndarray,
+        ends: np.ndarray,
+        left: _IntervalNode | None,
+        right: _IntervalNode | None,
+    ) -> None:
+        self.center: float = center
+        # Indices of the intervals containing the center, sorted by start ascending
+        self.by_start: np.ndarray = by_start
+        self.starts: np.ndarray = starts
+        # The same indices, sorted by end descending (`ends` holds the negated values)
+        self.by_end: np.ndarray = by_end
+        self.ends: np.ndarray = ends
+        self.left: _IntervalNode | None = left
+        self.right: _IntervalNode | None = right
+
+
+class IntervalIndex:
+    """
+    Static centered interval tree. It is built in O(n log n) and it returns the intervals
+    overlapping a window in O(log n + k), where k is the number of returned intervals.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray) -> None:
+        self.starts: np.ndarray = np.asarray(starts, dtype=np.float64)
+        self.ends: np.ndarray = np.asarray(ends, dtype=np.float64)
+        self.root: _IntervalNode | None = self._build(
+            np.arange(len(self.starts), dtype=np.int64)
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _build(self, indices: np.ndarray) -> _IntervalNode | None:
+        if len(indices) == 0:
+            return None
+        starts, ends = self.starts[indices], self.ends[indices]
+        center = float(np.median(np.concatenate((starts, ends))))
+        left, right = ends < center, starts > center
+        here = indices[~(left | right)]
+        by_start = here[np.argsort(self.starts[here], kind="stable")]
+        by_end = here[np.argsort(-self.ends[here], kind="stable")]
+        return _IntervalNode(
+            center=center,
+            by_start=by_start,
+            starts=self.starts[by_start],
+            by_end=by_end,
+            ends=-self.ends[by_end],
+            left=self._build(indices[left]),
+            right=self._build(indices[right]),
+        )
+
+    def query(self, start: float, end: float) -> np.ndarray:
+        """Returns the sorted indices of the intervals overlapping [start, end]."""
+        result: MutableSequence[np.ndarray] = []
+        nodes = [self.root]
+        while nodes:
+            if (node := nodes.pop()) is None:
+                continue
+            if end < node.center:
+                # Only the intervals starting before the end of the window overlap it
+                count = np.searchsorted(node.starts, end, side="right")
+                result.append(node.by_start[:count])
+                nodes.append(node.left)
+            elif start > node.center:
+                # Only the intervals ending after the start of the window overlap it
+                count = np.searchsorted(node.ends, -start, side="right")
+                result.append(node.by_end[:count])
+                nodes.append(node.right)
+            else:
+                result.append(node.by_start)
+                nodes.append(node.left)
+                nodes.append(node.right)
+        return (
+            np.sort(np.concatenate(result)) if result else np.array([], dtype=np.int64)
+        )
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import cProfile
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterator, MutableMapping, MutableSequence
+from contextlib import contextmanager
+from typing import Any
+
+
+class PhaseRecord:
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self.wall_seconds: float = 0.0
+        self.cpu_seconds: float = 0.0
+        # High-water mark of the process at the end of the phase, and how much the
+        # phase raised it, since the RSS of the phase alone is not available
+        self.max_rss_bytes: int = 0
+        self.rss_growth_bytes: int = 0
+        self.peak_traced_bytes: int | None = None
+        self.input_bytes: int | None = None
+        self.input_lines: int | None = None
+
+    def to_dict(self) -> MutableMapping[str, Any]:
+        data = {
+            "name": self.name,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "max_rss_bytes": self.max_rss_bytes,
+            "rss_growth_bytes": self.rss_growth_bytes,
+        }
+        if self.peak_traced_bytes is not None:
+            data["peak_traced_bytes"] = self.peak_traced_bytes
+        if self.input_bytes is not None:
+            data["input_bytes"] = self.input_bytes
+            data["input_lines"] = self.input_lines
+            data["bytes_per_second"] = (
+                self.input_bytes / self.wall_seconds if self.wall_seconds else None
+            )
+            data["lines_per_second"] = (
+                self.input_lines / self.wall_seconds if self.wall_seconds else None
+            )
+        return data
+
+
+def _get_peak_rss() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _iter_files(path: str) -> Iterator[str]:
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for file in files:
+                yield os.path.join(root, file)
+    elif os.path.isfile(path):
+        yield path
+
+
+def _count_lines(filepath: str) -> int:
+    lines = 0
+    with open(filepath, "rb") as fd:
+        while chunk := fd.read(1 << 20):
+            lines += chunk.count(b"\n")
+    return lines
+
+
+class Profiler:
+    def __init__(
+        self,
+        outdir: str,
+        filename: str,
+        cprofile_phase: str | None = None,
+        trace_memory: bool = False,
+    ):
+        self.outdir: str = outdir
+        self.filename: str = filename
+        self.cprofile_phase: str | None = cprofile_phase
+        # Tracing the allocations slows down the phases, hence it is opt-in
+        self.trace_memory: bool = trace_memory
+        self.records: MutableSequence[PhaseRecord] = []
+        self._stack: MutableSequence[PhaseRecord] = []
+
+    def start(self) -> None:
+        if self.trace_memory:
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        if self.trace_memory:
+            tracemalloc.stop()
+
+    def _update_traced_peak(self, record: PhaseRecord, peak: int | None) -> None:
+        if peak is not None:
+            record.peak_traced_bytes = max(record.peak_traced_bytes or 0, peak)
+
+    def _get_traced_peak(self) -> int | None:
+        return tracemalloc.get_traced_memory()[1] if self.trace_memory else None
+
+    def _reset_traced_peak(self) -> None:
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+
+    def get_record(self, name: str) -> PhaseRecord | None:
+        return next((r for r in self.records if r.name == name), None)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[PhaseRecord]:
+        record = PhaseRecord(name)
+        self.records.append(record)
+        if self._stack:
+            # Save the peak reached so far by the enclosing phase before resetting it
+            self._update_traced_peak(self._stack[-1], self._get_traced_peak())
+        self._reset_traced_peak()
+        self._stack.append(record)
+        profile = cProfile.Profile() if name == self.cprofile_phase else None
+        rss_start = _get_peak_rss()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+            record.wall_seconds = time.perf_counter() - wall_start
+            record.cpu_seconds = time.process_time() - cpu_start
+            record.max_rss_bytes = _get_peak_rss()
+            record.rss_growth_bytes = record.max_rss_bytes - rss_start
+            self._update_traced_peak(record, self._get_traced_peak())
+            self._stack.pop()
+            if self._stack:
+                self._update_traced_peak(self._stack[-1], record.peak_traced_bytes)
+            self._reset_traced_peak()
+            if profile is not None:
+                profile_path = os.path.join(self.outdir, f"{self.filename}.{name}.prof")
+                profile.dump_stats(profile_path)
+                print(f"Successfully saved cProfile dump to {profile_path}")
+
+    def set_throughput(self, name: str, paths: MutableSequence[str]) -> None:
+        """Attach the size of the input files to the record of a translation phase."""
+        if (record := self.get_record(name)) is None:
+            raise KeyError(f"Unknown profiling phase: {name}")
+        record.input_bytes, record.input_lines = 0, 0
+        for path in paths:
+            for filepath in _iter_files(path):
+                record.input_bytes += os.path.getsize(filepath)
+                record.input_lines += _count_lines(filepath)
+
+    def to_dict(self) -> MutableMapping[str, Any]:
+        return {"phases": [r.to_dict() for r in self.records]}
+
+
+_active_profiler: Profiler | None = None
+
+
+def set_profiler(profiler: Profiler | None) -> None:
+    global _active_profiler
+    _active_profiler = profiler
+
+
+def get_profiler() -> Profiler | None:
+    return _active_profiler
+
+
+@contextmanager
+def phase(name: str) -> Iterator[PhaseRecord | None]:
+    """Record a phase in the active profiler, if any. Otherwise, it is a no-op."""
+    if _active_profiler is None:
+        yield None
+    else:
+        with _active_profiler.phase(name) as record:
+            yield record
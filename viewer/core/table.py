@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterable, MutableMapping
+from datetime import datetime, timedelta
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from viewer.core.entity import Action, Step, Task, TaskStatus, Workflow
+from viewer.core.filtering import TaskFilter
+
+TABLE_FORMATS = ("parquet", "arrow", "csv")
+# Key of the workflow metadata in the Arrow schema and prefix of the CSV header line
+METADATA_KEY = "wf-viewer"
+# Times are expressed in seconds from the workflow start. The queue start and end are the
+# bounds of all the queue intervals of a task, which are listed in `queue_times` as JSON
+TABLE_COLUMNS = {
+    "step": "string",
+    "task": "string",
+    "start": "float64",
+    "end": "float64",
+    "queue_start": "float64",
+    "queue_end": "float64",
+    "queue_times": "string",
+    "energy": "float64",
+    "deployment": "string",
+    "service": "string",
+    "status": "string",
+}
+
+
+def _to_seconds(value: timedelta | None) -> float:
+    return value.total_seconds() if value is not None else np.nan
+
+
+def _to_timedelta(value: float) -> timedelta | None:
+    return timedelta(seconds=float(value)) if pd.notna(value) else None
+
+
+def _to_str(value: Any) -> str | None:
+    return str(value) if pd.notna(value) else None
+
+
+def _get_queue_times(row: Any) -> list[Action]:
+    if pd.notna(queue_times := getattr(row, "queue_times", None)):
+        return [
+            Action(_to_timedelta(start), _to_timedelta(end))
+            for start, end in json.loads(queue_times)
+        ]
+    # The tables without the queue intervals have only their bounds
+    elif pd.notna(row.queue_start):
+        return [Action(_to_timedelta(row.queue_start), _to_timedelta(row.queue_end))]
+    else:
+        return []
+
+
+def get_table_metadata(workflow: Workflow) -> MutableMapping[str, Any]:
+    return {
+        "start_date": workflow.start_date.isoformat(),
+        "end_date": workflow.end_date.isoformat() if workflow.end_date else None,
+        "dependencies": {
+            target: sorted(sources) for target, sources in workflow.dependencies.items()
+        },
+    }
+
+
+def workflow_to_table(workflow: Workflow) -> pd.DataFrame:
+    """Flattens the workflow into a table with a row for each task."""
+    columns = {name: [] for name in TABLE_COLUMNS}
+    for step in workflow.steps:
+        for task in step.instances:
+            columns["step"].append(step.name)
+            columns["task"].append(task.name)
+            columns["start"].append(_to_seconds(task.start_time))
+            columns["end"].append(_to_seconds(task.end_time))
+            columns["queue_start"].append(
+                _to_seconds(min(q.start_time for q in task.queue_times))
+                if task.queue_times
+                else np.nan
+            )
+            columns["queue_end"].append(
+                _to_seconds(max(q.end_time for q in task.queue_times))
+                if task.queue_times
+                else np.nan
+            )
+            columns["queue_times"].append(
+                json.dumps(
+                    [
+                        [_to_seconds(q.start_time), _to_seconds(q.end_time)]
+                        for q in task.queue_times
+                    ]
+                )
+                if task.queue_times
+                else None
+            )
+            columns["energy"].append(task.energy if task.energy is not None else np.nan)
+            columns["deployment"].append(task.deployment)
+            columns["service"].append(task.service)
+            columns["status"].append(task.status.value)
+    return pd.DataFrame(columns).astype(TABLE_COLUMNS)
+
+
+def table_to_workflow(
+    df: pd.DataFrame,
+    metadata: MutableMapping[str, Any],
+    task_filter: TaskFilter | None = None,
+) -> Workflow:
+    task_filter = task_filter or TaskFilter()
+    steps = {}
+    for row in df.itertuples(index=False):
+        if not task_filter.match_step(row.step):
+            continue
+        task = Task(
+            start=_to_timedelta(row.start),
+            end=_to_timedelta(row.end),
+            deployment=_to_str(row.deployment),
+            service=_to_str(row.service),
+            name=_to_str(row.task),
+        )
+        if not task_filter.match_task(task):
+            continue
+        task.queue_times.extend(_get_queue_times(row))
+        task.energy = float(row.energy) if pd.notna(row.energy) else None
+        task.status = TaskStatus(row.status)
+        steps.setdefault(row.step, Step(row.step, [])).instances.append(task)
+    start_date = datetime.fromisoformat(metadata["start_date"])
+    workflow = Workflow(
+        start_date,
+        (
+            datetime.fromisoformat(metadata["end_date"])
+            if metadata.get("end_date")
+            else start_date + timedelta(seconds=float(df["end"].max()))
+        ),
+    )
+    workflow.steps.extend(sorted(steps.values(), key=lambda x: x.get_start()))
+    for target, sources in metadata.get("dependencies", {}).items():
+        for source in sources:
+            workflow.add_dependency(source, target)
+    return workflow
+
+
+def _check_pyarrow(table_format: str) -> None:
+    if pa is None:
+        raise Exception(
+            f"Format {table_format} requires pyarrow. "
+            "Install it with `pip install wf-viewer[table]`"
+        )
+
+
+def get_table_format(path: str) -> str:
+    if (table_format := os.path.splitext(path)[1].lstrip(".")) not in TABLE_FORMATS:
+        raise ValueError(
+            f"Unknown table format of {path}. Supported: {', '.join(TABLE_FORMATS)}"
+        )
+    return table_format
+
+
+def write_table(
+    df: pd.DataFrame, metadata: MutableMapping[str, Any], path: str
+) -> None:
+    match table_format := get_table_format(path):
+        case "parquet" | "arrow":
+            _check_pyarrow(table_format)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata(
+                {**(table.schema.metadata or {}), METADATA_KEY: json.dumps(metadata)}
+            )
+            if table_format == "parquet":
+                pq.write_table(table, path)
+            else:
+                feather.write_feather(table, path)
+        case "csv":
+            with open(path, "w") as f:
+                f.write(f"# {METADATA_KEY}: {json.dumps(metadata)}\n")
+                df.to_csv(f, index=False)
+
+
+def read_table(
+    path: str, columns: Iterable[str] | None = None
+) -> tuple[pd.DataFrame, MutableMapping[str, Any]]:
+    """
+    Reads a task table and its metadata. When `columns` is given, only those columns are
+    read from the file, skipping the ones that the table does not have.
+    """
+    match table_format := get_table_format(path):
+        case "parquet" | "arrow":
+            _check_pyarrow(table_format)
+            if table_format == "parquet":
+                schema = pq.read_schema(path)
+            else:
+                with pa.memory_map(path) as source:
+                    schema = pa.ipc.open_file(source).schema
+            if columns is not None:
+                columns = [name for name in columns if name in schema.names]
+            if table_format == "parquet":
+                table = pq.read_table(path, columns=columns)
+            else:
+                table = feather.read_table(path, columns=columns)
+            metadata = json.loads(schema.metadata[METADATA_KEY.encode()])
+            df = table.to_pandas()
+        case "csv":
+            with open(path) as f:
+                header = f.readline()
+                if not header.startswith(f"# {METADATA_KEY}: "):
+                    raise Exception(f"File {path} is not a wf-viewer task table")
+                metadata = json.loads(header[len(f"# {METADATA_KEY}: ") :])
+                names = set(columns) if columns is not None else None
+                df = pd.read_csv(
+                    f,
+                    dtype=TABLE_COLUMNS,
+                    usecols=(lambda name: name in names) if names is not None else None,
+                )
+    return df, metadata
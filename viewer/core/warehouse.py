@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import MutableSequence
+from datetime import datetime, timedelta
+from typing import Any
+
+import pandas as pd
+
+from viewer.core.entity import Workflow
+from viewer.core.filtering import TaskFilter
+from viewer.core.table import (
+    TABLE_COLUMNS,
+    get_table_metadata,
+    table_to_workflow,
+    workflow_to_table,
+)
+
+# The tasks are the rows of the task table, with the absolute start time of each task
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    wms TEXT,
+    start_date TEXT NOT NULL,
+    end_date TEXT,
+    start_epoch REAL NOT NULL,
+    metadata TEXT NOT NULL,
+    ingested TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    step TEXT NOT NULL,
+    task TEXT,
+    start REAL,
+    "end" REAL,
+    queue_start REAL,
+    queue_end REAL,
+    queue_times TEXT,
+    energy REAL,
+    deployment TEXT,
+    service TEXT,
+    status TEXT NOT NULL,
+    start_epoch REAL
+);
+CREATE INDEX IF NOT EXISTS runs_start ON runs(start_epoch);
+CREATE INDEX IF NOT EXISTS tasks_run ON tasks(run_id);
+CREATE INDEX IF NOT EXISTS tasks_step ON tasks(step, start_epoch);
+CREATE INDEX IF NOT EXISTS tasks_location ON tasks(deployment, service, start_epoch);
+CREATE INDEX IF NOT EXISTS tasks_time ON tasks(start_epoch);
+"""
+TASK_COLUMNS = ", ".join(f'tasks."{name}"' for name in TABLE_COLUMNS)
+
+
+def _get_placeholders(values: MutableSequence[Any]) -> str:
+    return ", ".join("?" for _ in values)
+
+
+class Warehouse:
+    """
+    SQLite database of the task tables of many runs, indexed by step, location and time,
+    so that the tasks are selected across runs without translating the traces again.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.connection: sqlite3.Connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> Warehouse:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def add_run(self, name: str, workflow: Workflow, wms: str | None = None) -> int:
+        """Stores the workflow as the run `name`, replacing a previous run with the same name."""
+        df = workflow_to_table(workflow)
+        start_epoch = workflow.start_date.timestamp()
+        df["start_epoch"] = df["start"] + start_epoch
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False)
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM tasks WHERE run_id IN (SELECT id FROM runs WHERE name = ?)",
+                (name,),
+            )
+            self.connection.execute("DELETE FROM runs WHERE name = ?", (name,))
+            run_id = self.connection.execute(
+                "INSERT INTO runs (name, wms, start_date, end_date, start_epoch, "
+                "metadata, ingested) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    name,
+                    wms,
+                    workflow.start_date.isoformat(),
+                    workflow.end_date.isoformat() if workflow.end_date else None,
+                    start_epoch,
+                    json.dumps(get_table_metadata(workflow)),
+                    datetime.now().isoformat(),
+                ),
+            ).lastrowid
+            self.connection.executemany(
+                f"INSERT INTO tasks VALUES (?, {_get_placeholders(df.columns)})",
+                ((run_id, *row) for row in rows),
+            )
+        return run_id
+
+    def get_runs(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            "SELECT runs.name, runs.wms, runs.start_date, runs.end_date, "
+            "COUNT(tasks.run_id) AS tasks FROM runs "
+            "LEFT JOIN tasks ON tasks.run_id = runs.id "
+            "GROUP BY runs.id ORDER BY runs.start_epoch",
+            self.connection,
+        )
+
+    def get_tasks(
+        self,
+        runs: MutableSequence[str] | None = None,
+        steps: MutableSequence[str] | None = None,
+        deployments: MutableSequence[str] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        window: tuple[timedelta | None, timedelta | None] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Selects the tasks of the runs, whose step matches one of the globs, executed on
+        the deployments and started between `since` and `until`. The `window` is relative
+        to the start of each run, as in the translators.
+        """
+        conditions, params = [], []
+        if runs:
+            conditions.append(f"runs.name IN ({_get_placeholders(runs)})")
+            params.extend(runs)
+        if steps:
+            conditions.append(
+                "(" + " OR ".join("tasks.step GLOB ?" for _ in steps) + ")"
+            )
+            params.extend(steps)
+        if deployments:
+            conditions.append(f"tasks.deployment IN ({_get_placeholders(deployments)})")
+            params.extend(deployments)
+        if since is not None:
+            conditions.append("tasks.start_epoch >= ?")
+            params.append(since.timestamp())
+        if until is not None:
+            conditions.append("tasks.start_epoch <= ?")
+            params.append(until.timestamp())
+        if window is not None and window[0] is not None:
+            conditions.append('(tasks."end" IS NULL OR tasks."end" >= ?)')
+            params.append(window[0].total_seconds())
+        if window is not None and window[1] is not None:
+            conditions.append("tasks.start <= ?")
+            params.append(window[1].total_seconds())
+        df = pd.read_sql_query(
+            f"SELECT runs.name AS run, {TASK_COLUMNS} FROM tasks "
+            "JOIN runs ON runs.id = tasks.run_id"
+            + (f" WHERE {' AND '.join(conditions)}" if conditions else ""),
+            self.connection,
+            params=params,
+        )
+        return df.astype(TABLE_COLUMNS)
+
+    def get_workflow(
+        self,
+        run: str,
+        task_filter: TaskFilter | None = None,
+    ) -> Workflow:
+        """Builds the workflow of a run from the tasks selected by the filter."""
+        if (
+            row := self.connection.execute(
+                "SELECT metadata FROM runs WHERE name = ?", (run,)
+            ).fetchone()
+        ) is None:
+            raise ValueError(f"Run {run} is not in the warehouse {self.path}")
+        task_filter = task_filter or TaskFilter()
+        df = self.get_tasks(
+            runs=[run],
+            steps=task_filter.included_steps,
+            deployments=task_filter.deployments,
+            window=(task_filter.window_start, task_filter.window_end),
+        )
+        return table_to_workflow(
+            df.drop(columns="run"), json.loads(row[0]), task_filter
+        )
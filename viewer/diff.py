@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import json
+from collections.abc import Iterable, MutableMapping, MutableSequence
+from typing import Any
+
+import numpy as np
+
+from viewer.core.utils import get_path
+from viewer.render.utils import save_file_log
+
+# Metrics of each step compared between runs, `instances_count` must not change
+STEP_METRICS = ("instances_count", "total_exec_seconds")
+INSTANCE_METRICS = (
+    "avg_seconds",
+    "max_seconds",
+    "p50_seconds",
+    "p90_seconds",
+    "p99_seconds",
+)
+
+
+def _flatten(stats: MutableMapping[str, Any]) -> MutableMapping[str, float]:
+    """Returns the compared metrics of a statistics file as `<step>:<metric>` keys."""
+    metrics = {"workflow:duration_seconds": stats["workflow"]["duration_seconds"]}
+    for step in stats["steps"]:
+        for metric in STEP_METRICS:
+            metrics[f"{step['name']}:{metric}"] = step[metric]
+        for metric in INSTANCE_METRICS:
+            if (value := (step["instance_metrics"] or {}).get(metric)) is not None:
+                metrics[f"{step['name']}:{metric}"] = value
+    return metrics
+
+
+def load_stats(paths: Iterable[str]) -> MutableSequence[MutableMapping[str, Any]]:
+    runs = []
+    for path in paths:
+        with open(get_path(path)) as f:
+            runs.append(json.load(f))
+    return runs
+
+
+def get_baseline(
+    runs: Iterable[MutableMapping[str, Any]], last: int | None = None
+) -> MutableMapping[str, float]:
+    """
+    Median of each metric over the last runs, ignoring the runs without it. A metric
+    is in the baseline only if the most recent run or most of the runs have it, so a
+    step removed from the workflow is not reported as missing because of older runs.
+    """
+    runs = sorted(runs, key=lambda r: r["workflow"]["start"])
+    if last is not None:
+        runs = runs[-last:]
+    flats = [_flatten(run) for run in runs]
+    keys = list(dict.fromkeys(k for flat in flats for k in flat))
+    columns = {k: i for i, k in enumerate(keys)}
+    matrix = np.full((len(flats), len(keys)), np.nan)
+    for i, flat in enumerate(flats):
+        for key, value in flat.items():
+            matrix[i, columns[key]] = value
+    present = ~np.isnan(matrix)
+    selected = present[-1] | (2 * present.sum(axis=0) > len(flats))
+    medians = np.nanmedian(matrix[:, selected], axis=0)
+    return dict(zip(np.array(keys)[selected].tolist(), medians.tolist()))
+
+
+def _get_status(
+    metric: str,
+    baseline: float | None,
+    current: float | None,
+    rel_threshold: float,
+    abs_threshold: float,
+) -> str:
+    if baseline is None:
+        return "new"
+    elif current is None:
+        return "missing"
+    elif metric == "instances_count":
+        # The median of an even number of runs can be halfway between two counts
+        return "changed" if abs(current - baseline) >= 1 else "ok"
+    delta = current - baseline
+    if abs(delta) > abs_threshold and abs(delta) > rel_threshold * baseline:
+        return "regression" if delta > 0 else "improvement"
+    return "ok"
+
+
+def compare(
+    baseline: MutableMapping[str, float],
+    current: MutableMapping[str, float],
+    rel_threshold: float,
+    abs_threshold: float,
+) -> MutableSequence[MutableMapping[str, Any]]:
+    results = []
+    for key in dict.fromkeys([*baseline, *current]):
+        name, metric = key.rsplit(":", 1)
+        base_value, curr_value = baseline.get(key), current.get(key)
+        results.append(
+            {
+                "name": name,
+                "metric": metric,
+                "baseline": base_value,
+                "current": curr_value,
+                "status": _get_status(
+                    metric, base_value, curr_value, rel_threshold, abs_threshold
+                ),
+            }
+        )
+    return results
+
+
+def print_diff_report(results: Iterable[MutableMapping[str, Any]]) -> None:
+    for result in results:
+        if result["status"] == "ok":
+            continue
+        base_value, curr_value = result["baseline"], result["current"]
+        change = (
+            f" ({(curr_value - base_value) / base_value:+.1%})"
+            if base_value and curr_value is not None
+            else ""
+        )
+        print(
+            f"{result['status'].upper():<12} {result['name']} {result['metric']}: "
+            f"{base_value if base_value is not None else '-'} -> "
+            f"{curr_value if curr_value is not None else '-'}{change}"
+        )
+
+
+def diff(args: argparse.Namespace) -> int:
+    baseline = get_baseline(load_stats(args.baselines), args.last)
+    current = _flatten(load_stats([args.current])[0])
+    results = compare(baseline, current, args.rel_threshold, args.abs_threshold)
+    print_diff_report(results)
+    # A different number of instances, or a missing step, means that the runs are not
+    # comparable
+    failed = [r for r in results if r["status"] in ("regression", "changed", "missing")]
+    print(
+        f"Compared {len(results)} metrics: {len(failed)} failed, "
+        f"{sum(r['status'] == 'improvement' for r in results)} improvements"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, indent=4)
+        save_file_log(args.output, "diff")
+    return 1 if failed else 0
@@ -1,50 +1,220 @@
 #!/usr/bin/python3
 
+import copy
+import functools
 import sys
 
-from viewer.cli.arguments import get_parser
+from viewer.analysis.sampling import PreviewStats
+from viewer.analysis.streaming import StreamingStats
+from viewer.batch import batch
+from viewer.cli.arguments import (
+    get_batch_parser,
+    get_diff_parser,
+    get_ingest_parser,
+    get_parser,
+    get_query_parser,
+    get_render_parser,
+    get_serve_parser,
+)
 from viewer.cli.priority import (
     create_cluster_info,
     create_output_config,
     create_style_config,
+    create_task_filter,
 )
-from viewer.render.report import create_report
-from viewer.render.stats import create_stats
-from viewer.translator.cwltool.manager import cwltool_create_workflow
-from viewer.translator.streamflow.manager import sf_create_workflow
-from viewer.translator.toil.manager import toil_create_workflow
+from viewer.core.profiling import Profiler, phase, set_profiler
+from viewer.diff import diff
+from viewer.render.profile import create_profile_report
+from viewer.render.stats import create_stats, write_stats
+from viewer.translator.manager import create_workflow, stream_workflow
 
 
 def _main(args) -> int:
-    style_config = create_style_config(args)
-    out_config = create_output_config(args)
-    locations_metadata = create_cluster_info(args)
-
-    workflow = None
-    match args.workflow_manager:
-        case "streamflow":
-            workflow = sf_create_workflow(
-                args.input_type, args.inputs, locations_metadata
-            )
-        case "cwltool":
-            workflow = cwltool_create_workflow(args.input_type, args.inputs)
-        case "cwltoil":
-            workflow = toil_create_workflow(args.input_type, args.inputs)
-        case _:
-            raise NotImplementedError(args.workflow_manager)
+    with phase("config"):
+        style_config = create_style_config(args)
+        out_config = create_output_config(args)
+        task_filter = create_task_filter(args)
+    with phase("cluster-info"):
+        job_accounting = create_cluster_info(args)
+
+    if args.stream_stats:
+        return _stream_stats(args, out_config, job_accounting, task_filter)
+    if args.preview is not None:
+        return _preview(args, style_config, out_config, job_accounting, task_filter)
+
+    # The render libraries are imported only when the plots are needed
+    from viewer.render.report import create_report
+    from viewer.render.table import create_table
+
+    with phase("translate"):
+        workflow = create_workflow(
+            args.workflow_manager,
+            args.input_type,
+            args.inputs,
+            job_accounting,
+            task_filter,
+        )
+
+    if args.window:
+        with phase("window"):
+            workflow = workflow.get_window(*args.window)
 
     if workflow.empty():
         raise Exception("The workflow is empty")
 
-    create_stats(workflow, out_config, args.show_stats, args.save_stats)
-    create_report(workflow, out_config, style_config)
+    with phase("stats"):
+        create_stats(
+            workflow,
+            out_config,
+            args.show_stats,
+            args.save_stats,
+            args.idle_threshold,
+            style_config.straggler_threshold,
+        )
+    with phase("table"):
+        create_table(workflow, out_config, args.save_table)
+    with phase("report"):
+        create_report(workflow, out_config, style_config)
     return 0
 
 
+def _stream_stats(args, out_config, job_accounting, task_filter) -> int:
+    stats = StreamingStats()
+    with phase("translate"):
+        stream_workflow(
+            args.workflow_manager,
+            args.input_type,
+            args.inputs,
+            job_accounting,
+            stats,
+            task_filter,
+        )
+    if stats.empty():
+        raise Exception("The workflow is empty")
+    with phase("stats"):
+        write_stats(
+            stats.get_stats(),
+            out_config,
+            args.show_stats or not args.save_stats,
+            args.save_stats,
+        )
+    return 0
+
+
+def _preview(args, style_config, out_config, job_accounting, task_filter) -> int:
+    from viewer.render.report import create_report
+
+    stats = PreviewStats(args.preview)
+    with phase("translate"):
+        stream_workflow(
+            args.workflow_manager,
+            args.input_type,
+            args.inputs,
+            job_accounting,
+            stats,
+            task_filter,
+        )
+    if stats.empty():
+        raise Exception("The workflow is empty")
+    report_data = stats.get_stats()
+    print(
+        f"Preview of {report_data['preview']['sampled_instances']} out of "
+        f"{report_data['preview']['total_instances']} tasks"
+    )
+    if args.save_table:
+        print("WARNING: The task table is not saved in preview mode")
+    with phase("stats"):
+        if args.show_stats or args.save_stats:
+            write_stats(report_data, out_config, args.show_stats, args.save_stats)
+    # The sample keeps the durations of the tasks of each step, but not their number,
+    # so the plots of the counts and the sums of the tasks are not rendered
+    preview_config = copy.copy(out_config)
+    preview_config.filename = f"{out_config.filename}.preview"
+    with phase("report"):
+        create_report(
+            stats.get_workflow(),
+            preview_config,
+            style_config.model_copy(update={"critical_path": False}),
+            plots=("time",),
+        )
+    return 0
+
+
+def _serve(args) -> int:
+    from viewer.service.server import serve
+
+    return serve(args)
+
+
+def _ingest(args) -> int:
+    # The warehouse commands import pandas, which is not needed by the other commands
+    from viewer.warehouse import ingest
+
+    return ingest(args)
+
+
+def _query(args) -> int:
+    from viewer.warehouse import query
+
+    return query(args)
+
+
+def _render(args) -> int:
+    from viewer.warehouse import render
+
+    return render(args)
+
+
+def _profiled_main(args) -> int:
+    out_config = create_output_config(args)
+    profiler = Profiler(
+        out_config.outdir,
+        out_config.filename,
+        args.cprofile_phase,
+        args.profile_memory,
+    )
+    set_profiler(profiler)
+    profiler.start()
+    try:
+        with phase("total"):
+            result = _main(args)
+    finally:
+        profiler.stop()
+        set_profiler(None)
+    if profiler.get_record("translate") is not None:
+        profiler.set_throughput("translate", args.inputs)
+    create_profile_report(profiler, out_config, args.save_profile)
+    return result
+
+
+COMMANDS = {
+    "batch": (get_batch_parser, functools.partial(batch, process=_main)),
+    "diff": (get_diff_parser, diff),
+    "ingest": (get_ingest_parser, _ingest),
+    "query": (get_query_parser, _query),
+    "render": (get_render_parser, _render),
+    "serve": (get_serve_parser, _serve),
+}
+
+
 def run() -> int:
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        get_command_parser, command = COMMANDS[sys.argv[1]]
+        try:
+            sys.exit(command(get_command_parser().parse_args(sys.argv[2:])))
+        except KeyboardInterrupt:
+            sys.exit(130)
     parser = get_parser()
     try:
-        sys.exit(_main(parser.parse_args()))
+        args = parser.parse_args()
+        # The options of the profiler are useless without it, hence they enable it
+        profile = (
+            args.profile
+            or args.save_profile
+            or args.profile_memory
+            or args.cprofile_phase is not None
+        )
+        sys.exit(_profiled_main(args) if profile else _main(args))
     except KeyboardInterrupt:
         sys.exit(130)
     except Exception:
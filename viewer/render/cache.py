@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections.abc import MutableMapping
+from typing import Any
+
+import pandas as pd
+
+from viewer.core.entity import Workflow
+from viewer.core.table import get_table_metadata, workflow_to_table
+
+# Bumped when the rendering changes, so that the outputs of older versions are redone
+CACHE_VERSION = 1
+
+
+def get_fingerprint(*parts: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def get_data_fingerprint(workflow: Workflow) -> str:
+    """Fingerprint of the tasks, the dependencies and the transfers of the workflow."""
+    digest = hashlib.sha256(
+        pd.util.hash_pandas_object(workflow_to_table(workflow), index=False).to_numpy()
+    )
+    digest.update(json.dumps(get_table_metadata(workflow), sort_keys=True).encode())
+    for t in workflow.transfers:
+        digest.update(
+            f"{t.src_location}|{t.src_path}|{t.dst_location}|{t.dst_path}|"
+            f"{t.start_time}|{t.end_time}|{t.size}\n".encode()
+        )
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    Fingerprints of the outputs written in a directory, recorded in a sidecar file.
+    An output is fresh if it exists and was written with the same fingerprint.
+    """
+
+    def __init__(self, path: str, enabled: bool = True) -> None:
+        self.path: str = path
+        self.enabled: bool = enabled
+        self.entries: MutableMapping[str, str] = {}
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data["version"] == CACHE_VERSION:
+                self.entries = data["outputs"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def is_fresh(self, filepath: str, fingerprint: str) -> bool:
+        return (
+            self.enabled
+            and os.path.exists(filepath)
+            and self.entries.get(os.path.basename(filepath)) == fingerprint
+        )
+
+    def update(self, filepath: str, fingerprint: str) -> None:
+        self.entries[os.path.basename(filepath)] = fingerprint
+
+    def save(self) -> None:
+        with open(self.path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "outputs": self.entries}, f, indent=4)
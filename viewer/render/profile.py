@@ -0,0 +1,54 @@
+import json
+from typing import Any
+
+from viewer.cli.schema import OutputConfig
+from viewer.core.profiling import Profiler
+from viewer.render.utils import save_file_log
+
+
+def _format_bytes(value: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TiB"
+
+
+def print_profile_report(data: dict[str, Any]):
+    """Prints the per-phase profiling summary to the terminal."""
+    print(f"\n{'=' * 80}")
+    print("PROFILE SUMMARY")
+    print(
+        f"{'Phase':<28}{'Wall':>10}{'CPU':>10}{'Max RSS':>16}{'RSS growth':>16}"
+        f"{'Peak traced':>16}"
+    )
+    for record in data["phases"]:
+        traced = record.get("peak_traced_bytes")
+        print(
+            f"{record['name']:<28}"
+            f"{record['wall_seconds']:>9.4f}s"
+            f"{record['cpu_seconds']:>9.4f}s"
+            f"{_format_bytes(record['max_rss_bytes']):>16}"
+            f"{_format_bytes(record['rss_growth_bytes']):>16}"
+            f"{_format_bytes(traced) if traced is not None else '-':>16}"
+        )
+        if "input_bytes" in record and record["bytes_per_second"] is not None:
+            print(
+                f"{'':<28}{record['lines_per_second']:.0f} lines/s, "
+                f"{_format_bytes(record['bytes_per_second'])}/s "
+                f"({record['input_lines']} lines, "
+                f"{_format_bytes(record['input_bytes'])})"
+            )
+    print(f"{'=' * 80}\n")
+
+
+def create_profile_report(
+    profiler: Profiler, out_config: OutputConfig, save_profile: bool
+) -> None:
+    report_data = profiler.to_dict()
+    print_profile_report(report_data)
+    if save_profile:
+        profile_path = out_config.get_profilepath()
+        with open(profile_path, "w") as f:
+            json.dump(report_data, f, indent=4)
+        save_file_log(profile_path, "profile")
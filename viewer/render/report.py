@@ -1,20 +1,86 @@
 from __future__ import annotations
 
+import json
+from collections.abc import Collection, MutableMapping, MutableSequence
+from datetime import datetime
+
 import matplotlib.patheffects as path_effects
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 import plotly.io as pio
+from plotly.subplots import make_subplots
 
+from viewer.analysis.concurrency import (
+    Concurrency,
+    align,
+    get_location_concurrency,
+    get_step_concurrency,
+)
+from viewer.analysis.critical_path import get_critical_path
+from viewer.analysis.lanes import pack_lanes
+from viewer.analysis.power import PowerProfile, get_location_power
+from viewer.analysis.queue import (
+    QueueTable,
+    get_queue_concurrency,
+    get_queue_stats,
+    get_run_start,
+)
+from viewer.analysis.stragglers import get_straggler_mask
+from viewer.analysis.transfers import get_link
 from viewer.cli.schema import GroupingMode, OutputConfig, StyleConfig
 from viewer.core.entity import Workflow
+from viewer.core.profiling import phase
+from viewer.render.cache import RenderCache, get_data_fingerprint, get_fingerprint
+from viewer.render.tiles import get_tiles_directory, write_tiled_html
 from viewer.render.utils import save_file_log
 
+BUCKETS_COLORMAP = "viridis"
+CRITICAL_PATH_COLOR = "red"
+STRAGGLER_COLOR = "orange"
+TRANSFER_COLOR = "gray"
+PLOTS = ("time", "concurrency", "energy", "queue", "power")
+# Formats written with a plot besides the figures, e.g., its data series
+DATA_FORMATS = {"power": ["json"]}
+# Style fields that affect each plot, part of the fingerprints of its outputs
+STYLE_FIELDS = {
+    "time": {
+        "excluded_steps",
+        "renaming_steps",
+        "legend",
+        "color_palette",
+        "color_map",
+        "xlim",
+        "grouping_mode",
+        "buckets",
+        "critical_path",
+        "transfer_lanes",
+        "straggler_threshold",
+    },
+    "concurrency": {
+        "excluded_steps",
+        "renaming_steps",
+        "legend",
+        "color_palette",
+        "color_map",
+        "xlim",
+    },
+    "energy": {"excluded_steps", "legend", "color_palette", "grouping_mode", "xlim"},
+    "queue": {"excluded_steps", "renaming_steps", "legend", "color_palette", "xlim"},
+    "power": {"legend", "color_palette", "xlim"},
+}
+
 
-def _create_dataframe(workflow: Workflow, grouping_mode: GroupingMode) -> pd.DataFrame:
+def _create_dataframe(
+    workflow: Workflow,
+    grouping_mode: GroupingMode,
+    excluded_steps: Collection[str] = (),
+) -> pd.DataFrame:
     data = []
     match grouping_mode:
-        case GroupingMode.AGGREGATE:
+        case GroupingMode.AGGREGATE | GroupingMode.BUCKETED:
             for step in workflow.steps:
                 locs = step.get_locations()
                 data.append(
@@ -28,7 +94,7 @@ def _create_dataframe(workflow: Workflow, grouping_mode: GroupingMode) -> pd.Dat
                         "Locations": ",".join(locs) if locs else None,
                     }
                 )
-        case GroupingMode.STEP | GroupingMode.TASK:
+        case GroupingMode.STEP | GroupingMode.TASK | GroupingMode.LOCATION:
             for i, step in enumerate(workflow.steps):
                 for j, job in enumerate(step.instances):
                     if job.end_time is None:
@@ -39,8 +105,13 @@ def _create_dataframe(workflow: Workflow, grouping_mode: GroupingMode) -> pd.Dat
                         {
                             "Step": step.name,
                             "Start": workflow.start_date + job.start_time,
+                            "RunStart": workflow.start_date + get_run_start(job),
                             "Finish": workflow.start_date + job.end_time,
-                            "QueueTime": job.get_queue_time(),
+                            "QueueTime": (
+                                queue_time.total_seconds()
+                                if (queue_time := job.get_queue_time()) is not None
+                                else None
+                            ),
                             "Task": f"{step.name}_{j}",
                             "Energy": job.get_energy(),
                             "Duration": job.get_duration(),
@@ -49,7 +120,268 @@ def _create_dataframe(workflow: Workflow, grouping_mode: GroupingMode) -> pd.Dat
                     )
         case _:
             raise NotImplementedError(f"Unknown grouping mode: {grouping_mode}")
-    return pd.DataFrame(data)
+    df = pd.DataFrame(data)
+    if grouping_mode == GroupingMode.LOCATION:
+        df = _add_location_lanes(df, excluded_steps)
+    return df
+
+
+def _add_location_lanes(
+    df: pd.DataFrame, excluded_steps: Collection[str] = ()
+) -> pd.DataFrame:
+    """
+    Packs the tasks of each location in the fewest lanes, i.e., its occupied slots,
+    from the end of their queue wait. The tasks of the excluded steps are packed in
+    the lanes after the others, so that skipping them leaves no empty lanes. The `Row`
+    of a task is the position of its lane, sorted by location.
+    """
+    df = df.assign(Location=df["Location"].fillna("unknown"), LaneIndex=0)
+    excluded = df["Step"].isin(excluded_steps)
+    for _, group in df.groupby("Location"):
+        base, offset = group["RunStart"].min(), 0
+        for tasks in (group[~excluded[group.index]], group[excluded[group.index]]):
+            if len(tasks):
+                lanes = pack_lanes(
+                    (tasks["RunStart"] - base).dt.total_seconds().to_numpy(),
+                    (tasks["Finish"] - base).dt.total_seconds().to_numpy(),
+                )
+                df.loc[tasks.index, "LaneIndex"] = lanes + offset
+                offset += lanes.max() + 1
+    df["Row"] = df.groupby(["Location", "LaneIndex"]).ngroup()
+    df["Lane"] = df["Location"] + " #" + df["LaneIndex"].astype(str)
+    return df.sort_values("Row", kind="stable").reset_index(drop=True)
+
+
+def _get_straggler_column(df: pd.DataFrame, threshold: float) -> pd.Series:
+    """Flags the stragglers among the tasks of each step, from their run time."""
+    seconds = (df["Finish"] - df["RunStart"]).dt.total_seconds()
+    return seconds.groupby(df["Step"]).transform(
+        lambda d: get_straggler_mask(d.to_numpy(), threshold)
+    )
+
+
+def _get_location_ticks(df: pd.DataFrame) -> pd.DataFrame:
+    """The first lane of each location, labelled with the location."""
+    return df.drop_duplicates("Location")[["Location", "Lane", "Row"]]
+
+
+def _create_transfer_dataframe(workflow: Workflow) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "Link": get_link(transfer),
+                "Start": workflow.start_date + transfer.start_time,
+                "Finish": workflow.start_date + transfer.end_time,
+                "Path": transfer.dst_path,
+                "Size": transfer.size,
+            }
+            for transfer in workflow.transfers
+            if transfer.end_time is not None
+        ],
+        columns=["Link", "Start", "Finish", "Path", "Size"],
+    )
+
+
+def _create_compact_time_figure(
+    df: pd.DataFrame,
+    style: StyleConfig,
+    origin: datetime,
+    transfer_df: pd.DataFrame | None = None,
+) -> go.Figure:
+    # Times are offsets in seconds from the workflow start, as in the other formats, so
+    # that plotly serializes them as typed binary arrays instead of date strings
+    fig = go.Figure()
+    by_location = style.grouping_mode == GroupingMode.LOCATION
+    lanes = {}
+    for step_name, group in df.groupby("Step", sort=False):
+        lane = lanes.setdefault(step_name, len(lanes))
+        fig.add_trace(
+            go.Bar(
+                base=(group["Start"] - origin).dt.total_seconds().to_numpy(),
+                x=(group["Finish"] - group["Start"]).dt.total_seconds().to_numpy(),
+                # All the bars of the step are in its lane, without a y array, unless
+                # the lanes are the slots of the locations
+                y=group["Row"].to_numpy() if by_location else None,
+                y0=None if by_location else lane,
+                dy=None if by_location else 0,
+                orientation="h",
+                name=step_name,
+                text=(
+                    group["NTasks"].to_numpy()
+                    if style.grouping_mode == GroupingMode.AGGREGATE
+                    else None
+                ),
+            )
+        )
+    if "Straggler" in df.columns and df["Straggler"].any():
+        group = df[df["Straggler"]]
+        fig.add_trace(
+            go.Bar(
+                base=(group["Start"] - origin).dt.total_seconds().to_numpy(),
+                x=(group["Finish"] - group["Start"]).dt.total_seconds().to_numpy(),
+                y=(
+                    group["Row"] if by_location else group["Step"].map(lanes)
+                ).to_numpy(),
+                orientation="h",
+                name="Stragglers",
+                marker={
+                    "color": "rgba(0,0,0,0)",
+                    "line": {"color": STRAGGLER_COLOR, "width": 2},
+                },
+            )
+        )
+    if transfer_df is not None:
+        # The transfer lanes are below the lanes of the steps or of the locations
+        offset = df["Row"].max() + 1 - len(lanes) if by_location else 0
+        for link, group in transfer_df.groupby("Link", sort=False):
+            fig.add_trace(
+                go.Bar(
+                    base=(group["Start"] - origin).dt.total_seconds().to_numpy(),
+                    x=(group["Finish"] - group["Start"]).dt.total_seconds().to_numpy(),
+                    y0=offset + lanes.setdefault(link, len(lanes)),
+                    dy=0,
+                    orientation="h",
+                    name=f"Transfers {link}",
+                    marker_color=TRANSFER_COLOR,
+                )
+            )
+    fig.update_layout(barmode="overlay")
+    fig.update_xaxes(title_text="Time (seconds)", rangemode="tozero")
+    if by_location:
+        ticks = _get_location_ticks(df)
+        fig.update_yaxes(tickvals=ticks["Row"], ticktext=ticks["Location"])
+    return fig
+
+
+def _create_time_figure(
+    df: pd.DataFrame,
+    style: StyleConfig,
+    out_config: OutputConfig,
+    origin: datetime,
+    transfer_df: pd.DataFrame | None = None,
+) -> go.Figure:
+    if out_config.compact_html:
+        fig = _create_compact_time_figure(df, style, origin, transfer_df)
+    else:
+        fig = px.timeline(
+            df,
+            x_start="Start",
+            x_end="Finish",
+            y="Lane" if style.grouping_mode == GroupingMode.LOCATION else "Step",
+            color="Step",
+            text=("NTasks" if style.grouping_mode == GroupingMode.AGGREGATE else None),
+        )
+        if "Straggler" in df.columns and df["Straggler"].any():
+            fig.add_traces(
+                px.timeline(
+                    df[df["Straggler"]],
+                    x_start="Start",
+                    x_end="Finish",
+                    y=(
+                        "Lane"
+                        if style.grouping_mode == GroupingMode.LOCATION
+                        else "Step"
+                    ),
+                    hover_data=["Task", "Location"],
+                )
+                .update_traces(
+                    name="Stragglers",
+                    showlegend=True,
+                    marker={
+                        "color": "rgba(0,0,0,0)",
+                        "line": {"color": STRAGGLER_COLOR, "width": 2},
+                    },
+                )
+                .data
+            )
+        if transfer_df is not None:
+            fig.add_traces(
+                px.timeline(
+                    transfer_df,
+                    x_start="Start",
+                    x_end="Finish",
+                    y="Link",
+                    hover_data=["Path", "Size"],
+                    color_discrete_sequence=[TRANSFER_COLOR],
+                )
+                .update_traces(name="Transfers", showlegend=True)
+                .data
+            )
+    fig.update_yaxes(visible=style.grouping_mode == GroupingMode.LOCATION)
+    if "Critical" in df.columns:
+        critical_steps = set(df.loc[df["Critical"], "Step"])
+        fig.for_each_trace(
+            lambda t: t.update(marker_line={"color": CRITICAL_PATH_COLOR, "width": 3}),
+            selector=lambda t: t.name in critical_steps,
+        )
+    return fig
+
+
+def _write_html(fig: go.Figure, filepath: str, out_config: OutputConfig) -> None:
+    # With `directory`, plotly.js is written next to the report only if it is missing
+    pio.write_html(
+        fig,
+        filepath,
+        include_plotlyjs="directory" if out_config.compact_html else True,
+    )
+
+
+def _get_bucket_profiles(
+    workflow: Workflow, style: StyleConfig
+) -> MutableMapping[str, Concurrency]:
+    return {
+        name: profile
+        for name, profile in get_step_concurrency(workflow).items()
+        if name not in style.excluded_steps and len(profile.times)
+    }
+
+
+def _get_buckets(
+    workflow: Workflow, style: StyleConfig
+) -> tuple[np.ndarray, MutableSequence[str], np.ndarray]:
+    """
+    Returns the bucket edges, in seconds from the workflow start, the step names and the
+    average number of running tasks of each step in each bucket.
+    """
+    if not (profiles := _get_bucket_profiles(workflow, style)):
+        raise ValueError("Workflow has no steps to bucket")
+    start = min(p.times[0] for p in profiles.values())
+    end = max(p.times[-1] for p in profiles.values())
+    edges = np.linspace(start, max(end, start + 1e-3), style.buckets + 1)
+    matrix = np.vstack([p.get_buckets(edges) for p in profiles.values()])
+    names = [style.renaming_steps.get(name, name) for name in profiles.keys()]
+    return edges, names, matrix
+
+
+def _create_buckets_figure(workflow: Workflow, style: StyleConfig) -> go.Figure:
+    edges, names, matrix = _get_buckets(workflow, style)
+    fig = go.Figure(
+        go.Heatmap(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=names,
+            z=matrix,
+            colorscale=BUCKETS_COLORMAP.capitalize(),
+            colorbar={"title": {"text": "Running tasks"}},
+        )
+    )
+    fig.update_xaxes(title_text="Time (seconds)", rangemode="tozero")
+    fig.update_yaxes(autorange="reversed")
+    return fig
+
+
+def _rendering_buckets(workflow: Workflow, style: StyleConfig) -> None:
+    edges, names, matrix = _get_buckets(workflow, style)
+    fig, ax = plt.subplots(figsize=(10, 1 + 0.4 * len(names)))
+    mesh = ax.pcolormesh(
+        edges, np.arange(len(names) + 1), matrix, cmap=BUCKETS_COLORMAP
+    )
+    ax.set_yticks(np.arange(len(names)) + 0.5, names)
+    ax.invert_yaxis()
+    ax.set_xlim(0, style.xlim)
+    ax.set_xlabel("Time (seconds)")
+    if style.legend:
+        fig.colorbar(mesh, ax=ax, label="Running tasks")
+    plt.tight_layout()
 
 
 def _format_energy(joules: float | None) -> str:
@@ -80,11 +412,13 @@ def _format_energy(joules: float | None) -> str:
     return f"{watt_hours / 1e-3:.3f} mWh"
 
 
-def _rendering_energy(df: pd.DataFrame, style: StyleConfig) -> None:
+def _rendering_energy(df: pd.DataFrame, style: StyleConfig, origin: datetime) -> None:
     fig, ax = plt.subplots(figsize=(12, 7))
-    start_ts = df["Start"].min()
 
-    is_aggregate = style.grouping_mode == GroupingMode.AGGREGATE
+    is_aggregate = style.grouping_mode in (
+        GroupingMode.AGGREGATE,
+        GroupingMode.BUCKETED,
+    )
     color_key = "Locations" if is_aggregate else "Location"
 
     unique_locs = df[color_key].unique()
@@ -100,9 +434,14 @@ def _rendering_energy(df: pd.DataFrame, style: StyleConfig) -> None:
             continue
 
         duration = (row["Finish"] - row["Start"]).total_seconds()
-        offset = (row["Start"] - start_ts).total_seconds()
+        offset = (row["Start"] - origin).total_seconds()
 
-        label_y = row["Step"] if is_aggregate else row["Task"]
+        if is_aggregate:
+            label_y = row["Step"]
+        elif style.grouping_mode == GroupingMode.LOCATION:
+            label_y = row["Lane"]
+        else:
+            label_y = row["Task"]
         ax.barh(
             label_y,
             duration,
@@ -134,8 +473,7 @@ def _rendering_energy(df: pd.DataFrame, style: StyleConfig) -> None:
     ax.set_xlabel("Time (seconds)", fontsize=14)
     ax.set_title("Workflow Timeline", fontsize=16)
 
-    if style.xlim:
-        ax.set_xlim(0, style.xlim)
+    ax.set_xlim(0, style.xlim)
     ax.grid(True, axis="x", linestyle="--", alpha=0.3)
 
     # Legend
@@ -153,9 +491,13 @@ def _rendering_energy(df: pd.DataFrame, style: StyleConfig) -> None:
     plt.tight_layout()
 
 
-def _rendering_time(df: pd.DataFrame, style: StyleConfig) -> None:
+def _rendering_time(
+    df: pd.DataFrame,
+    style: StyleConfig,
+    origin: datetime,
+    transfer_df: pd.DataFrame | None = None,
+) -> None:
     fig, ax = plt.subplots(figsize=(10, 6))
-    start_ts = df["Start"].min()
     step_names = [s for s in df["Step"].unique() if s not in style.excluded_steps]
     colors = plt.colormaps[style.color_palette]
     step_color_map = {
@@ -171,9 +513,15 @@ def _rendering_time(df: pd.DataFrame, style: StyleConfig) -> None:
         step_name = style.renaming_steps.get(row["Step"], row["Step"])
 
         total_duration = (row["Finish"] - row["Start"]).total_seconds()
-        start_offset = (row["Start"] - start_ts).total_seconds()
-        label_y = row["Task"] if style.grouping_mode == GroupingMode.TASK else step_name
-        if row["QueueTime"]:
+        start_offset = (row["Start"] - origin).total_seconds()
+        match style.grouping_mode:
+            case GroupingMode.TASK:
+                label_y = row["Task"]
+            case GroupingMode.LOCATION:
+                label_y = row["Lane"]
+            case _:
+                label_y = step_name
+        if pd.notna(row.get("QueueTime")) and row["QueueTime"] > 0:
             ax.barh(
                 label_y,
                 row["QueueTime"],
@@ -199,6 +547,26 @@ def _rendering_time(df: pd.DataFrame, style: StyleConfig) -> None:
                 height=0.5,
                 color=step_color_map[row["Step"]],
             )
+        if row.get("Critical", False):
+            ax.barh(
+                label_y,
+                total_duration,
+                left=start_offset,
+                height=0.5,
+                fill=False,
+                edgecolor=CRITICAL_PATH_COLOR,
+                linewidth=2,
+            )
+        if row.get("Straggler", False):
+            ax.barh(
+                label_y,
+                total_duration,
+                left=start_offset,
+                height=0.5,
+                fill=False,
+                edgecolor=STRAGGLER_COLOR,
+                linewidth=2,
+            )
         if style.grouping_mode == GroupingMode.AGGREGATE:
             ax.text(
                 start_offset + 1,
@@ -210,11 +578,32 @@ def _rendering_time(df: pd.DataFrame, style: StyleConfig) -> None:
                 fontsize=14,
             )
 
+    # A lane for each link, below the steps
+    links = []
+    if transfer_df is not None:
+        links = list(transfer_df["Link"].unique())
+        for _, row in transfer_df.iterrows():
+            ax.barh(
+                row["Link"],
+                (row["Finish"] - row["Start"]).total_seconds(),
+                left=(row["Start"] - origin).total_seconds(),
+                height=0.5,
+                color=TRANSFER_COLOR,
+                alpha=0.5,
+            )
+
     # Axis
-    if style.xlim:
-        ax.set_xlim(right=style.xlim)
+    ax.set_xlim(0, style.xlim)
     ax.set_xlabel("Time (seconds)", fontsize=18)
-    ax.set_yticks([])
+    if style.grouping_mode == GroupingMode.LOCATION:
+        ticks = _get_location_ticks(df[df["Step"].isin(step_names)])
+        ax.set_yticks(
+            ax.yaxis.convert_units([*ticks["Lane"], *links]),
+            [*ticks["Location"], *links],
+        )
+    else:
+        # Only the transfer lanes are labelled, with their link
+        ax.set_yticks(ax.yaxis.convert_units(links), links)
     plt.xticks(rotation=45, fontsize=18)
     ax.grid(True, which="both", axis="x", linestyle="--", alpha=0.5)
 
@@ -231,9 +620,27 @@ def _rendering_time(df: pd.DataFrame, style: StyleConfig) -> None:
             )
             for s in step_names
         ]
+        labels = [style.renaming_steps.get(s, s) for s in step_names]
+        if "Critical" in df.columns and df["Critical"].any():
+            handles.append(
+                plt.Rectangle(
+                    (0, 0), 1, 1, fill=False, edgecolor=CRITICAL_PATH_COLOR, linewidth=2
+                )
+            )
+            labels.append("Critical path")
+        if "Straggler" in df.columns and df["Straggler"].any():
+            handles.append(
+                plt.Rectangle(
+                    (0, 0), 1, 1, fill=False, edgecolor=STRAGGLER_COLOR, linewidth=2
+                )
+            )
+            labels.append("Stragglers")
+        if transfer_df is not None:
+            handles.append(plt.Rectangle((0, 0), 1, 1, color=TRANSFER_COLOR, alpha=0.5))
+            labels.append("Transfers")
         ax.legend(
             handles,
-            [style.renaming_steps.get(s, s) for s in step_names],
+            labels,
             title="Steps",
             loc="lower right",
             fontsize=18,
@@ -243,48 +650,500 @@ def _rendering_time(df: pd.DataFrame, style: StyleConfig) -> None:
         )
 
 
+def _get_concurrency_groups(
+    workflow: Workflow, style: StyleConfig
+) -> MutableSequence[tuple[str, MutableMapping[str, Concurrency]]]:
+    groups = []
+    if steps := {
+        style.renaming_steps.get(name, name): profile
+        for name, profile in get_step_concurrency(workflow).items()
+        if name not in style.excluded_steps and len(profile.times)
+    }:
+        groups.append(("Steps", steps))
+    if set(locations := get_location_concurrency(workflow)) - {"unknown"}:
+        groups.append(("Locations", locations))
+    return groups
+
+
+def _create_concurrency_figure(workflow: Workflow, style: StyleConfig) -> go.Figure:
+    groups = _get_concurrency_groups(workflow, style)
+    fig = make_subplots(
+        rows=len(groups),
+        cols=1,
+        shared_xaxes=True,
+        subplot_titles=[title for title, _ in groups],
+    )
+    for row, (title, profiles) in enumerate(groups, start=1):
+        grid, levels = align(profiles)
+        for name, level in levels.items():
+            fig.add_trace(
+                go.Scatter(
+                    # Seconds from the workflow start, as in the other plots
+                    x=grid,
+                    y=level,
+                    name=name,
+                    legendgroup=title,
+                    stackgroup=title,
+                    line_shape="hv",
+                ),
+                row=row,
+                col=1,
+            )
+        fig.update_yaxes(title_text="Running tasks", row=row, col=1)
+    fig.update_xaxes(rangemode="tozero")
+    fig.update_xaxes(title_text="Time (seconds)", row=len(groups), col=1)
+    return fig
+
+
+def _rendering_concurrency(workflow: Workflow, style: StyleConfig) -> None:
+    groups = _get_concurrency_groups(workflow, style)
+    fig, axes = plt.subplots(
+        len(groups), 1, figsize=(10, 1 + 3 * len(groups)), sharex=True, squeeze=False
+    )
+    colors = plt.colormaps[style.color_palette]
+    for ax, (title, profiles) in zip(axes[:, 0], groups):
+        grid, levels = align(profiles)
+        ax.stackplot(
+            # Seconds from the workflow start, as in the other plots
+            grid,
+            *levels.values(),
+            labels=list(levels.keys()),
+            colors=[
+                style.color_map.get(name, colors(i)) for i, name in enumerate(levels)
+            ],
+            step="post",
+        )
+        ax.set_ylabel("Running tasks")
+        ax.set_title(title)
+        ax.grid(True, axis="x", linestyle="--", alpha=0.5)
+        if style.legend:
+            ax.legend(bbox_to_anchor=(1.02, 1), loc="upper left", frameon=False)
+    axes[-1, 0].set_xlim(0, style.xlim)
+    axes[-1, 0].set_xlabel("Time (seconds)")
+    plt.tight_layout()
+
+
+def _get_queue_data(
+    workflow: Workflow, style: StyleConfig
+) -> tuple[MutableMapping[str, Concurrency], MutableSequence[MutableMapping]]:
+    """Queued tasks of each deployment over time and the wait and run time of each step."""
+    steps = [
+        {**s, "name": style.renaming_steps.get(s["name"], s["name"])}
+        for s in get_queue_stats(workflow)["steps"]
+        if s["name"] not in style.excluded_steps
+    ]
+    return get_queue_concurrency(QueueTable(workflow)), steps
+
+
+def _create_queue_figure(workflow: Workflow, style: StyleConfig) -> go.Figure:
+    profiles, steps = _get_queue_data(workflow, style)
+    fig = make_subplots(
+        rows=2, cols=1, subplot_titles=["Queued tasks", "Wait and run time per step"]
+    )
+    grid, levels = align(profiles)
+    for name, level in levels.items():
+        fig.add_trace(
+            go.Scatter(
+                x=grid,
+                y=level,
+                name=name,
+                legendgroup="Deployments",
+                stackgroup="Deployments",
+                line_shape="hv",
+            ),
+            row=1,
+            col=1,
+        )
+    for label, key in (("Wait", "total_wait_seconds"), ("Run", "total_run_seconds")):
+        fig.add_trace(
+            go.Bar(
+                x=[s["name"] for s in steps],
+                y=[s[key] for s in steps],
+                name=label,
+                legendgroup="Steps",
+            ),
+            row=2,
+            col=1,
+        )
+    fig.update_layout(barmode="group", showlegend=style.legend)
+    fig.update_xaxes(title_text="Time (seconds)", rangemode="tozero", row=1, col=1)
+    fig.update_yaxes(title_text="Queued tasks", row=1, col=1)
+    fig.update_yaxes(title_text="Total time (seconds)", row=2, col=1)
+    return fig
+
+
+def _rendering_queue(workflow: Workflow, style: StyleConfig) -> None:
+    profiles, steps = _get_queue_data(workflow, style)
+    fig, (ax_queue, ax_steps) = plt.subplots(2, 1, figsize=(10, 7))
+    colors = plt.colormaps[style.color_palette]
+    grid, levels = align(profiles)
+    ax_queue.stackplot(
+        grid,
+        *levels.values(),
+        labels=list(levels.keys()),
+        colors=[colors(i) for i in range(len(levels))],
+        step="post",
+    )
+    ax_queue.set_xlabel("Time (seconds)")
+    ax_queue.set_ylabel("Queued tasks")
+    ax_queue.grid(True, axis="x", linestyle="--", alpha=0.5)
+    ax_queue.set_xlim(0, style.xlim)
+    positions = np.arange(len(steps))
+    for offset, (label, key) in zip(
+        (-0.2, 0.2), (("Wait", "total_wait_seconds"), ("Run", "total_run_seconds"))
+    ):
+        ax_steps.bar(
+            positions + offset, [s[key] for s in steps], width=0.4, label=label
+        )
+    ax_steps.set_xticks(positions, [s["name"] for s in steps], rotation=45, ha="right")
+    ax_steps.set_ylabel("Total time (seconds)")
+    if style.legend:
+        ax_queue.legend(bbox_to_anchor=(1.02, 1), loc="upper left", frameon=False)
+        ax_steps.legend(bbox_to_anchor=(1.02, 1), loc="upper left", frameon=False)
+    plt.tight_layout()
+
+
+def _create_power_figure(
+    profiles: MutableMapping[str, PowerProfile], style: StyleConfig
+) -> go.Figure:
+    fig = make_subplots(
+        rows=2,
+        cols=1,
+        shared_xaxes=True,
+        subplot_titles=["Power", "Cumulative energy"],
+    )
+    grid, levels = align(profiles)
+    for name, level in levels.items():
+        fig.add_trace(
+            go.Scatter(
+                x=grid,
+                y=level,
+                name=name,
+                legendgroup=name,
+                stackgroup="Power",
+                line_shape="hv",
+            ),
+            row=1,
+            col=1,
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=profiles[name].times,
+                # From joules to watt-hours
+                y=profiles[name].energy / 3600,
+                name=name,
+                legendgroup=name,
+                showlegend=False,
+            ),
+            row=2,
+            col=1,
+        )
+    fig.update_layout(showlegend=style.legend)
+    fig.update_yaxes(title_text="Power (W)", row=1, col=1)
+    fig.update_yaxes(title_text="Energy (Wh)", row=2, col=1)
+    fig.update_xaxes(rangemode="tozero")
+    fig.update_xaxes(title_text="Time (seconds)", row=2, col=1)
+    return fig
+
+
+def _rendering_power(
+    profiles: MutableMapping[str, PowerProfile], style: StyleConfig
+) -> None:
+    fig, (ax_power, ax_energy) = plt.subplots(2, 1, figsize=(10, 7), sharex=True)
+    colors = plt.colormaps[style.color_palette]
+    grid, levels = align(profiles)
+    ax_power.stackplot(
+        grid,
+        *levels.values(),
+        labels=list(levels.keys()),
+        colors=[colors(i) for i in range(len(levels))],
+        step="post",
+    )
+    for i, profile in enumerate(profiles.values()):
+        # From joules to watt-hours
+        ax_energy.plot(profile.times, profile.energy / 3600, color=colors(i))
+    ax_power.set_ylabel("Power (W)")
+    ax_energy.set_ylabel("Energy (Wh)")
+    ax_energy.set_xlabel("Time (seconds)")
+    for ax in (ax_power, ax_energy):
+        ax.grid(True, axis="x", linestyle="--", alpha=0.5)
+    ax_energy.set_xlim(0, style.xlim)
+    if style.legend:
+        ax_power.legend(bbox_to_anchor=(1.02, 1), loc="upper left", frameon=False)
+    plt.tight_layout()
+
+
+def _write_power_series(
+    profiles: MutableMapping[str, PowerProfile], filepath: str
+) -> None:
+    with open(filepath, "w") as f:
+        json.dump(
+            {
+                "locations": {
+                    name: {
+                        "times": profile.times.tolist(),
+                        "power_watts": profile.levels.tolist(),
+                        "energy_joules": profile.energy.tolist(),
+                        "total_energy_joules": profile.get_total_energy(),
+                    }
+                    for name, profile in profiles.items()
+                }
+            },
+            f,
+        )
+
+
+def _get_stale(
+    cache: RenderCache,
+    fingerprints: MutableMapping[str, str],
+    out_config: OutputConfig,
+    postfix: str = "",
+    tiles: bool = False,
+) -> MutableSequence[str]:
+    """
+    Returns the formats of the plot whose file is missing or outdated. With `tiles`, the
+    HTML page is fresh only if its tiles directory is too.
+    """
+    stale = []
+    for ext in fingerprints:
+        filepath = out_config.get_filepath(ext, postfix=postfix)
+        paths = [filepath]
+        if tiles and ext == "html":
+            paths.append(get_tiles_directory(filepath))
+        if all(cache.is_fresh(path, fingerprints[ext]) for path in paths):
+            print(f"Report {filepath} is up to date")
+        else:
+            stale.append(ext)
+    return stale
+
+
 def create_report(
-    workflow: Workflow, out_config: OutputConfig, style_config: StyleConfig
+    workflow: Workflow,
+    out_config: OutputConfig,
+    style_config: StyleConfig,
+    plots: Collection[str] = PLOTS,
 ) -> None:
-    df = _create_dataframe(workflow, style_config.grouping_mode)
-    if "html" in out_config.extension:
-        fig = px.timeline(
-            df,
-            x_start="Start",
-            x_end="Finish",
-            y="Step",
-            color="Step",
-            text=(
-                "NTasks"
-                if style_config.grouping_mode == GroupingMode.AGGREGATE
-                else None
-            ),
+    cache = RenderCache(out_config.get_cachepath(), out_config.use_cache)
+    with phase("report.fingerprint"):
+        data_fingerprint = get_data_fingerprint(workflow)
+    fingerprints = {
+        plot: {
+            ext: get_fingerprint(
+                plot,
+                ext,
+                data_fingerprint,
+                style_config.model_dump(
+                    include=STYLE_FIELDS[plot], mode="json", warnings=False
+                ),
+                (
+                    (out_config.compact_html, out_config.tiled_html)
+                    if ext == "html"
+                    else None
+                ),
+            )
+            for ext in [*out_config.extension, *DATA_FORMATS.get(plot, [])]
+        }
+        for plot in plots
+    }
+    # The outputs without data are never written, so they are not expected, or they
+    # would never be up to date
+    tasks = [t for s in workflow.steps for t in s.instances]
+    # The time buckets and the tiles are drawn only from the steps that are not excluded
+    if (
+        "time" in plots
+        and (
+            style_config.grouping_mode == GroupingMode.BUCKETED
+            or (out_config.tiled_html and "html" in fingerprints["time"])
         )
-        fig.update_yaxes(visible=False)
-        filepath = out_config.get_filepath("html")
-        pio.write_html(fig, filepath)
+        and not _get_bucket_profiles(workflow, style_config)
+    ):
+        if style_config.grouping_mode == GroupingMode.BUCKETED:
+            print("WARNING: Workflow has no steps to plot in the time buckets")
+            fingerprints["time"] = {}
+        else:
+            print("WARNING: Workflow has no steps to plot in the tiled HTML")
+            del fingerprints["time"]["html"]
+    if (
+        "concurrency" in plots
+        and style_config.concurrency_plot
+        and not _get_concurrency_groups(workflow, style_config)
+    ):
+        print("WARNING: Workflow has no steps or locations to plot the concurrency")
+        fingerprints["concurrency"] = {}
+    if not any(t.energy is not None for t in tasks):
+        if "energy" in plots:
+            print("WARNING: Workflow steps do not have energy information")
+            fingerprints["energy"] = {}
+        # The power plot is skipped silently along with the energy plot
+        if "power" in plots:
+            if "energy" not in plots and style_config.power_plot:
+                print("WARNING: Workflow tasks do not have energy information")
+            fingerprints["power"] = {}
+    elif "energy" in plots and fingerprints["energy"].pop("html", None):
+        print("WARNING: Format HTML does not available for energy plot")
+    if (
+        "queue" in plots
+        and style_config.queue_plot
+        and not any(t.queue_times for t in tasks)
+    ):
+        print("WARNING: Workflow tasks do not have queue times")
+        fingerprints["queue"] = {}
+    time_exts = (
+        _get_stale(cache, fingerprints["time"], out_config, tiles=out_config.tiled_html)
+        if "time" in plots
+        else []
+    )
+    concurrency_exts = (
+        _get_stale(
+            cache,
+            fingerprints["concurrency"],
+            out_config,
+            ".concurrency",
+        )
+        if "concurrency" in plots and style_config.concurrency_plot
+        else []
+    )
+    energy_exts = (
+        _get_stale(cache, fingerprints["energy"], out_config, ".energy")
+        if "energy" in plots
+        else []
+    )
+    queue_exts = (
+        _get_stale(cache, fingerprints["queue"], out_config, ".queue")
+        if "queue" in plots and style_config.queue_plot
+        else []
+    )
+    power_exts = (
+        _get_stale(cache, fingerprints["power"], out_config, ".power")
+        if "power" in plots and style_config.power_plot
+        else []
+    )
+    if not any((time_exts, concurrency_exts, energy_exts, queue_exts, power_exts)):
+        return
+
+    with phase("report.dataframe"):
+        df = _create_dataframe(
+            workflow, style_config.grouping_mode, style_config.excluded_steps
+        )
+    if style_config.critical_path and (critical_path := get_critical_path(workflow)):
+        df["Critical"] = df["Step"].isin(critical_path.steps)
+    if style_config.straggler_threshold is not None and "Task" in df.columns:
+        df["Straggler"] = _get_straggler_column(df, style_config.straggler_threshold)
+    transfer_df = None
+    if style_config.transfer_lanes and workflow.transfers:
+        transfer_df = _create_transfer_dataframe(workflow)
+    if "html" in time_exts:
+        with phase("report.time.html"):
+            filepath = out_config.get_filepath("html")
+            if out_config.tiled_html:
+                if dropped := [
+                    name
+                    for name, drawn in (
+                        ("transfer lanes", transfer_df is not None),
+                        ("critical path", "Critical" in df),
+                        ("stragglers", "Straggler" in df and df["Straggler"].any()),
+                    )
+                    if drawn
+                ]:
+                    print(
+                        f"WARNING: The tiled HTML does not draw: {', '.join(dropped)}"
+                    )
+                write_tiled_html(workflow, style_config, out_config, filepath)
+                cache.update(
+                    get_tiles_directory(filepath), fingerprints["time"]["html"]
+                )
+            elif style_config.grouping_mode == GroupingMode.BUCKETED:
+                _write_html(
+                    _create_buckets_figure(workflow, style_config), filepath, out_config
+                )
+            else:
+                _write_html(
+                    _create_time_figure(
+                        df, style_config, out_config, workflow.start_date, transfer_df
+                    ),
+                    filepath,
+                    out_config,
+                )
+        cache.update(filepath, fingerprints["time"]["html"])
         save_file_log(filepath, "report")
 
-    if extensions := [e for e in out_config.extension if e != "html"]:
-        _rendering_time(df, style_config)
+    if extensions := [e for e in time_exts if e != "html"]:
+        with phase("report.time.draw"):
+            if style_config.grouping_mode == GroupingMode.BUCKETED:
+                _rendering_buckets(workflow, style_config)
+            else:
+                _rendering_time(df, style_config, workflow.start_date, transfer_df)
         for ext in extensions:
             filepath = out_config.get_filepath(ext)
-            plt.tight_layout()
-            plt.savefig(filepath)
+            with phase(f"report.time.{ext}"):
+                plt.tight_layout()
+                plt.savefig(filepath)
+            cache.update(filepath, fingerprints["time"][ext])
             save_file_log(filepath, "report")
         plt.close()
 
-    if any(row["Energy"] is not None for _, row in df.iterrows()):
-        if extensions := [e for e in out_config.extension]:
-            _rendering_energy(df, style_config)
-            for ext in extensions:
-                if ext == "html":
-                    print("WARNING: Format HTML does not available for energy plot")
-                    continue
-                filepath = out_config.get_filepath(ext, postfix=".energy")
+    for ext in concurrency_exts:
+        filepath = out_config.get_filepath(ext, postfix=".concurrency")
+        with phase(f"report.concurrency.{ext}"):
+            if ext == "html":
+                _write_html(
+                    _create_concurrency_figure(workflow, style_config),
+                    filepath,
+                    out_config,
+                )
+            else:
+                _rendering_concurrency(workflow, style_config)
+                plt.savefig(filepath)
+                plt.close()
+        cache.update(filepath, fingerprints["concurrency"][ext])
+        save_file_log(filepath, "report")
+
+    if energy_exts:
+        with phase("report.energy.draw"):
+            _rendering_energy(df, style_config, workflow.start_date)
+        for ext in energy_exts:
+            filepath = out_config.get_filepath(ext, postfix=".energy")
+            with phase(f"report.energy.{ext}"):
                 plt.tight_layout()
                 plt.savefig(filepath)
-                save_file_log(filepath, "report")
-            plt.close()
-    else:
-        print("WARNING: Workflow steps do not have energy information")
+            cache.update(filepath, fingerprints["energy"][ext])
+            save_file_log(filepath, "report")
+        plt.close()
+
+    for ext in queue_exts:
+        filepath = out_config.get_filepath(ext, postfix=".queue")
+        with phase(f"report.queue.{ext}"):
+            if ext == "html":
+                _write_html(
+                    _create_queue_figure(workflow, style_config),
+                    filepath,
+                    out_config,
+                )
+            else:
+                _rendering_queue(workflow, style_config)
+                plt.savefig(filepath)
+                plt.close()
+        cache.update(filepath, fingerprints["queue"][ext])
+        save_file_log(filepath, "report")
+
+    if power_exts:
+        profiles = get_location_power(workflow)
+        for ext in power_exts:
+            filepath = out_config.get_filepath(ext, postfix=".power")
+            with phase(f"report.power.{ext}"):
+                match ext:
+                    case "json":
+                        _write_power_series(profiles, filepath)
+                    case "html":
+                        _write_html(
+                            _create_power_figure(profiles, style_config),
+                            filepath,
+                            out_config,
+                        )
+                    case _:
+                        _rendering_power(profiles, style_config)
+                        plt.savefig(filepath)
+                        plt.close()
+            cache.update(filepath, fingerprints["power"][ext])
+            save_file_log(filepath, "report")
+    cache.save()
@@ -4,6 +4,13 @@ from collections.abc import MutableMapping
 from datetime import timedelta
 from typing import Any
 
+from viewer.analysis.concurrency import get_concurrency, get_intervals, sweep
+from viewer.analysis.critical_path import get_critical_path
+from viewer.analysis.queue import get_queue_stats
+from viewer.analysis.stragglers import get_stragglers
+from viewer.analysis.streaming import PERCENTILES
+from viewer.analysis.transfers import get_link_stats
+from viewer.analysis.utilization import get_utilization
 from viewer.cli.schema import OutputConfig
 from viewer.core.entity import Step, Workflow
 from viewer.render.utils import save_file_log
@@ -20,10 +27,16 @@ def get_step_metrics(step: Step) -> MutableMapping[str, Any]:
         "total_exec_seconds": duration_total.total_seconds(),
         "instance_metrics": None,
     }
+    concurrency = sweep(*get_intervals(step.instances))
+    metrics["concurrency"] = {
+        "peak": concurrency.get_peak(),
+        "average": concurrency.get_average(),
+    }
 
     if len(step.instances) > 1:
         instance_starts = [inst.start_time for inst in step.instances]
         deploy_time = max(instance_starts) - min(instance_starts)
+        seconds = sorted(d.total_seconds() for d in durations)
 
         metrics["instance_metrics"] = {
             "deploy_time_seconds": deploy_time.total_seconds(),
@@ -38,6 +51,15 @@ def get_step_metrics(step: Step) -> MutableMapping[str, Any]:
                 if durations
                 else 0
             ),
+            "std_seconds": statistics.stdev(seconds) if len(seconds) > 1 else 0.0,
+            # The lower of the two values around each percentile, as in the sketch of
+            # the streaming statistics
+            **{
+                f"p{p}_seconds": (
+                    seconds[int(p / 100 * (len(seconds) - 1))] if seconds else 0
+                )
+                for p in PERCENTILES
+            },
         }
     return metrics
 
@@ -55,48 +77,194 @@ def print_terminal_report(data: dict[str, Any]):
             print(f"Deploy Time:    {m['deploy_time_seconds']:.4f}s")
             print(f"Range [m/M]:    {m['min_seconds']:.4f}s / {m['max_seconds']:.4f}s")
             print(f"Average:        {m['avg_seconds']:.4f}s")
+            if "std_seconds" in m:
+                print(f"Std Dev:        {m['std_seconds']:.4f}s")
+                print(
+                    "Percentiles:    "
+                    + ", ".join(
+                        f"{k.split('_')[0]} {v:.4f}s"
+                        for k, v in m.items()
+                        if k.startswith("p") and k.endswith("_seconds")
+                    )
+                )
+        if c := step.get("concurrency"):
+            print(f"Concurrency:    peak {c['peak']}, average {c['average']:.2f}")
+
+        if "slack_seconds" in step:
+            print(f"Slack:          {step['slack_seconds']:.4f}s")
+
+    if critical_path := data.get("critical_path"):
+        print(f"\n{'=' * 40}")
+        print("CRITICAL PATH")
+        print(f"Length:         {critical_path['length_seconds']:.4f}s")
+        print(f"Steps:          {' -> '.join(critical_path['steps'])}")
+
+    if transfers := data.get("transfers"):
+        print(f"\n{'=' * 40}")
+        print("TRANSFERS")
+        for link in transfers:
+            print(f"Link:           {link['source']} -> {link['destination']}")
+            print(
+                f"Copies:         {link['count']} in {link['total_seconds']:.4f}s "
+                f"(avg {link['avg_seconds']:.4f}s, max {link['max_seconds']:.4f}s)"
+            )
+            if link["bytes"] is not None:
+                throughput = link["throughput_bytes_per_second"]
+                print(
+                    f"Data:           {link['bytes']} bytes"
+                    + (f", {throughput:.2f} B/s" if throughput is not None else "")
+                )
+
+    if queue := data.get("queue"):
+        print(f"\n{'=' * 40}")
+        print("QUEUE")
+        for title, key in (("Step", "steps"), ("Deployment", "deployments")):
+            for group in queue[key]:
+                ratio = group["wait_to_run_ratio"]
+                print(f"{title + ':':<16}{group['name']}")
+                print(
+                    f"Wait:           {group['total_wait_seconds']:.4f}s "
+                    f"(avg {group['mean_wait_seconds']:.4f}s, "
+                    f"p95 {group['p95_wait_seconds']:.4f}s)"
+                    + (f", {ratio:.2f} of the run time" if ratio is not None else "")
+                )
+        print(
+            f"Queue Only:     {queue['workflow']['queue_only_seconds']:.4f}s "
+            f"({queue['workflow']['queue_only_fraction']:.1%} of the workflow)"
+        )
+        print(f"Peak Queued:    {queue['workflow']['peak_queued']}")
+
+    if utilization := data.get("utilization"):
+        print(f"\n{'=' * 40}")
+        print(f"UTILIZATION (idle > {utilization['idle_threshold_seconds']}s)")
+        for loc in utilization["locations"]:
+            print(f"Location:       {loc['name']}")
+            print(
+                f"Busy:           {loc['busy_seconds']:.4f}s "
+                f"({loc['active_fraction']:.1%} of the workflow)"
+            )
+            print(
+                f"Idle:           {loc['idle_seconds']:.4f}s in {loc['idle_gaps']} gaps"
+            )
+            for window in loc["top_idle_windows"]:
+                print(
+                    f"  {window['start']:.4f}s - {window['end']:.4f}s "
+                    f"({window['seconds']:.4f}s)"
+                )
+
+    if stragglers := data.get("stragglers"):
+        print(f"\n{'=' * 40}")
+        print(f"STRAGGLERS (score > {stragglers['threshold']})")
+        for task in stragglers["tasks"]:
+            print(f"Step:           {task['step']}")
+            print(f"Task:           {task['task']} on {task['location'] or 'unknown'}")
+            print(
+                f"Duration:       {task['duration_seconds']:.4f}s "
+                f"(median {task['step_median_seconds']:.4f}s, "
+                f"score {task['score']:.2f})"
+            )
 
     print(f"\n{'=' * 40}")
     print("WORKFLOW SUMMARY")
+    if preview := data.get("preview"):
+        print(
+            f"Preview:        {preview['sampled_instances']} sampled tasks, "
+            f"at most {preview['sample_size']} per step"
+        )
     print(f"Total Steps:    {data['workflow']['total_instances']}")
     print(f"Start:          {data['workflow']['start']}")
     print(f"End:            {data['workflow']['end']}")
     print(f"Total Duration: {data['workflow']['duration_seconds']:.4f}s")
+    if "peak_concurrency" in data["workflow"]:
+        print(f"Peak Conc.:     {data['workflow']['peak_concurrency']}")
+        print(f"Average Conc.:  {data['workflow']['average_concurrency']:.2f}")
     print(f"{'=' * 40}\n")
 
 
+def get_stats(
+    workflow: Workflow,
+    idle_threshold: float = 60.0,
+    straggler_threshold: float | None = 3.5,
+) -> MutableMapping[str, Any]:
+    steps_data = [
+        get_step_metrics(s) for s in sorted(workflow.steps, key=lambda s: s.name)
+    ]
+    total_instances = sum(s["instances_count"] for s in steps_data)
+    duration = (
+        workflow.end_time - workflow.start_time if workflow.end_date else timedelta(0)
+    )
+
+    concurrency = get_concurrency(workflow)
+
+    report_data = {
+        "workflow": {
+            "total_instances": total_instances,
+            "start": str(workflow.start_date + workflow.start_time),
+            "end": str(workflow.end_date),
+            "duration_seconds": duration.total_seconds(),
+            "peak_concurrency": concurrency.get_peak(),
+            "average_concurrency": concurrency.get_average(),
+        },
+        "steps": steps_data,
+    }
+
+    if (critical_path := get_critical_path(workflow)) is not None:
+        for step_data in steps_data:
+            step_data["slack_seconds"] = critical_path.slack[
+                step_data["name"]
+            ].total_seconds()
+        report_data["critical_path"] = {
+            "steps": critical_path.steps,
+            "length_seconds": critical_path.length.total_seconds(),
+        }
+    if workflow.transfers:
+        report_data["transfers"] = get_link_stats(workflow.transfers)
+    if (queue := get_queue_stats(workflow)) is not None:
+        report_data["queue"] = queue
+    utilization = get_utilization(workflow, idle_threshold)
+    if {loc["name"] for loc in utilization} != {"unknown"}:
+        report_data["utilization"] = {
+            "idle_threshold_seconds": idle_threshold,
+            "locations": utilization,
+        }
+    if straggler_threshold is not None and (
+        stragglers := get_stragglers(workflow, straggler_threshold)
+    ):
+        report_data["stragglers"] = {
+            "threshold": straggler_threshold,
+            "tasks": stragglers,
+        }
+    return report_data
+
+
 def create_stats(
     workflow: Workflow,
     out_config: OutputConfig,
     show_stats: bool,
     save_stats: bool,
+    idle_threshold: float = 60.0,
+    straggler_threshold: float | None = 3.5,
 ) -> None:
     if show_stats or save_stats:
-        steps_data = [
-            get_step_metrics(s) for s in sorted(workflow.steps, key=lambda s: s.name)
-        ]
-        total_instances = sum(s["instances_count"] for s in steps_data)
-        duration = (
-            workflow.end_date - workflow.start_date
-            if workflow.end_date
-            else timedelta(0)
+        write_stats(
+            get_stats(workflow, idle_threshold, straggler_threshold),
+            out_config,
+            show_stats,
+            save_stats,
         )
 
-        report_data = {
-            "workflow": {
-                "total_instances": total_instances,
-                "start": str(workflow.start_date),
-                "end": str(workflow.end_date),
-                "duration_seconds": duration.total_seconds(),
-            },
-            "steps": steps_data,
-        }
 
-        if show_stats:
-            print_terminal_report(report_data)
+def write_stats(
+    report_data: MutableMapping[str, Any],
+    out_config: OutputConfig,
+    show_stats: bool,
+    save_stats: bool,
+) -> None:
+    if show_stats:
+        print_terminal_report(report_data)
 
-        if save_stats:
-            stats_path = out_config.get_statspath()
-            with open(stats_path, "w") as f:
-                json.dump(report_data, f, indent=4)
-            save_file_log(stats_path, "stats")
+    if save_stats:
+        stats_path = out_config.get_statspath()
+        with open(stats_path, "w") as f:
+            json.dump(report_data, f, indent=4)
+        save_file_log(stats_path, "stats")
@@ -0,0 +1,18 @@
+from collections.abc import MutableSequence
+
+from viewer.cli.schema import OutputConfig
+from viewer.core.entity import Workflow
+from viewer.core.table import get_table_metadata, workflow_to_table, write_table
+from viewer.render.utils import save_file_log
+
+
+def create_table(
+    workflow: Workflow, out_config: OutputConfig, formats: MutableSequence[str]
+) -> None:
+    if formats:
+        df = workflow_to_table(workflow)
+        metadata = get_table_metadata(workflow)
+        for table_format in formats:
+            table_path = out_config.get_tablepath(table_format)
+            write_table(df, metadata, table_path)
+            save_file_log(table_path, "table")
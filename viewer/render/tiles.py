@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from collections.abc import MutableSequence
+from typing import Any
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.colors import to_hex
+from plotly.offline import get_plotlyjs
+
+from viewer.analysis.concurrency import Concurrency, get_step_concurrency
+from viewer.cli.schema import OutputConfig, StyleConfig
+from viewer.core.entity import Workflow
+
+# Buckets of each lane in a tile of the aggregated levels
+TILE_BUCKETS = 256
+# The first level whose tiles overlap at most these tasks, or whose tiles are
+# narrower than the tasks, holds the tasks themselves
+MAX_TILE_TASKS = 5000
+MAX_LEVELS = 12
+# Tiles kept in the memory of the browser
+MAX_CACHED_TILES = 64
+
+# The tiles are scripts calling `wfTile`, which, unlike JSON, can be loaded from file://
+TILED_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<script src="plotly.min.js"></script>
+<style>html, body, #plot {{ height: 100%; margin: 0; }}</style>
+</head>
+<body>
+<div id="plot"></div>
+<script>
+const index = {index};
+const cache = new Map();
+const pending = new Map();
+let current = null;
+let requests = 0;
+
+function wfTile(level, tile, data) {{
+  const key = `${{level}}/${{tile}}`;
+  cache.set(key, data);
+  (pending.get(key) || (() => {{}}))();
+}}
+
+function loadTile(level, tile) {{
+  const key = `${{level}}/${{tile}}`;
+  if (cache.has(key)) {{
+    const data = cache.get(key);
+    cache.delete(key);
+    cache.set(key, data);
+    return Promise.resolve(data);
+  }}
+  if (!index.tiles[level].includes(tile)) {{
+    return Promise.resolve(null);
+  }}
+  return new Promise((resolve) => {{
+    const script = document.createElement("script");
+    const done = () => {{
+      pending.delete(key);
+      script.remove();
+      while (cache.size > {max_cached}) {{
+        cache.delete(cache.keys().next().value);
+      }}
+      resolve(cache.get(key) || null);
+    }};
+    pending.set(key, done);
+    script.onerror = done;
+    script.src = `${{index.directory}}/${{key}}.js`;
+    document.head.appendChild(script);
+  }});
+}}
+
+function getAggregatedTraces(level, first, tiles) {{
+  const width = index.span / 2 ** level;
+  const step = width / index.buckets;
+  const x = [];
+  const z = index.lanes.map(() => []);
+  tiles.forEach((tile, i) => {{
+    for (let b = 0; b < index.buckets; b++) {{
+      x.push((first + i) * width + (b + 0.5) * step);
+    }}
+    index.lanes.forEach((_, lane) => {{
+      z[lane].push(...(tile ? tile[lane] : new Array(index.buckets).fill(0)));
+    }});
+  }});
+  return [{{
+    type: "heatmap",
+    x: x,
+    y: index.lanes,
+    z: z,
+    colorscale: "Viridis",
+    colorbar: {{title: {{text: "Running tasks"}}}},
+  }}];
+}}
+
+function getTaskTraces(tiles) {{
+  const lanes = index.lanes.map(() => ({{base: [], x: [], text: []}}));
+  const seen = new Set();
+  for (const tile of tiles.filter((t) => t)) {{
+    tile.lane.forEach((lane, i) => {{
+      // The tasks crossing the border of two tiles are in both
+      if (seen.has(tile.id[i])) {{
+        return;
+      }}
+      seen.add(tile.id[i]);
+      lanes[lane].base.push(tile.start[i]);
+      lanes[lane].x.push(tile.end[i] - tile.start[i]);
+      lanes[lane].text.push(tile.name[i]);
+    }});
+  }}
+  return lanes.map((data, lane) => ({{
+    type: "bar",
+    orientation: "h",
+    base: data.base,
+    x: data.x,
+    y: data.x.map(() => index.lanes[lane]),
+    hovertext: data.text,
+    name: index.lanes[lane],
+    marker: {{color: index.colors[lane]}},
+  }}));
+}}
+
+async function update(x0, x1) {{
+  x0 = Math.max(0, x0);
+  x1 = Math.min(index.span, x1);
+  const token = ++requests;
+  // The finest level whose tiles are at least as wide as the visible range
+  const level = Math.min(
+    index.tiles.length - 1,
+    Math.max(0, Math.floor(Math.log2(index.span / Math.max(x1 - x0, 1e-9))))
+  );
+  const width = index.span / 2 ** level;
+  const first = Math.min(2 ** level - 1, Math.floor(x0 / width));
+  const last = Math.min(2 ** level - 1, Math.floor(x1 / width));
+  const tiles = [];
+  for (let tile = first; tile <= last; tile++) {{
+    tiles.push(loadTile(level, tile));
+  }}
+  const loaded = await Promise.all(tiles);
+  if (token !== requests) {{
+    return;
+  }}
+  current = [x0, x1];
+  Plotly.react("plot", level < index.aggregated ? getAggregatedTraces(level, first, loaded) : getTaskTraces(loaded), {{
+    barmode: "overlay",
+    showlegend: index.legend && level >= index.aggregated,
+    uirevision: "tiles",
+    xaxis: {{title: {{text: "Time (seconds)"}}, range: current}},
+    yaxis: {{autorange: "reversed", type: "category", categoryarray: index.lanes}},
+  }});
+}}
+
+update(0, index.span).then(() => {{
+  document.getElementById("plot").on("plotly_relayout", (event) => {{
+    if (event["xaxis.autorange"]) {{
+      update(0, index.span);
+    }} else if (event["xaxis.range[0]"] !== undefined) {{
+      update(event["xaxis.range[0]"], event["xaxis.range[1]"]);
+    }}
+  }});
+}});
+</script>
+</body>
+</html>
+"""
+
+
+def _get_tile_ranges(
+    starts: np.ndarray, ends: np.ndarray, width: float, tiles: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """First and last tile overlapped by each task."""
+    first = np.clip(np.floor(starts / width), 0, tiles - 1).astype(np.int64)
+    last = np.clip(np.ceil(ends / width) - 1, first, tiles - 1).astype(np.int64)
+    return first, last
+
+
+def _write_tile(directory: str, level: int, tile: int, data: Any) -> None:
+    with open(os.path.join(directory, str(level), f"{tile}.js"), "w") as f:
+        f.write(f"wfTile({level},{tile},{json.dumps(data, separators=(',', ':'))});")
+
+
+def _write_aggregated_level(
+    directory: str,
+    level: int,
+    profiles: MutableSequence[Concurrency],
+    span: float,
+) -> MutableSequence[int]:
+    tiles = 2**level
+    edges = np.linspace(0, span, tiles * TILE_BUCKETS + 1)
+    matrix = np.round(np.vstack([p.get_buckets(edges) for p in profiles]), 3)
+    written = []
+    for tile in range(tiles):
+        if (data := matrix[:, tile * TILE_BUCKETS : (tile + 1) * TILE_BUCKETS]).any():
+            _write_tile(directory, level, tile, data.tolist())
+            written.append(tile)
+    return written
+
+
+def _write_task_level(
+    directory: str,
+    level: int,
+    lanes: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    names: MutableSequence[str],
+    first: np.ndarray,
+    last: np.ndarray,
+) -> MutableSequence[int]:
+    # A row for each task and each tile it overlaps, grouped by tile
+    repeats = last - first + 1
+    tasks = np.repeat(np.arange(len(starts)), repeats)
+    tiles = (
+        first[tasks]
+        + np.arange(len(tasks))
+        - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    )
+    order = np.argsort(tiles, kind="stable")
+    tasks, tiles = tasks[order], tiles[order]
+    written, bounds = np.unique(tiles, return_index=True)
+    for tile, task_ids in zip(written, np.split(tasks, bounds[1:])):
+        _write_tile(
+            directory,
+            level,
+            int(tile),
+            {
+                "id": task_ids.tolist(),
+                "lane": lanes[task_ids].tolist(),
+                "start": np.round(starts[task_ids], 3).tolist(),
+                "end": np.round(ends[task_ids], 3).tolist(),
+                "name": [names[i] for i in task_ids],
+            },
+        )
+    return written.tolist()
+
+
+def get_tiles_directory(filepath: str) -> str:
+    """The sidecar directory of the tiles of the page."""
+    return f"{os.path.splitext(filepath)[0]}.tiles"
+
+
+def write_tiled_html(
+    workflow: Workflow, style: StyleConfig, out_config: OutputConfig, filepath: str
+) -> None:
+    """
+    Writes a page that loads a pyramid of tiles from a sidecar directory: the coarse
+    levels hold the average number of running tasks of each step in time buckets, and
+    the finest level the tasks. Each level halves the width of the tiles, and the page
+    loads only the tiles of the visible range at the level matching the zoom.
+    """
+    steps = [
+        s
+        for s in workflow.steps
+        if s.name not in style.excluded_steps
+        and any(t.end_time is not None for t in s.instances)
+    ]
+    lanes, starts, ends, names = [], [], [], []
+    for lane, step in enumerate(steps):
+        for task in step.instances:
+            if task.end_time is not None:
+                lanes.append(lane)
+                starts.append(task.start_time.total_seconds())
+                ends.append(task.end_time.total_seconds())
+                names.append(task.name or step.name)
+    if not len(starts):
+        raise ValueError("Workflow has no tasks to tile")
+    lanes, starts, ends = np.array(lanes), np.array(starts), np.array(ends)
+    # Times are offsets in seconds from the workflow start, as in the other formats
+    span = max(float(ends.max()), 1e-3)
+    all_profiles = get_step_concurrency(workflow)
+    profiles = [all_profiles[s.name] for s in steps]
+
+    directory = get_tiles_directory(filepath)
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    levels = []
+    for level in range(MAX_LEVELS + 1):
+        os.makedirs(os.path.join(directory, str(level)))
+        first, last = _get_tile_ranges(starts, ends, span / 2**level, 2**level)
+        # Number of tasks overlapping each tile, from the differences of the counts
+        counts = np.zeros(2**level + 1, dtype=np.int64)
+        np.add.at(counts, first, 1)
+        np.add.at(counts, last + 1, -1)
+        # When the tiles are narrower than the tasks, the finer levels only copy them
+        if (
+            np.cumsum(counts).max() <= MAX_TILE_TASKS
+            or np.sum(last - first + 1) > 2 * len(starts)
+            or level == MAX_LEVELS
+        ):
+            levels.append(
+                _write_task_level(
+                    directory, level, lanes, starts, ends, names, first, last
+                )
+            )
+            break
+        levels.append(_write_aggregated_level(directory, level, profiles, span))
+
+    palette = colormaps[style.color_palette]
+    index = {
+        "directory": os.path.basename(directory),
+        "span": span,
+        "buckets": TILE_BUCKETS,
+        "aggregated": len(levels) - 1,
+        "tiles": levels,
+        "lanes": [style.renaming_steps.get(s.name, s.name) for s in steps],
+        "colors": [
+            style.color_map.get(s.name, to_hex(palette(i % palette.N)))
+            for i, s in enumerate(steps)
+        ],
+        "legend": style.legend,
+    }
+    with open(filepath, "w") as f:
+        f.write(TILED_PAGE.format(index=json.dumps(index), max_cached=MAX_CACHED_TILES))
+    # As plotly does for the compact reports, plotly.js is written only if it is missing
+    if not os.path.exists(plotlyjs := os.path.join(out_config.outdir, "plotly.min.js")):
+        with open(plotlyjs, "w") as f:
+            f.write(get_plotlyjs())
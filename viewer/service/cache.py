@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, MutableMapping
+from concurrent.futures import Future
+from enum import Enum
+
+from viewer.core.entity import Workflow
+
+
+def _get_object_size(obj: object) -> int:
+    """Size of an object with its attribute dictionary and its direct attributes."""
+    size = sys.getsizeof(obj) + sys.getsizeof(obj.__dict__)
+    for value in obj.__dict__.values():
+        # The shared singletons, e.g., None and the enum members, cost nothing
+        if value is not None and not isinstance(value, (bool, Enum)):
+            size += sys.getsizeof(value)
+    return size
+
+
+def get_workflow_size(workflow: Workflow) -> int:
+    """
+    Estimates the memory footprint of a workflow, in bytes, counting the strings shared
+    by many tasks (e.g., the deployments) once for each task, so it errs on the safe side.
+    """
+    size = _get_object_size(workflow)
+    for step in workflow.steps:
+        size += _get_object_size(step) + sys.getsizeof(step.name)
+        for task in step.instances:
+            size += _get_object_size(task)
+            size += sum(_get_object_size(q) for q in task.queue_times)
+            size += sum(sys.getsizeof(path) for path in task.transfer_inputs)
+    for transfer in workflow.transfers:
+        size += _get_object_size(transfer)
+    for target, sources in workflow.dependencies.items():
+        size += sys.getsizeof(target) + sys.getsizeof(sources)
+    return size
+
+
+class WorkflowCache:
+    """
+    LRU cache of the translated workflows, bounded by their estimated memory footprint.
+    Concurrent requests of the same missing trace wait for a single translation.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes: int = max_bytes
+        self.size: int = 0
+        self._entries: OrderedDict[Hashable, tuple[Workflow, int]] = OrderedDict()
+        self._pending: MutableMapping[Hashable, Future] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, key: Hashable, loader: Callable[[], Workflow]) -> Workflow:
+        with self._lock:
+            if (entry := self._entries.get(key)) is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+            if (future := self._pending.get(key)) is None:
+                future = self._pending[key] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return future.result()
+        try:
+            workflow = loader()
+            size = get_workflow_size(workflow)
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._pending[key]
+            # A workflow exceeding the bound alone is returned without caching it
+            if size <= self.max_bytes:
+                self._entries[key] = (workflow, size)
+                self.size += size
+                while self.size > self.max_bytes:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self.size -= evicted_size
+        future.set_result(workflow)
+        return workflow
+
+    def keys(self) -> list[Hashable]:
+        with self._lock:
+            return list(self._entries.keys())
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections.abc import Hashable, MutableMapping, MutableSequence
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+from pydantic import ValidationError
+
+from viewer.cli.arguments import parse_window
+from viewer.cli.priority import create_cluster_info
+from viewer.cli.schema import OutputConfig, StyleConfig
+from viewer.core.entity import Workflow
+from viewer.core.utils import get_path
+from viewer.render.report import PLOTS, create_report
+from viewer.render.stats import get_stats
+from viewer.service.cache import WorkflowCache
+from viewer.translator.manager import create_workflow
+
+CONTENT_TYPES = {
+    "html": "text/html; charset=utf-8",
+    "png": "image/png",
+    "pdf": "application/pdf",
+    "eps": "application/postscript",
+}
+STYLE_LISTS = {"excluded-steps"}
+STYLE_MAPS = {"renaming-steps", "color-map"}
+STYLE_KEYS = {f.alias or name for name, f in StyleConfig.model_fields.items()}
+
+# Cache of the workflows translated by a worker process
+_worker_cache: WorkflowCache | None = None
+
+
+def _init_worker(max_bytes: int) -> None:
+    global _worker_cache
+    _worker_cache = WorkflowCache(max_bytes)
+
+
+def _get_workflow(
+    key: Hashable, window: tuple[timedelta | None, timedelta | None] | None
+) -> Workflow:
+    workflow_manager, input_type, paths, clusters_info, _ = key
+    workflow = _worker_cache.get(
+        key,
+        lambda: create_workflow(
+            workflow_manager,
+            input_type,
+            list(paths),
+            create_cluster_info(
+                argparse.Namespace(clusters_info=clusters_info or None)
+            ),
+        ),
+    )
+    if window is not None:
+        workflow = workflow.get_window(*window)
+    if workflow.empty():
+        raise ValueError("The workflow is empty")
+    return workflow
+
+
+def _get_traces() -> MutableMapping[str, Any]:
+    return {
+        "size_bytes": _worker_cache.size,
+        "traces": [
+            {"wms": k[0], "input_type": k[1], "inputs": k[2]}
+            for k in _worker_cache.keys()
+        ],
+    }
+
+
+def _get_stats(
+    key: Hashable, window: tuple[timedelta | None, timedelta | None] | None
+) -> MutableMapping[str, Any]:
+    return get_stats(_get_workflow(key, window))
+
+
+def _render(
+    key: Hashable,
+    window: tuple[timedelta | None, timedelta | None] | None,
+    style_config: StyleConfig,
+    extension: str,
+    plot: str,
+) -> bytes:
+    """Renders a single plot in a worker process, which owns its matplotlib state."""
+    workflow = _get_workflow(key, window)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        out_config = OutputConfig(tmpdir, "gantt", [extension])
+        create_report(workflow, out_config, style_config, plots=[plot])
+        filepath = out_config.get_filepath(
+            extension, postfix="" if plot == "time" else f".{plot}"
+        )
+        if not os.path.exists(filepath):
+            raise ValueError(f"Plot {plot} is not available in format {extension}")
+        with open(filepath, "rb") as f:
+            return f.read()
+
+
+def _get_param(
+    query: MutableMapping[str, MutableSequence[str]],
+    key: str,
+    default: str | None = None,
+) -> str:
+    if (values := query.get(key)) is None:
+        if default is None:
+            raise ValueError(f"Missing parameter: {key}")
+        return default
+    return values[-1]
+
+
+def _get_style_config(query: MutableMapping[str, MutableSequence[str]]) -> StyleConfig:
+    config_data: MutableMapping[str, Any] = {}
+    for key, values in query.items():
+        if key in STYLE_LISTS:
+            config_data[key] = values
+        elif key in STYLE_MAPS:
+            config_data[key] = dict(v.split(":", 1) for v in values if ":" in v)
+        elif key in STYLE_KEYS:
+            config_data[key] = values[-1]
+    return StyleConfig.model_validate(config_data)
+
+
+def _get_key(query: MutableMapping[str, MutableSequence[str]]) -> Hashable:
+    if not (inputs := query.get("input")):
+        raise ValueError("Missing parameter: input")
+    paths = tuple(get_path(path) for path in inputs)
+    input_type = _get_param(query, "input-type")
+    return (
+        # The tables are read without a workflow manager
+        None if input_type == "table" else _get_param(query, "wms"),
+        input_type,
+        paths,
+        _get_param(query, "clusters-info", ""),
+        # Modified traces are translated again
+        tuple(os.stat(path).st_mtime_ns for path in paths),
+    )
+
+
+def _get_window(
+    query: MutableMapping[str, MutableSequence[str]],
+) -> tuple[timedelta | None, timedelta | None] | None:
+    return parse_window(window[-1]) if (window := query.get("window")) else None
+
+
+class ViewerServer(ThreadingHTTPServer):
+    """
+    Each trace is translated, cached and rendered by the worker process chosen by its
+    key, so the requests send the key instead of the whole workflow and each worker
+    caches a share of the traces within its share of the memory. When that worker is
+    busy, the request goes to an idle worker, which translates the trace again.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, server_address: tuple[str, int], cache_bytes: int, workers: int
+    ) -> None:
+        super().__init__(server_address, ViewerRequestHandler)
+        # The workers are forked from a server process, not from the threads of the
+        # handlers, which preloads the render libraries only once
+        context = multiprocessing.get_context(
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        if context.get_start_method() == "forkserver":
+            context.set_forkserver_preload(["viewer.service.server"])
+        self.executors: MutableSequence[ProcessPoolExecutor] = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(cache_bytes // workers,),
+            )
+            for _ in range(workers)
+        ]
+        # Requests running on each worker
+        self.running: MutableSequence[int] = [0] * workers
+        self.lock: threading.Lock = threading.Lock()
+        # Start the workers before the handler threads
+        for executor in self.executors:
+            executor.submit(int).result()
+
+    def _acquire(self, key: Hashable) -> int:
+        with self.lock:
+            index = hash(key) % len(self.executors)
+            # A slow render does not block the other requests of its worker
+            if self.running[index] > (least := min(self.running)):
+                index = self.running.index(least)
+            self.running[index] += 1
+            return index
+
+    def submit(self, key: Hashable, fn, *args) -> Any:
+        index = self._acquire(key)
+        try:
+            return self.executors[index].submit(fn, key, *args).result()
+        finally:
+            with self.lock:
+                self.running[index] -= 1
+
+    def get_traces(self) -> MutableMapping[str, Any]:
+        results = [e.submit(_get_traces).result() for e in self.executors]
+        traces = []
+        for trace in (t for r in results for t in r["traces"]):
+            # A trace is cached again by the workers that rendered it while busy
+            if trace not in traces:
+                traces.append(trace)
+        return {"size_bytes": sum(r["size_bytes"] for r in results), "traces": traces}
+
+    def server_close(self) -> None:
+        super().server_close()
+        for executor in self.executors:
+            executor.shutdown(cancel_futures=True)
+
+
+class ViewerRequestHandler(BaseHTTPRequestHandler):
+    server: ViewerServer
+
+    def _send(self, status: HTTPStatus, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, data: Any, status: HTTPStatus = HTTPStatus.OK) -> None:
+        self._send(status, "application/json", json.dumps(data).encode())
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            match url.path:
+                case "/render":
+                    extension = _get_param(query, "format", "html")
+                    if extension not in CONTENT_TYPES:
+                        raise ValueError(f"Unknown format: {extension}")
+                    if (plot := _get_param(query, "plot", "time")) not in PLOTS:
+                        raise ValueError(f"Unknown plot: {plot}")
+                    body = self.server.submit(
+                        _get_key(query),
+                        _render,
+                        _get_window(query),
+                        _get_style_config(query),
+                        extension,
+                        plot,
+                    )
+                    self._send(HTTPStatus.OK, CONTENT_TYPES[extension], body)
+                case "/stats":
+                    self._send_json(
+                        self.server.submit(
+                            _get_key(query), _get_stats, _get_window(query)
+                        )
+                    )
+                case "/traces":
+                    self._send_json(self.server.get_traces())
+                case _:
+                    self._send_json(
+                        {"error": f"Unknown path: {url.path}"}, HTTPStatus.NOT_FOUND
+                    )
+        except FileNotFoundError as e:
+            self._send_json({"error": str(e)}, HTTPStatus.NOT_FOUND)
+        except (ValueError, ValidationError, argparse.ArgumentTypeError) as e:
+            self._send_json({"error": str(e)}, HTTPStatus.BAD_REQUEST)
+        except Exception as e:
+            self._send_json({"error": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR)
+
+
+def serve(args: argparse.Namespace) -> int:
+    server = ViewerServer(
+        (args.host, args.port),
+        cache_bytes=args.cache_size * 1024 * 1024,
+        workers=args.workers,
+    )
+    print(f"Serving wf-viewer on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+    return 0
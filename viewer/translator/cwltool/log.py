@@ -4,6 +4,7 @@ from collections.abc import MutableSequence
 from datetime import timedelta
 
 from viewer.core.entity import Step, Task
+from viewer.core.filtering import TaskFilter
 from viewer.core.utils import get_path, str_to_datetime
 
 CWLTOOL_VERSIONS = [
@@ -48,7 +49,10 @@ class CWLStep:
         self.parent: str | None = parent
 
 
-def translate_log(input_paths: MutableSequence[str]):
+def translate_log(
+    input_paths: MutableSequence[str], task_filter: TaskFilter | None = None
+):
+    task_filter = task_filter or TaskFilter()
     steps = []
     workflow_start_date = None
     workflow_end_date = None
@@ -125,6 +129,8 @@ def translate_log(input_paths: MutableSequence[str]):
         step_group_by = {}
         for job_name, (start_time, end_time) in step_start_dict.items():
             step_name = get_full_name(filesystem[job_name], filesystem)
+            if not task_filter.match_step(step_name):
+                continue
             step_group_by.setdefault(step_name, []).append((start_time, end_time))
         for step_name, times in step_group_by.items():
             steps.append(
@@ -144,7 +150,7 @@ def translate_log(input_paths: MutableSequence[str]):
                 )
             )
     return (
-        sorted(steps, key=lambda x: x.get_start()),
+        sorted(task_filter.filter_steps(steps), key=lambda x: x.get_start()),
         workflow_start_date,
         workflow_end_date,
     )
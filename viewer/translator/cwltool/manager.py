@@ -1,14 +1,19 @@
 from collections.abc import MutableSequence
 
 from viewer.core.entity import Workflow
+from viewer.core.filtering import TaskFilter
 from viewer.core.utils import get_path
 from viewer.translator.cwltool.log import translate_log
 
 
-def cwltool_create_workflow(input_type: str, paths: MutableSequence[str]) -> Workflow:
+def cwltool_create_workflow(
+    input_type: str, paths: MutableSequence[str], task_filter: TaskFilter | None = None
+) -> Workflow:
     if input_type == "log":
+        # The INFO logs of cwltool do not record the inputs of the jobs, so the step
+        # dependencies, and hence the critical path, are not available
         steps, workflow_start_date, workflow_end_date = translate_log(
-            [get_path(path) for path in paths]
+            [get_path(path) for path in paths], task_filter
         )
         workflow = Workflow(workflow_start_date, workflow_end_date)
         workflow.steps.extend(steps)
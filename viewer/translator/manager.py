@@ -0,0 +1,58 @@
+from collections.abc import MutableSequence
+
+from viewer.analysis.streaming import StreamingStats
+from viewer.core.accounting import JobAccountingStore
+from viewer.core.entity import Workflow
+from viewer.core.filtering import TaskFilter
+from viewer.translator.cwltool.manager import cwltool_create_workflow
+from viewer.translator.streamflow.manager import sf_create_workflow
+from viewer.translator.toil.manager import toil_create_workflow
+
+
+def create_workflow(
+    workflow_manager: str,
+    input_type: str,
+    paths: MutableSequence[str],
+    job_accounting: JobAccountingStore,
+    task_filter: TaskFilter | None = None,
+) -> Workflow:
+    if input_type == "table":
+        # The columnar libraries are imported only when a table is read
+        from viewer.translator.table.manager import table_create_workflow
+
+        return table_create_workflow(paths, task_filter)
+    match workflow_manager:
+        case "streamflow":
+            return sf_create_workflow(input_type, paths, job_accounting, task_filter)
+        case "cwltool":
+            return cwltool_create_workflow(input_type, paths, task_filter)
+        case "cwltoil":
+            return toil_create_workflow(input_type, paths, task_filter)
+        case None:
+            raise ValueError(
+                f"The workflow manager is required for {input_type} inputs"
+            )
+        case _:
+            raise NotImplementedError(workflow_manager)
+
+
+def stream_workflow(
+    workflow_manager: str,
+    input_type: str,
+    paths: MutableSequence[str],
+    job_accounting: JobAccountingStore,
+    stats: StreamingStats,
+    task_filter: TaskFilter | None = None,
+) -> None:
+    """
+    Passes the tasks of the inputs to `stats`. The StreamFlow logs are streamed, the
+    other inputs are translated into a workflow first.
+    """
+    if workflow_manager == "streamflow" and input_type == "log":
+        sf_create_workflow(input_type, paths, job_accounting, task_filter, stats)
+    else:
+        stats.add_workflow(
+            create_workflow(
+                workflow_manager, input_type, paths, job_accounting, task_filter
+            )
+        )
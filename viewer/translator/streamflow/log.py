@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+import heapq
+import json
 import os
 import posixpath
 import re
-from collections.abc import MutableMapping, MutableSequence
+from collections import deque
+from collections.abc import Iterator, MutableMapping, MutableSequence, Sequence
+from contextlib import ExitStack
 from pathlib import PurePath
-from typing import Any
+from typing import BinaryIO
 
-from viewer.core.entity import Action, Step, Task, Workflow
+from viewer.analysis.streaming import StreamingStats
+from viewer.core.accounting import JobAccountingStore
+from viewer.core.entity import Action, Step, Task, TransferData, Workflow
+from viewer.core.filtering import TaskFilter
 from viewer.core.utils import str_to_datetime
 
+TIMESTAMP_PATTERN = re.compile(rb"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}")
+# The statuses after which a job does not change anymore
+TERMINAL_STATUSES = {"COMPLETED", "FAILED", "CANCELLED"}
+
 
 class FileNode:
     def __init__(self, name: str):
@@ -40,14 +51,19 @@ class FileSystem:
 
 def _get_copy_info(
     words: MutableSequence[str], transfer_completed: bool = False
-) -> tuple[str, str, str, str]:
+) -> tuple[str, str, str, str] | None:
     offset = 1 if transfer_completed else 0
+    # The shortest copy log is a copy inside the local location
+    if len(words) <= 9 + offset:
+        return None
     src_path = words[5 + offset]
     if words[7 + offset] == "local":  # local to remote
+        if len(words) <= 13 + offset:
+            return None
         dst_path = words[10 + offset]
         src_location = words[7 + offset]
         dst_location = words[13 + offset]
-    elif len(words) > 11 + offset and words[12 + offset] == "local":  # remote to local
+    elif len(words) > 12 + offset and words[12 + offset] == "local":  # remote to local
         dst_path = words[10 + offset]
         src_location = words[8 + offset]
         dst_location = words[12 + offset]
@@ -58,13 +74,17 @@ def _get_copy_info(
         if words[9 + offset] == "local":
             src_location = words[9 + offset]
             dst_location = words[9 + offset]
-        else:
+        elif len(words) > 10 + offset:
             src_location = words[10 + offset]
             dst_location = words[10 + offset]
-    else:  # remote A to remote B
+        else:
+            return None
+    elif len(words) > 12 + offset:  # remote A to remote B
         dst_path = words[9 + offset]
         src_location = words[7 + offset]
         dst_location = words[12 + offset]
+    else:
+        return None
     return (
         src_location.split(os.sep)[0],
         src_path,
@@ -73,78 +93,248 @@ def _get_copy_info(
     )
 
 
+def _get_producer_step(
+    path: str, job_directories: MutableMapping[str, str]
+) -> str | None:
+    while path and path != posixpath.sep:
+        if (step_name := job_directories.get(path)) is not None:
+            return step_name
+        path = posixpath.dirname(path)
+    return None
+
+
+def _read_entries(
+    fd: BinaryIO, index: int
+) -> Iterator[tuple[bytes, int, MutableSequence[tuple[int, bytes]]]]:
+    """
+    Groups the lines of a log in entries, i.e., a timestamped line and the following
+    lines without timestamp (e.g., an `inputs` block), with their end offsets.
+    """
+    timestamp, lines, offset = b"", [], 0
+    for line in fd:
+        offset += len(line)
+        if match := TIMESTAMP_PATTERN.match(line):
+            if lines:
+                yield timestamp, index, lines
+            timestamp, lines = match.group(), []
+        lines.append((offset, line))
+    if lines:
+        yield timestamp, index, lines
+
+
+def merge_logs(fds: Sequence[BinaryIO]) -> Iterator[tuple[int, int, bytes]]:
+    """
+    Lines of the logs merged by timestamp, as (file index, end offset, line). Each log
+    keeps only its current entry in memory, and entries with the same timestamp are
+    taken in the order of the logs.
+    """
+    if len(fds) == 1:
+        offset = 0
+        for line in fds[0]:
+            offset += len(line)
+            yield 0, offset, line
+        return
+    for _, index, lines in heapq.merge(
+        *(_read_entries(fd, i) for i, fd in enumerate(fds)), key=lambda e: e[0]
+    ):
+        for offset, line in lines:
+            yield index, offset, line
+
+
+def get_job_inputs(fd: BinaryIO, interval: tuple[int, int]) -> str:
+    """Reads the `inputs` block of a job, given its offsets in the log file."""
+    fd.seek(interval[0])
+    return "{" + fd.read(interval[1] - interval[0]).decode()
+
+
+def _add_dependencies(
+    workflow: Workflow,
+    job_name: str,
+    inputs: str,
+    job_directories: MutableMapping[str, str],
+) -> None:
+    # A job depends on the steps whose jobs produced the paths in its inputs
+    for path in re.findall(r'"(/[^"]*)"', inputs):
+        if (source := _get_producer_step(path, job_directories)) is not None:
+            workflow.add_dependency(source, os.path.dirname(job_name))
+
+
+def _get_input_files(inputs: str) -> MutableMapping[str, int | None]:
+    """Returns the paths in the inputs of a job, with their size when known."""
+    try:
+        values = [json.loads(inputs)]
+    except ValueError:
+        return {path: None for path in re.findall(r'"(/[^"]*)"', inputs)}
+    files = {}
+    while values:
+        if isinstance(value := values.pop(), MutableMapping):
+            if value.get("class") in ("File", "Directory") and isinstance(
+                path := value.get("path"), str
+            ):
+                files[path] = value.get("size")
+            values.extend(value.values())
+        elif isinstance(value, MutableSequence):
+            values.extend(value)
+    return files
+
+
+def _add_transfer_inputs(
+    task: Task,
+    inputs: str,
+    transfers_by_dst: MutableMapping[str, MutableSequence[TransferData]],
+) -> None:
+    for path, size in _get_input_files(inputs).items():
+        # The input can be inside a transferred directory
+        dst_path = path
+        while dst_path and dst_path != posixpath.sep:
+            if (transfers := transfers_by_dst.get(dst_path)) is not None:
+                # The last transfer to the task location started before the task
+                if candidates := [
+                    t
+                    for t in transfers
+                    if t.dst_location == task.deployment
+                    and t.start_time <= task.start_time
+                ]:
+                    transfer = candidates[-1]
+                    if size is not None and dst_path == path:
+                        transfer.size = size
+                    task.transfer_inputs[path] = transfer
+                break
+            dst_path = posixpath.dirname(dst_path)
+
+
 def translate_log(
-    filepath: str, location_metadata: MutableMapping[str, Any]
+    filepaths: Sequence[str],
+    job_accounting: JobAccountingStore,
+    task_filter: TaskFilter | None = None,
+    stats: StreamingStats | None = None,
 ) -> Workflow:
+    """
+    The logs, e.g., rotated or split by process, are read as a single log merged by
+    timestamp. With `stats`, the tasks are passed to it as soon as they complete and
+    are not stored, so the returned workflow only has the dates.
+    """
+    task_filter = task_filter or TaskFilter()
     workflow_start, workflow_end, workflow_name = (None for _ in range(3))
     deployments = []
-    # file_copies = {}
+    transfers = []
+    # Pending transfers by (source location, source path, destination location,
+    # destination path), with a queue for concurrent copies of the same paths
+    pending_transfers = {}
+    transfers_by_dst = {}
+    unmatched_transfers = 0
     steps = {}
+    jobs = {}
+    # Step of the running jobs, used only in streaming mode
+    job_steps = {}
     last_timestamp = None
     unknown_jobs_info = {}
+    scheduled_jobs = {}
+    # Log and offsets of the `inputs` blocks, which are read only when needed
     job_inputs_interval = {}
+    job_directories = {}
     job_input_reading = False
     job_input_name = None
+    job_input_start = 0
     filesystems = {"local": FileSystem("local")}
-    with open(filepath) as fd:
-        for line in fd:
+    with ExitStack() as stack:
+        fds = [stack.enter_context(open(path, "rb")) for path in filepaths]
+        for index, offset, raw_line in merge_logs(fds):
+            line = raw_line.decode()
             words = [w.strip() for w in line.split(" ") if w]
             sentence = " ".join(words)
             if job_input_reading:
-                if sentence == "}":
+                # Only the closing brace of the block is not indented
+                if line.rstrip() == "}":
                     job_input_reading = False
-                job_inputs_interval[job_input_name] += sentence
+                    if job_input_name is not None:
+                        job_inputs_interval[job_input_name] = (
+                            index,
+                            job_input_start,
+                            offset,
+                        )
             elif match := re.search(
                 r"^(?P<timestamp>[\d-]+\s[\d:.]+)\s+DEBUG\s+Job\s+(?P<job_name>\S+)\s+inputs:\s+\{$",
                 sentence,
             ):
                 job_input_name = match.group("job_name")
-                job_inputs_interval[job_input_name] = "{"
+                job_input_start = offset
+                if stats is not None or not task_filter.match_step(
+                    os.path.dirname(job_input_name)
+                ):
+                    # Consume the block without storing it
+                    job_input_name = None
                 job_input_reading = True
             if match := re.search(
                 r"^(?P<timestamp>[\d-]+\s[\d:.]+)\s+INFO\s+Processing\s+workflow\s+(?P<workflow_id>[\w-]+)$",
                 sentence,
             ):
-                if workflow_start is not None:
+                # Each part of a split log repeats the header of its workflow
+                if workflow_start is None:
+                    workflow_start = str_to_datetime(match.group("timestamp"))
+                    workflow_name = match.group("workflow_id")
+                elif match.group("workflow_id") != workflow_name:
                     raise Exception("There are multiple workflows in the log")
-                workflow_start = str_to_datetime(match.group("timestamp"))
             elif match := re.search(
                 r"^(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3})\s+INFO\s+DEPLOYING\s+(?P<deployment>\S+)$",
                 sentence,
             ):
-                deployment = match.group("deployment")
-                deployments.append(deployment)
-                filesystems[deployment] = FileSystem(deployment)
-            # elif len(words) > 3 and "COMPLETED" == words[3] and "copy" == words[4]:
-            #     src_location, src_path, dst_location, dst_path = _get_copy_info(
-            #         words, transfer_completed=True
-            #     )
-            #     filesystems[src_location].add(src_path)
-            #     filesystems[dst_location].add(dst_path)
-            #     copy_info = file_copies[dst_path]
-            #     copy_info.end_time = str_to_datetime(" ".join(words[:2]))
-            #     if (
-            #         src_path != copy_info.src_path
-            #         or dst_path != copy_info.dst_path
-            #         or src_location != copy_info.src_location
-            #         or dst_location != copy_info.dst_location
-            #     ):
-            #         raise Exception("Error copy scraping start and end times")
-            # elif len(words) > 3 and "COPYING" in words[3]:
-            #     src_location, src_path, dst_location, dst_path = _get_copy_info(words)
-            #     file_copies[dst_path] = TransferData(
-            #         src_path=src_path,
-            #         dst_path=dst_path,
-            #         src_location=src_location,
-            #         dst_location=dst_location,
-            #         start=str_to_datetime(" ".join(words[:2])),
-            #     )
+                if (deployment := match.group("deployment")) not in filesystems:
+                    deployments.append(deployment)
+                    filesystems[deployment] = FileSystem(deployment)
+            elif (
+                stats is None
+                and len(words) > 4
+                and words[3] == "COMPLETED"
+                and words[4] == "copy"
+            ):
+                if (
+                    copy_info := _get_copy_info(words, transfer_completed=True)
+                ) is None:
+                    print(f"WARNING: Skipping the malformed copy log: {sentence}")
+                # Concurrent copies of the same paths complete in order of start
+                elif pending := pending_transfers.get(copy_info):
+                    transfer = pending.popleft()
+                    if not pending:
+                        del pending_transfers[copy_info]
+                    transfer.end_time = (
+                        str_to_datetime(" ".join(words[:2])) - workflow_start
+                    )
+                    # The filters apply once the copy completes, so that the filtered
+                    # copies are not counted as unmatched
+                    if (
+                        task_filter.match_start(transfer.start_time)
+                        and task_filter.match_end(transfer.end_time)
+                        and (
+                            task_filter.match_deployment(transfer.src_location)
+                            or task_filter.match_deployment(transfer.dst_location)
+                        )
+                    ):
+                        transfers.append(transfer)
+                        transfers_by_dst.setdefault(transfer.dst_path, []).append(
+                            transfer
+                        )
+                else:
+                    unmatched_transfers += 1
+            elif stats is None and len(words) > 3 and words[3] == "COPYING":
+                if (copy_info := _get_copy_info(words)) is None:
+                    print(f"WARNING: Skipping the malformed copy log: {sentence}")
+                else:
+                    src_location, src_path, dst_location, dst_path = copy_info
+                    pending_transfers.setdefault(copy_info, deque()).append(
+                        TransferData(
+                            src_path=src_path,
+                            src_location=src_location,
+                            dst_path=dst_path,
+                            dst_location=dst_location,
+                            start=str_to_datetime(" ".join(words[:2])) - workflow_start,
+                        )
+                    )
             elif match := re.search(
                 r"^(?P<timestamp>[\d-]+\s[\d:.]+)\s+INFO\s+EXECUTING\s+step\s+(?P<step_name>\S+)\s+\(job\s+(?P<job_name>\S+)\)\s+(?:on\s+location\s+)?(?P<execution_type>\S+)\s+into\s+directory\s+(?P<directory>.*?):?$",
                 sentence,
             ):
                 step_name = match.group("step_name")
-                step = steps.setdefault(step_name, Step(step_name, []))
                 if (location := match.group("execution_type")) == "locally":
                     deployment = "local"
                     service = None
@@ -159,44 +349,69 @@ def translate_log(
                         service = loc_components[1]
                     else:
                         service = None
-                step.instances.append(
-                    Task(
-                        start=str_to_datetime(match.group("timestamp"))
-                        - workflow_start,
+                start = str_to_datetime(match.group("timestamp")) - workflow_start
+                if (
+                    task_filter.match_step(step_name)
+                    and task_filter.match_deployment(deployment)
+                    and task_filter.match_start(start)
+                ):
+                    task = Task(
+                        start=start,
                         end=None,
                         deployment=deployment,
                         service=service,
                         name=match.group("job_name"),
                     )
-                )
+                    if stats is None:
+                        step = steps.setdefault(step_name, Step(step_name, []))
+                        job_directories[match.group("directory")] = step_name
+                        step.instances.append(task)
+                    else:
+                        job_steps[task.name] = step_name
+                    jobs.setdefault(task.name, task)
             elif match := re.search(
                 r"^(?P<timestamp>[\d-]+\s[\d:.]+)\s+DEBUG\s+Job\s+(?P<job_name>\S+)\s+changed\s+status\s+to\s+(?P<status>\S+)$",
                 sentence,
             ):
-                job_name = match.group("job_name")
-                if os.path.dirname(job_name) in steps.keys():
-                    for instance in steps[os.path.dirname(job_name)].instances:
-                        if instance.name == job_name:
-                            end_time = str_to_datetime(match.group("timestamp"))
-                            instance.end_time = end_time - workflow_start
-                            if workflow_end is None or workflow_end < end_time:
-                                workflow_end = end_time
-                            break
+                if (instance := jobs.get(match.group("job_name"))) is not None:
+                    end_time = str_to_datetime(match.group("timestamp"))
+                    instance.end_time = end_time - workflow_start
+                    if workflow_end is None or workflow_end < end_time:
+                        workflow_end = end_time
+                    # As in the workflow, the end is the time of the last status, so
+                    # the task is passed to the statistics only when it terminates
+                    if stats is not None and match.group("status") in TERMINAL_STATUSES:
+                        del jobs[instance.name]
+                        step_name = job_steps.pop(instance.name)
+                        if task_filter.match_end(instance.end_time):
+                            stats.add_task(step_name, instance)
             elif match := re.search(
                 r"^(?P<timestamp>[\d-]+\s[\d:.]+)\s+INFO\s+COMPLETED\s+Step\s+(?P<step_name>\S+)$",
                 sentence,
             ):
-                step = steps.get(match.group("step_name"), None)
+                step_name = match.group("step_name")
+                if stats is None:
+                    step = steps.get(step_name, None)
+                    instances = step.instances if step is not None else []
+                else:
+                    # The completed jobs have already been passed to the statistics
+                    instances = []
+                    for job_name in [j for j, s in job_steps.items() if s == step_name]:
+                        del job_steps[job_name]
+                        instances.append(jobs.pop(job_name))
+                    step = step_name if instances or step_name in stats.steps else None
                 missing_log = True
-                for instance in step.instances if step is not None else []:
+                for instance in instances:
                     if instance.end_time is None:
                         missing_log = False
                         instance.end_time = (
                             str_to_datetime(match.group("timestamp")) - workflow_start
                         )
-                if missing_log:
+                    if stats is not None and task_filter.match_end(instance.end_time):
+                        stats.add_task(step_name, instance)
+                if missing_log and step is not None:
                     print(
-                        f"WARNING: The step {step.name} completed, but the termination logs for some instances are missing. "
+                        f"WARNING: The step {step_name} completed, but the termination logs for some instances are missing. "
                         "A parsing error likely occurred. "
                         "(Note: StreamFlow log in debug mode is required to retrieve all necessary information."
                     )
@@ -204,28 +419,15 @@ def translate_log(
                 r"(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3})\s+INFO\s+Scheduled job (?P<streamflow_job>[\w\-/]+) with job id (?P<slurm_job>\d+)",
                 sentence,
             ):
-                streamflow_job = match.group("streamflow_job")
-                if (step_name := os.path.dirname(streamflow_job)) in steps.keys():
-                    for instance in steps[step_name].instances:
-                        if instance.name == streamflow_job:
-                            slurm_job = int(match.group("slurm_job"))
-                            if instance.deployment in location_metadata.keys():
-                                queue_start = location_metadata[instance.deployment][
-                                    slurm_job
-                                ]["queue_starttime"]
-                                queue_end = location_metadata[instance.deployment][
-                                    slurm_job
-                                ]["queue_endtime"]
-                                instance.queue_times.append(
-                                    Action(queue_start, queue_end)
-                                )
-                                instance.energy = location_metadata[
-                                    instance.deployment
-                                ][slurm_job]["avg_energy"]
-                            else:
-                                unknown_jobs_info.setdefault(
-                                    instance.deployment, []
-                                ).append(str(slurm_job))
+                # The accounting data are not part of the streaming statistics
+                if (
+                    stats is None
+                    and (instance := jobs.get(match.group("streamflow_job")))
+                    is not None
+                ):
+                    scheduled_jobs.setdefault(instance.deployment, {})[
+                        int(match.group("slurm_job"))
+                    ] = instance
             try:
                 if (tmp_timestamp := str_to_datetime(" ".join(words[:2]))) is not None:
                     last_timestamp = tmp_timestamp
@@ -240,37 +442,68 @@ def translate_log(
         workflow_end = last_timestamp
         error_end = workflow_end - workflow_start
         missing_terminations = True
-        for step in steps.values():
-            for instance in step.instances:
-                if instance.end_time is None:
-                    missing_terminations = False
-                    instance.end_time = error_end
+        for instance in (
+            (i for step in steps.values() for i in step.instances)
+            if stats is None
+            else jobs.values()
+        ):
+            if instance.end_time is None:
+                missing_terminations = False
+                instance.end_time = error_end
         if missing_terminations:
             print(
                 "WARNING: Some task end times are missing. The step's end time has been set, but it is inaccurate. "
                 "(Note: StreamFlow log in debug mode is required to retrieve all necessary information."
             )
 
+    if stats is not None:
+        # The jobs still running at the end of the log
+        for job_name, instance in jobs.items():
+            if task_filter.match_end(instance.end_time):
+                stats.add_task(job_steps[job_name], instance)
+        stats.set_dates(workflow_start, workflow_end)
+
+    # Only the accounting data of the scheduled jobs are extracted
+    job_accounting.load(scheduled_jobs.keys())
+    for deployment, deployment_jobs in scheduled_jobs.items():
+        records = (
+            job_accounting.get_jobs(deployment, deployment_jobs.keys(), workflow_start)
+            if deployment in job_accounting
+            else {}
+        )
+        for slurm_job, instance in deployment_jobs.items():
+            if (record := records.get(slurm_job)) is not None:
+                instance.queue_times.append(
+                    Action(record.queue_start, record.queue_end)
+                )
+                instance.energy = record.energy
+            else:
+                unknown_jobs_info.setdefault(deployment, []).append(str(slurm_job))
+
     if unknown_jobs_info:
         print(
             "WARNING: Missing jobs info in some locations execute the following command in the locations"
         )
-        for loc, jobs in unknown_jobs_info.items():
+        for loc, job_ids in unknown_jobs_info.items():
             print(
-                f"Location {loc}: `sacct --json --jobs {','.join(jobs)} > {loc}_info.json`"
+                f"Location {loc}: `sacct --json --jobs {','.join(job_ids)} > {loc}_info.json`"
             )
 
-    # for copy_info in file_copies.values():
-    #     print(
-    #         f"src_path: {copy_info.src_path}\n"
-    #         f"src_loc: {copy_info.src_location}\n"
-    #         f"dst_path: {copy_info.dst_path}\n"
-    #         f"dst_loc: {copy_info.dst_location}\n"
-    #         f"transfer: {copy_info.end_time - copy_info.start_time}\n"
-    #     )
-    #     print("#" * 20)
+    if unmatched_transfers:
+        print(
+            f"WARNING: {unmatched_transfers} completed copies do not have a start log. "
+            "A parsing error likely occurred."
+        )
     workflow = Workflow(workflow_start, workflow_end)
     workflow.steps.extend(
-        sorted(steps.values(), key=lambda x: x.get_start()),
+        sorted(task_filter.filter_steps(steps.values()), key=lambda x: x.get_start()),
     )
+    workflow.transfers.extend(sorted(transfers, key=lambda t: t.start_time))
+    with ExitStack() as stack:
+        fds = [stack.enter_context(open(path, "rb")) for path in filepaths]
+        for job_name, (index, start, end) in job_inputs_interval.items():
+            inputs = get_job_inputs(fds[index], (start, end))
+            _add_dependencies(workflow, job_name, inputs, job_directories)
+            if transfers_by_dst and (task := jobs.get(job_name)) is not None:
+                _add_transfer_inputs(task, inputs, transfers_by_dst)
     return workflow
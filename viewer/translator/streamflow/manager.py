@@ -1,7 +1,9 @@
-from collections.abc import MutableMapping, MutableSequence
-from typing import Any
+from collections.abc import MutableSequence
 
+from viewer.analysis.streaming import StreamingStats
+from viewer.core.accounting import JobAccountingStore
 from viewer.core.entity import Workflow
+from viewer.core.filtering import TaskFilter
 from viewer.core.utils import get_path
 from viewer.translator.streamflow.log import translate_log
 from viewer.translator.streamflow.report import translate_report
@@ -10,16 +12,20 @@ from viewer.translator.streamflow.report import translate_report
 def sf_create_workflow(
     input_type: str,
     paths: MutableSequence[str],
-    location_metadata: MutableMapping[str, Any],
+    job_accounting: JobAccountingStore,
+    task_filter: TaskFilter | None = None,
+    stats: StreamingStats | None = None,
 ) -> Workflow:
-    if len(paths) != 1:
+    if input_type == "log":
+        # Rotated or split logs are merged by timestamp
+        return translate_log(
+            [get_path(p) for p in paths], job_accounting, task_filter, stats
+        )
+    elif len(paths) != 1:
         raise ValueError(
             f"StreamFlow module does not support multiple input paths: {paths}"
         )
-    input_path = get_path(paths[0])
-    if input_type == "report":
-        return translate_report(input_path)
-    elif input_type == "log":
-        return translate_log(input_path, location_metadata)
+    elif input_type == "report":
+        return translate_report(get_path(paths[0]), task_filter)
     else:
         raise ValueError(f"Unknown input type: {input_type}")
@@ -9,6 +9,7 @@ from typing import Any
 import numpy as np
 
 from viewer.core.entity import Step, Task, Workflow
+from viewer.core.filtering import TaskFilter
 from viewer.core.utils import str_to_datetime
 
 
@@ -52,10 +53,14 @@ def _extract_dates(data: MutableMapping[str, Any]) -> tuple[datetime, datetime]:
 
 
 def _get_steps(
-    data: MutableMapping[str, Any], workflow_start_date: datetime
+    data: MutableMapping[str, Any],
+    workflow_start_date: datetime,
+    task_filter: TaskFilter,
 ) -> MutableSequence[Step]:
     steps = []
     for elem in data["data"]:
+        if not task_filter.match_step(elem["name"]):
+            continue
         instances = []
         new_elem_x = _get_elem_x(elem)
         for start_date_str, exec_time in zip(elem["base"], new_elem_x):
@@ -63,21 +68,24 @@ def _get_steps(
             instance_end_date = datetime.fromtimestamp(
                 datetime.timestamp(instance_start_date) + exec_time / 1000
             )
-            instances.append(
-                Task(
-                    instance_start_date - workflow_start_date,
-                    instance_end_date - workflow_start_date,
-                )
+            task = Task(
+                instance_start_date - workflow_start_date,
+                instance_end_date - workflow_start_date,
             )
-        steps.append(Step(elem["name"], instances))
+            if task_filter.match_task(task):
+                instances.append(task)
+        if instances:
+            steps.append(Step(elem["name"], instances))
     return steps
 
 
-def translate_report(input_path: str) -> Workflow:
+def translate_report(
+    input_path: str, task_filter: TaskFilter | None = None
+) -> Workflow:
     with open(input_path) as fd:
         sf_report = json.load(fd)
     start_date, end_date = _extract_dates(sf_report)
-    steps = _get_steps(sf_report, start_date)
+    steps = _get_steps(sf_report, start_date, task_filter or TaskFilter())
     workflow = Workflow(start_date, end_date)
     workflow.steps.extend(steps)
     return workflow
@@ -0,0 +1,16 @@
+from collections.abc import MutableSequence
+
+from viewer.core.entity import Workflow
+from viewer.core.filtering import TaskFilter
+from viewer.core.table import TABLE_COLUMNS, read_table, table_to_workflow
+from viewer.core.utils import get_path
+
+
+def table_create_workflow(
+    paths: MutableSequence[str], task_filter: TaskFilter | None = None
+) -> Workflow:
+    if len(paths) != 1:
+        raise ValueError(f"Table module does not support multiple input paths: {paths}")
+    # The columns added to the table by other tools are not read
+    df, metadata = read_table(get_path(paths[0]), columns=TABLE_COLUMNS)
+    return table_to_workflow(df, metadata, task_filter)
@@ -8,6 +8,7 @@ from collections.abc import MutableMapping, MutableSequence
 from datetime import timedelta
 
 from viewer.core.entity import Step, Task
+from viewer.core.filtering import TaskFilter
 from viewer.core.utils import str_to_datetime
 
 time_regex = r"\[[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}\+[0-9]{4}]"
@@ -68,7 +69,8 @@ def bottom_up(elem: str, dictionary: MutableMapping[str, MutableSequence[str]])
     return result
 
 
-def translate_log(input_path: str):
+def translate_log(input_path: str, task_filter: TaskFilter | None = None):
+    task_filter = task_filter or TaskFilter()
     workflow_start = None
     workflow_end = None
     toil_jobs = {}
@@ -121,7 +123,11 @@ def translate_log(input_path: str):
                 #                 filesystem[child_name] = CWLStep(child_name, identifier or os.sep)
 
                 # Take start and end times
-                if parts[0] == "CWLJob" and job_start:
+                if (
+                    parts[0] == "CWLJob"
+                    and job_start
+                    and task_filter.match_step(identifier)
+                ):
                     toil_jobs.setdefault(identifier, {"start_time": [], "end_time": []})
                     toil_jobs[identifier]["start_time"].append(job_start)
                     toil_jobs[identifier]["end_time"].append(job_end)
@@ -147,7 +153,11 @@ def translate_log(input_path: str):
                 ],
             )
         )
-    return sorted(steps, key=lambda x: x.get_start()), workflow_start, workflow_end
+    return (
+        sorted(task_filter.filter_steps(steps), key=lambda x: x.get_start()),
+        workflow_start,
+        workflow_end,
+    )
 
 
 # def analysis(input_path: str):
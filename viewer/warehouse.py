@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from viewer.cli.priority import (
+    create_cluster_info,
+    create_output_config,
+    create_style_config,
+    create_task_filter,
+)
+from viewer.core.utils import get_path
+from viewer.core.warehouse import Warehouse
+from viewer.render.utils import save_file_log
+from viewer.translator.manager import create_workflow
+
+
+def ingest(args: argparse.Namespace) -> int:
+    workflow = create_workflow(
+        args.workflow_manager, args.input_type, args.inputs, create_cluster_info(args)
+    )
+    if workflow.empty():
+        raise Exception("The workflow is empty")
+    with Warehouse(get_path(args.database)) as warehouse:
+        warehouse.add_run(args.name, workflow, args.workflow_manager)
+    print(
+        f"Run {args.name} stored in {args.database}: "
+        f"{sum(len(s.instances) for s in workflow.steps)} tasks"
+    )
+    return 0
+
+
+def get_query_stats(df: pd.DataFrame, group_by: list[str]) -> pd.DataFrame:
+    """Durations, queue waits and energy of the tasks aggregated by the given columns."""
+    df = df.assign(
+        duration=df["end"] - df["start"],
+        queue=df["queue_end"] - df["queue_start"],
+        location=df["deployment"].where(
+            df["service"].isna(), df["deployment"] + "/" + df["service"]
+        ),
+    )
+    grouped = df.groupby(group_by, dropna=False)
+    result = grouped.agg(
+        tasks=("duration", "size"),
+        runs=("run", "nunique"),
+        mean_seconds=("duration", "mean"),
+        max_seconds=("duration", "max"),
+        mean_queue_seconds=("queue", "mean"),
+        energy=("energy", lambda e: e.sum(min_count=1)),
+    )
+    quantiles = grouped["duration"].quantile([0.5, 0.95]).unstack()
+    result.insert(3, "p50_seconds", quantiles[0.5])
+    result.insert(4, "p95_seconds", quantiles[0.95])
+    return result.reset_index()
+
+
+def query(args: argparse.Namespace) -> int:
+    with Warehouse(get_path(args.database)) as warehouse:
+        if args.list_runs:
+            result = warehouse.get_runs()
+        else:
+            since = (
+                datetime.now() - timedelta(days=args.days)
+                if args.days is not None
+                else args.since
+            )
+            df = warehouse.get_tasks(
+                runs=args.runs,
+                steps=args.included_steps,
+                deployments=args.deployments,
+                since=since,
+                until=args.until,
+            )
+            if df.empty:
+                print("No tasks match the query")
+                return 0
+            result = get_query_stats(df, args.group_by)
+    print(result.to_string(index=False))
+    if args.output:
+        match os.path.splitext(args.output)[1]:
+            case ".csv":
+                result.to_csv(args.output, index=False)
+            case _:
+                with open(args.output, "w") as f:
+                    json.dump(json.loads(result.to_json(orient="records")), f, indent=4)
+        save_file_log(args.output, "query")
+    return 0
+
+
+def render(args: argparse.Namespace) -> int:
+    # The render libraries are imported only when the plots are needed
+    from viewer.render.report import create_report
+    from viewer.render.stats import create_stats
+
+    args.filename = args.filename or args.run
+    style_config = create_style_config(args)
+    out_config = create_output_config(args)
+    with Warehouse(get_path(args.database)) as warehouse:
+        workflow = warehouse.get_workflow(args.run, create_task_filter(args))
+    if args.window:
+        workflow = workflow.get_window(*args.window)
+    if workflow.empty():
+        raise Exception("The workflow is empty")
+    create_stats(
+        workflow,
+        out_config,
+        args.show_stats,
+        args.save_stats,
+        args.idle_threshold,
+        style_config.straggler_threshold,
+    )
+    create_report(workflow, out_config, style_config)
+    return 0